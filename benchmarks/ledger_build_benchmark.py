@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+"""账本构建基准：在不同规模的合成事实上运行 build_ledger_entries，观察耗时是否随事实数线性增长。
+
+示例：
+  python benchmarks/ledger_build_benchmark.py
+  python benchmarks/ledger_build_benchmark.py --sizes 10000,50000,100000 --scan-facts 10000
+  python benchmarks/ledger_build_benchmark.py --incremental-facts 100000 --changed-ratio 0.01
+
+每个规模约 70% 为银行付款事实、30% 为订单事实，约一半订单有 linked 关联。us_per_fact 基本不变即为线性；
+scan_seconds / indexed_seconds 是在 --scan-facts 规模上按旧方式（每笔付款扫描全部 links）和按索引构建的耗时。
+incremental 在 --incremental-facts 规模上先全量构建一次（经 JSON 往返模拟上次的 ledger_entries.jsonl），
+再改动 --changed-ratio 比例的流水摘要，对比全量重建和增量重建的耗时与结果。
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_PATH = str(PROJECT_ROOT / "src")
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+from localai.entrypoints import print_json
+from localai.modules import ledger_builder
+from localai.modules.ledger_builder import build_ledger_entries
+from localai.modules.ledger_order_enricher import build_order_enrichment
+
+MERCHANTS = ["美团外卖", "拼多多", "京东商城", "中国移动", "滴滴出行", "星巴克", "超市", "少儿英语培训"]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark ledger building across fact counts.")
+    parser.add_argument("--sizes", default="12500,25000,50000,100000", help="Comma-separated fact counts.")
+    parser.add_argument("--scan-facts", type=int, default=25000, help="Fact count for the full links scan comparison.")
+    parser.add_argument("--incremental-facts", type=int, default=50000, help="Fact count for the incremental rebuild comparison.")
+    parser.add_argument("--changed-ratio", type=float, default=0.01, help="Share of bank facts changed before the incremental rebuild.")
+    parser.add_argument("--seed", type=int, default=5, help="Random seed.")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    rng = random.Random(args.seed)
+    runs = []
+    for size in [int(item) for item in args.sizes.split(",") if item.strip()]:
+        facts, links = _sample_facts(rng, size)
+        started = time.perf_counter()
+        entries, _ = build_ledger_entries(facts, links)
+        seconds = time.perf_counter() - started
+        runs.append(
+            {
+                "facts": len(facts),
+                "links": len(links),
+                "entries": len(entries),
+                "seconds": round(seconds, 3),
+                "us_per_fact": round(seconds * 1_000_000 / len(facts), 1),
+            }
+        )
+
+    facts, links = _sample_facts(rng, args.scan_facts)
+    started = time.perf_counter()
+    indexed_entries, _ = build_ledger_entries(facts, links)
+    indexed_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    scan_entries = _build_with_links_scan(facts, links)
+    scan_seconds = time.perf_counter() - started
+    print_json(
+        {
+            "runs": runs,
+            "scan_facts": len(facts),
+            "indexed_seconds": round(indexed_seconds, 3),
+            "scan_seconds": round(scan_seconds, 3),
+            "same_result": scan_entries == indexed_entries,
+            "incremental": _incremental_run(rng, args.incremental_facts, args.changed_ratio),
+        }
+    )
+    return 0
+
+
+def _incremental_run(rng: random.Random, size: int, changed_ratio: float) -> dict[str, Any]:
+    facts, links = _sample_facts(rng, size)
+    previous, _ = build_ledger_entries(facts, links)
+    previous = json.loads(json.dumps(previous, ensure_ascii=False))
+    bank_facts = [fact for fact in facts if fact.get("source_type") == "bank_transaction"]
+    for fact in rng.sample(bank_facts, int(len(bank_facts) * changed_ratio)):
+        fact["summary"] = f"{fact['summary']} 转账"
+    started = time.perf_counter()
+    full_entries, _ = build_ledger_entries(facts, links)
+    full_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    incremental_entries, stats = build_ledger_entries(facts, links, previous_entries=previous)
+    incremental_seconds = time.perf_counter() - started
+    return {
+        "facts": len(facts),
+        "changed_facts": int(len(bank_facts) * changed_ratio),
+        "reused_entries": stats["reused_entries"],
+        "rebuilt_entries": stats["rebuilt_entries"],
+        "full_seconds": round(full_seconds, 3),
+        "incremental_seconds": round(incremental_seconds, 3),
+        "same_result": json.loads(json.dumps(full_entries, ensure_ascii=False)) == incremental_entries,
+    }
+
+
+def _build_with_links_scan(facts: list[dict[str, Any]], links: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    original = ledger_builder.build_order_enrichment
+
+    def scan_enrichment(payment_fact, all_links, facts_by_id, **kwargs):
+        kwargs.pop("links_by_payment", None)
+        return build_order_enrichment(payment_fact, all_links, facts_by_id, **kwargs)
+
+    ledger_builder.build_order_enrichment = scan_enrichment
+    try:
+        entries, _ = build_ledger_entries(facts, links)
+    finally:
+        ledger_builder.build_order_enrichment = original
+    return entries
+
+
+def _sample_facts(rng: random.Random, size: int) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    bank_count = size * 7 // 10
+    facts: list[dict[str, Any]] = []
+    links: list[dict[str, Any]] = []
+    for index in range(bank_count):
+        occurred = datetime(2021, 1, 1) + timedelta(minutes=rng.randrange(4 * 365 * 24 * 60))
+        outflow = rng.random() < 0.85
+        amount = f"{rng.randrange(100, 100000) / 100:.2f}"
+        facts.append(
+            {
+                "financial_transaction_id": f"fin_bank_{size}_{index}",
+                "fact_type": "bank_payment" if outflow else "bank_money_movement",
+                "source_type": "bank_transaction",
+                "business_type": "expense" if outflow else "income",
+                "direction": "outflow" if outflow else "inflow",
+                "occurrence_time": occurred.strftime("%Y-%m-%d %H:%M:%S"),
+                "occurrence_date": occurred.strftime("%Y-%m-%d"),
+                "amount": amount,
+                "signed_amount": f"-{amount}" if outflow else amount,
+                "source_system": "icbc",
+                "payment_channel": "alipay",
+                "platform": "",
+                "merchant": rng.choice(MERCHANTS),
+                "counterparty": "",
+                "title": "",
+                "summary": "消费" if outflow else "工资",
+                "source_record_ids": {"bank_transaction_id": f"bank_{size}_{index}"},
+                "confidence": 0.9,
+                "warnings": [],
+            }
+        )
+    for index in range(size - bank_count):
+        payment = facts[rng.randrange(bank_count)]
+        order_id = f"fin_order_{size}_{index}"
+        facts.append(
+            {
+                "financial_transaction_id": order_id,
+                "fact_type": "order_purchase",
+                "source_type": "platform_order",
+                "occurrence_time": payment["occurrence_time"],
+                "amount": payment["amount"],
+                "merchant": payment["merchant"],
+                "title": f"订单商品{index % 300}",
+                "summary": "",
+                "source_record_ids": {"order_record_id": f"order_{size}_{index}"},
+            }
+        )
+        if rng.random() < 0.5:
+            links.append(
+                {
+                    "payment_financial_transaction_id": payment["financial_transaction_id"],
+                    "order_financial_transaction_id": order_id,
+                    "match_strength": "linked",
+                    "score": 90,
+                }
+            )
+    return facts, links
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""账本关键词分类基准：对比编译后的 Aho-Corasick 规则匹配与逐条规则、逐个关键词归一化的旧实现。
+
+示例：
+  python benchmarks/ledger_classifier_benchmark.py
+  python benchmarks/ledger_classifier_benchmark.py --facts 200000
+
+合成事实的商户/摘要由规则关键词、干扰词和随机字符拼成，方向在流入、流出、未知之间随机；
+same_result 逐条比较两种实现的分类结果，mismatches 给出前几个不一致的样例。
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_PATH = str(PROJECT_ROOT / "src")
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+from localai.entrypoints import print_json
+from localai.modules.financial_transaction_schema import normalized_text
+from localai.modules.ledger_category_rules import RULES, LedgerClassification, classify_ledger_fact
+
+NOISE = ["消费", "POS", "支付宝", "财付通", "Tenpay", "快捷支付", "转账", "  ", "ABC", "有限公司", "上海", "北京"]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark compiled vs legacy ledger keyword classification.")
+    parser.add_argument("--facts", type=int, default=50000, help="Synthetic fact count.")
+    parser.add_argument("--seed", type=int, default=3, help="Random seed.")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    rng = random.Random(args.seed)
+    keywords = [keyword for rule in RULES for keyword in rule.keywords]
+    facts = [_sample_fact(rng, keywords) for _ in range(args.facts)]
+
+    started = time.perf_counter()
+    legacy = [_legacy_classify(fact) for fact in facts]
+    legacy_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    compiled = [classify_ledger_fact(fact) for fact in facts]
+    compiled_seconds = time.perf_counter() - started
+
+    mismatches = [
+        {"fact": fact, "legacy": old.reason, "compiled": new.reason}
+        for fact, old, new in zip(facts, legacy, compiled)
+        if old != new
+    ]
+    print_json(
+        {
+            "facts": len(facts),
+            "rules": len(RULES),
+            "keywords": len(keywords),
+            "same_result": not mismatches,
+            "mismatches": mismatches[:5],
+            "legacy_seconds": round(legacy_seconds, 3),
+            "compiled_seconds": round(compiled_seconds, 3),
+            "speedup": round(legacy_seconds / compiled_seconds, 1) if compiled_seconds else None,
+        }
+    )
+    return 0
+
+
+def _legacy_classify(fact: dict[str, Any]) -> LedgerClassification | None:
+    text = normalized_text(
+        " ".join(
+            [
+                fact.get("merchant", ""),
+                fact.get("counterparty", ""),
+                fact.get("title", ""),
+                fact.get("summary", ""),
+                fact.get("platform", ""),
+                fact.get("payment_channel", ""),
+            ]
+        )
+    )
+    direction = fact.get("direction", "unknown")
+    for rule in sorted(RULES, key=lambda item: item.priority):
+        if rule.direction and rule.direction != direction:
+            continue
+        if any(normalized_text(keyword) in text for keyword in rule.keywords):
+            return rule.classification
+    return classify_ledger_fact({"direction": direction})
+
+
+def _sample_fact(rng: random.Random, keywords: list[str]) -> dict[str, Any]:
+    def text() -> str:
+        parts = [rng.choice(NOISE) for _ in range(rng.randint(0, 3))]
+        for _ in range(rng.choice([0, 0, 1, 1, 2])):
+            keyword = rng.choice(keywords)
+            if len(keyword) > 2 and rng.random() < 0.2:
+                cut = rng.randrange(1, len(keyword))
+                keyword = keyword[:cut] + " " + keyword[cut:]
+            parts.insert(rng.randint(0, len(parts)), keyword)
+        return "".join(parts)
+
+    return {
+        "merchant": text(),
+        "counterparty": text() if rng.random() < 0.3 else "",
+        "title": "",
+        "summary": text(),
+        "platform": rng.choice(["", "pdd", "meituan", "jd"]),
+        "payment_channel": rng.choice(["bank_card", "alipay", "wechat_pay"]),
+        "direction": rng.choice(["inflow", "outflow", "outflow", "unknown"]),
+    }
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
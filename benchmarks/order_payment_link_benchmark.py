@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+"""订单-付款关联基准：对比金额/日期索引与逐一扫描全部付款的耗时。
+
+示例：
+  python benchmarks/order_payment_link_benchmark.py
+  python benchmarks/order_payment_link_benchmark.py --payments 50000 --orders 10000 --scan-orders 300
+
+合成数据包含无日期的付款和订单。逐一扫描是 O(订单 × 付款)，只对前 --scan-orders 个订单运行，
+scan_seconds_estimated 按比例外推到全部订单；same_result 比较这部分订单两种方式的关联结果。
+逐一扫描用的是引入 FactRecord 之前的按 dict 打分：每对都重新解析金额、时间并归一化文本。
+assign_seconds 是开启一对一分配后的总耗时，合成订单会有多单指向同一笔付款，用于观察冲突标记；
+aggregate_seconds 是开启一单多付/一付多单组合匹配后的总耗时。
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_PATH = str(PROJECT_ROOT / "src")
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+from localai.entrypoints import print_json
+from localai.modules.bank_transaction_schema import parse_decimal
+from localai.modules.financial_transaction_linker import (
+    MAX_DAYS,
+    MIN_CANDIDATE_SCORE,
+    _make_link,
+    link_orders_to_payments,
+)
+from localai.modules.financial_transaction_schema import normalized_text
+
+PLATFORMS = ["pdd", "meituan", "jd", "taobao", ""]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark indexed vs full-scan order-to-payment linking.")
+    parser.add_argument("--payments", type=int, default=50000, help="Synthetic outflow payment count.")
+    parser.add_argument("--orders", type=int, default=10000, help="Synthetic order count.")
+    parser.add_argument("--scan-orders", type=int, default=200, help="Orders checked with the full scan.")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed.")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    rng = random.Random(args.seed)
+    payments = [_payment(rng, index) for index in range(args.payments)]
+    orders = [_order(rng, index, payments) for index in range(args.orders)]
+
+    started = time.perf_counter()
+    links, stats = link_orders_to_payments(orders, payments)
+    indexed_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    _, assign_stats = link_orders_to_payments(orders, payments, assign=True)
+    assign_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    _, aggregate_stats = link_orders_to_payments(orders, payments, aggregate=True)
+    aggregate_seconds = time.perf_counter() - started
+
+    scan_orders = orders[: args.scan_orders]
+    started = time.perf_counter()
+    scan_links = _scan_link(scan_orders, payments)
+    scan_seconds = time.perf_counter() - started
+    scan_ids = {order["financial_transaction_id"] for order in scan_orders}
+    indexed_subset = [link for link in links if link["order_financial_transaction_id"] in scan_ids]
+
+    print_json(
+        {
+            "payments": len(payments),
+            "orders": len(orders),
+            "links": len(links),
+            "scored_pairs": stats["scored_pairs"],
+            "indexed_seconds": round(indexed_seconds, 3),
+            "scan_orders": len(scan_orders),
+            "scan_seconds": round(scan_seconds, 3),
+            "scan_seconds_estimated": round(scan_seconds * len(orders) / max(1, len(scan_orders)), 1),
+            "same_result": indexed_subset == scan_links,
+            "assign_seconds": round(assign_seconds, 3),
+            "assigned_links": assign_stats["assigned_links"],
+            "assignment_conflicts": assign_stats["assignment_conflicts"],
+            "assignment_largest_component": assign_stats["assignment_largest_component"],
+            "aggregate_seconds": round(aggregate_seconds, 3),
+            "aggregate_multi_order": aggregate_stats["aggregate_multi_order"],
+            "aggregate_split_payment": aggregate_stats["aggregate_split_payment"],
+        }
+    )
+    return 0
+
+
+def _scan_link(orders: list[dict[str, Any]], payments: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    links = []
+    for order in orders:
+        candidates = []
+        for payment in payments:
+            score, evidence = _legacy_score_pair(order, payment)
+            if score >= MIN_CANDIDATE_SCORE:
+                candidates.append((score, evidence, payment))
+        candidates.sort(key=lambda item: item[0], reverse=True)
+        links.extend(_make_link(order, payment, score, evidence) for score, evidence, payment in candidates[:5])
+    return links
+
+
+def _legacy_score_pair(order: dict[str, Any], payment: dict[str, Any]) -> tuple[int, list[str]]:
+    order_amount = parse_decimal(order.get("amount"))
+    payment_amount = parse_decimal(payment.get("amount"))
+    if order_amount is None or payment_amount is None or order_amount != payment_amount:
+        return 0, []
+    score = 50
+    evidence: list[str] = ["amount_exact"]
+
+    merchant_match = _legacy_merchant_text_match(order, payment)
+    day_delta = _legacy_day_delta(order.get("occurrence_time", ""), payment.get("occurrence_time", ""))
+    if day_delta is not None:
+        if day_delta == 0:
+            score += 25
+            evidence.append("same_day")
+        elif day_delta <= 1:
+            score += 20
+            evidence.append("within_1_day")
+        elif day_delta <= 3:
+            score += 15
+            evidence.append("within_3_days")
+        elif day_delta <= MAX_DAYS:
+            score += 8
+            evidence.append("within_7_days")
+        else:
+            return 0, []
+
+    if order.get("platform") and payment.get("platform") == order.get("platform"):
+        score += 20
+        evidence.append("platform_match")
+    elif order.get("platform") and _legacy_platform_text_match(order.get("platform", ""), payment):
+        score += 12
+        evidence.append("platform_text_match")
+
+    if merchant_match:
+        score += 10
+        evidence.append("merchant_text_overlap")
+
+    if day_delta is None and not merchant_match:
+        return 0, []
+    if day_delta is None:
+        score -= 10
+        evidence.append("date_missing")
+    return max(0, min(100, score)), evidence
+
+
+def _legacy_day_delta(left: str, right: str) -> int | None:
+    left_dt = _legacy_parse_datetime(left)
+    right_dt = _legacy_parse_datetime(right)
+    if left_dt is None or right_dt is None:
+        return None
+    return abs((left_dt.date() - right_dt.date()).days)
+
+
+def _legacy_parse_datetime(value: str) -> datetime | None:
+    text = str(value or "").strip()
+    if not text:
+        return None
+    for fmt in ["%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d", "%Y/%m/%d %H:%M:%S", "%Y/%m/%d"]:
+        try:
+            return datetime.strptime(text[: len(datetime.now().strftime(fmt))], fmt)
+        except ValueError:
+            continue
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        return None
+
+
+def _legacy_platform_text_match(platform: str, payment: dict[str, Any]) -> bool:
+    text = _legacy_payment_text(payment)
+    aliases = {
+        "pdd": ["pdd", "拼多多"],
+        "meituan": ["meituan", "美团"],
+        "jd": ["jd", "京东"],
+        "taobao": ["taobao", "淘宝", "天猫"],
+    }.get(platform, [platform])
+    return any(normalized_text(alias) in text for alias in aliases)
+
+
+def _legacy_merchant_text_match(order: dict[str, Any], payment: dict[str, Any]) -> bool:
+    merchant = normalized_text(order.get("merchant", ""))
+    title = normalized_text(order.get("title", ""))
+    payment_text = _legacy_payment_text(payment)
+    if merchant and len(merchant) >= 4 and merchant[:8] in payment_text:
+        return True
+    if title and len(title) >= 8 and title[:10] in payment_text:
+        return True
+    return False
+
+
+def _legacy_payment_text(payment: dict[str, Any]) -> str:
+    return normalized_text(" ".join([payment.get("merchant", ""), payment.get("counterparty", ""), payment.get("summary", "")]))
+
+
+def _payment(rng: random.Random, index: int) -> dict[str, Any]:
+    occurred = datetime(2021, 1, 1) + timedelta(minutes=rng.randrange(5 * 365 * 24 * 60))
+    platform = rng.choice(PLATFORMS)
+    return {
+        "financial_transaction_id": f"pay_{index}",
+        "direction": "outflow",
+        "business_type": "expense",
+        "amount": f"{rng.randrange(100, 50000) / 100:.2f}",
+        "occurrence_time": "" if rng.random() < 0.01 else occurred.strftime("%Y-%m-%d %H:%M:%S"),
+        "platform": platform,
+        "merchant": f"商户{rng.randrange(2000)}",
+        "counterparty": platform,
+        "summary": "消费",
+        "source_record_ids": {"bank_transaction_id": f"bank_{index}"},
+    }
+
+
+def _order(rng: random.Random, index: int, payments: list[dict[str, Any]]) -> dict[str, Any]:
+    paid = rng.choice(payments)
+    occurred = paid["occurrence_time"] or "2023-06-01 12:00:00"
+    if rng.random() < 0.7:
+        occurred_dt = datetime.strptime(occurred, "%Y-%m-%d %H:%M:%S") - timedelta(hours=rng.randrange(0, 72))
+        occurred = occurred_dt.strftime("%Y-%m-%d %H:%M:%S")
+    return {
+        "financial_transaction_id": f"order_{index}",
+        "amount": paid["amount"] if rng.random() < 0.9 else f"{rng.randrange(100, 50000) / 100:.2f}",
+        "occurrence_time": "" if rng.random() < 0.02 else occurred,
+        "platform": paid["platform"],
+        "merchant": paid["merchant"],
+        "title": "订单",
+        "summary": "订单",
+        "source_record_ids": {"order_record_id": f"order_record_{index}"},
+    }
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""PDF 口令校验基准：对比逐次构造 PdfReader 与 PdfStandardSecurity 的候选/秒。
+
+示例：
+  python benchmarks/pdf_password_verify_benchmark.py
+  python benchmarks/pdf_password_verify_benchmark.py --pdf raw_data/financial_email/attachments/xxx.pdf
+
+未指定 --pdf 时，用 pypdf 生成 RC4-40/RC4-128/AES-128/AES-256 四种加密的多页样例。
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_PATH = str(PROJECT_ROOT / "src")
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+from localai.entrypoints import print_json
+from localai.modules.financial_attachment_pdf_security import PdfStandardSecurity
+
+
+SAMPLE_ALGORITHMS = ["RC4-40", "RC4-128", "AES-128", "AES-256"]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark PDF password verification candidates/sec.")
+    parser.add_argument("--pdf", action="append", type=Path, default=[], help="Encrypted PDF to benchmark.")
+    parser.add_argument("--pages", type=int, default=60, help="Page count of generated sample PDFs.")
+    parser.add_argument("--reader-candidates", type=int, default=50, help="Candidates for the PdfReader baseline.")
+    parser.add_argument("--fast-candidates", type=int, default=2000, help="Candidates for the fast verifier.")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    with tempfile.TemporaryDirectory(prefix="pdf_password_benchmark_") as temp_dir:
+        pdfs = args.pdf or [_write_sample_pdf(Path(temp_dir), algorithm, args.pages) for algorithm in SAMPLE_ALGORITHMS]
+        results = [_benchmark_pdf(path, args.reader_candidates, args.fast_candidates) for path in pdfs]
+    print_json(results)
+    return 0
+
+
+def _benchmark_pdf(path: Path, reader_candidates: int, fast_candidates: int) -> dict[str, object]:
+    from pypdf import PdfReader
+
+    started = time.perf_counter()
+    for number in range(reader_candidates):
+        reader = PdfReader(str(path))
+        reader.decrypt(f"{number:06d}")
+    reader_rate = reader_candidates / (time.perf_counter() - started)
+
+    security = PdfStandardSecurity.from_pdf(path)
+    if security is None:
+        return {"pdf": str(path), "reader_candidates_per_sec": round(reader_rate, 1), "fast_supported": False}
+    if security.revision == 6:
+        fast_candidates = max(1, fast_candidates // 20)
+    started = time.perf_counter()
+    for number in range(fast_candidates):
+        security.check_password(f"{number:06d}")
+    fast_rate = fast_candidates / (time.perf_counter() - started)
+    return {
+        "pdf": str(path),
+        "revision": security.revision,
+        "reader_candidates_per_sec": round(reader_rate, 1),
+        "fast_candidates_per_sec": round(fast_rate, 1),
+        "speedup": round(fast_rate / reader_rate, 1),
+    }
+
+
+def _write_sample_pdf(output_dir: Path, algorithm: str, pages: int) -> Path:
+    from pypdf import PdfWriter
+    from pypdf.generic import ContentStream, NameObject
+
+    writer = PdfWriter()
+    for index in range(pages):
+        page = writer.add_blank_page(595, 842)
+        content = ContentStream(None, writer)
+        content.set_data(f"BT /F1 10 Tf 40 800 Td (page {index + 1}) Tj ET".encode("latin-1") * 40)
+        page[NameObject("/Contents")] = writer._add_object(content)
+    writer.encrypt(user_password="135790", owner_password="owner-benchmark", algorithm=algorithm)
+    output = output_dir / f"sample_{algorithm}.pdf"
+    with output.open("wb") as file:
+        writer.write(file)
+    return output
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""PDF 流水解析基准：对比单进程与分页并行读取多页工行样式流水的耗时。
+
+示例：
+  python benchmarks/pdf_statement_parse_benchmark.py
+  python benchmarks/pdf_statement_parse_benchmark.py --pages 120 --workers 8
+  python benchmarks/pdf_statement_parse_benchmark.py --pdf processed_data/xxx.pdf
+
+未指定 --pdf 时生成一份合成流水：每页奇数行，日期行和明细行会跨页分开，用于检查跨页配对和 page_hint。
+cached_seconds 是复制一份 PDF、写入 .pages.json 旁路缓存后再次解析的耗时。
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_PATH = str(PROJECT_ROOT / "src")
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+from localai.entrypoints import print_json
+from localai.modules.financial_attachment_reader import _read_pdf_transactions
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark serial vs page-parallel PDF statement parsing.")
+    parser.add_argument("--pdf", type=Path, help="Statement PDF to benchmark; a synthetic one is generated if omitted.")
+    parser.add_argument("--pages", type=int, default=60, help="Page count of the generated statement.")
+    parser.add_argument("--lines-per-page", type=int, default=45, help="Text lines per generated page.")
+    parser.add_argument("--workers", type=int, default=0, help="Parallel worker count; 0 uses all CPU cores.")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    with tempfile.TemporaryDirectory(prefix="pdf_statement_benchmark_") as temp_dir:
+        path = args.pdf or _write_sample_statement(Path(temp_dir) / "statement.pdf", args.pages, args.lines_per_page)
+        manifest_item = {"bank_key": "icbc", "message_uid": "benchmark", "message_id": "benchmark"}
+        serial_seconds, serial = _timed(
+            lambda: _read_pdf_transactions(path, manifest_item, workers=1, use_text_cache=False)
+        )
+        parallel_seconds, parallel = _timed(
+            lambda: _read_pdf_transactions(path, manifest_item, workers=args.workers, use_text_cache=False)
+        )
+        cache_dir = Path(temp_dir) / "cached"
+        cache_dir.mkdir()
+        cached_path = cache_dir / path.name
+        cached_path.write_bytes(path.read_bytes())
+        _read_pdf_transactions(cached_path, manifest_item, workers=args.workers)
+        cached_seconds, cached = _timed(lambda: _read_pdf_transactions(cached_path, manifest_item, workers=args.workers))
+    page_hints = [item["source_records"][0]["page"] for item in parallel]
+    print_json(
+        {
+            "pdf": str(args.pdf or "synthetic"),
+            "workers": args.workers or os.cpu_count() or 1,
+            "transactions": len(parallel),
+            "same_result": serial == parallel,
+            "same_cached_result": _strip_source_file(cached) == _strip_source_file(parallel),
+            "cross_page_transactions": sum(1 for hint in page_hints if "-" in hint),
+            "missing_page_hint": sum(1 for hint in page_hints if not hint),
+            "serial_seconds": round(serial_seconds, 3),
+            "parallel_seconds": round(parallel_seconds, 3),
+            "speedup": round(serial_seconds / parallel_seconds, 2) if parallel_seconds else None,
+            "cached_seconds": round(cached_seconds, 3),
+        }
+    )
+    return 0
+
+
+def _strip_source_file(transactions: list[dict]) -> list[dict]:
+    return [
+        {**item, "source_records": [{**record, "source_file": ""} for record in item["source_records"]]}
+        for item in transactions
+    ]
+
+
+def _timed(func):
+    started = time.perf_counter()
+    result = func()
+    return time.perf_counter() - started, result
+
+
+def _write_sample_statement(path: Path, pages: int, lines_per_page: int) -> Path:
+    lines = ["Account 6222020200001234"]
+    day = 0
+    while len(lines) < pages * lines_per_page:
+        day += 1
+        lines.append(f"2025-{(day // 28) % 12 + 1:02d}-{day % 28 + 1:02d}")
+        amount = f"{'+' if day % 3 == 0 else '-'}{day % 900 + 10}.{day % 100:02d}"
+        lines.append(f"10:{day % 60:02d}:{day * 7 % 60:02d} 0200 1234 RMB CNY 01 Purchase POS {amount} {day * 13 % 90000 + 1000}.00 Merchant{day % 50}")
+    page_streams = []
+    for page_index in range(pages):
+        page_lines = lines[page_index * lines_per_page : (page_index + 1) * lines_per_page]
+        body = "\n".join(f"({_pdf_escape(line)}) Tj T*" for line in page_lines)
+        page_streams.append(f"BT /F1 8 Tf 10 TL 30 810 Td\n{body}\nET".encode("latin-1"))
+    _write_pdf(path, page_streams)
+    return path
+
+
+def _write_pdf(path: Path, page_streams: list[bytes]) -> None:
+    page_count = len(page_streams)
+    font_id = 3
+    objects: list[bytes] = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        (
+            "<< /Type /Pages /Kids ["
+            + " ".join(f"{4 + index * 2} 0 R" for index in range(page_count))
+            + f"] /Count {page_count} >>"
+        ).encode("ascii"),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for index, stream in enumerate(page_streams):
+        content_id = 5 + index * 2
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << /Font << /F1 {font_id} 0 R >> >> "
+            f"/Contents {content_id} 0 R >>".encode("ascii")
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref_offset = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    output += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+    path.write_bytes(bytes(output))
+
+
+def _pdf_escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
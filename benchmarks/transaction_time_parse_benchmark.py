@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""交易时间解析基准：对比原先逐个格式 strptime 的解析与正则识别 + LRU 缓存的 parse_transaction_time。
+
+示例：
+  python benchmarks/transaction_time_parse_benchmark.py
+  python benchmarks/transaction_time_parse_benchmark.py --values 500000 --unique 20000
+
+合成时间混合了带秒、到分钟、纯日期、斜杠日期、ISO 和无法解析的写法；--unique 控制不同字符串数，
+其余为重复值（同一笔流水在关联、入账、报表各阶段被反复解析）。uncached_seconds 在每次调用前清空缓存，
+单独衡量格式识别快路径。
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_PATH = str(PROJECT_ROOT / "src")
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+from localai.entrypoints import print_json
+from localai.modules.transaction_time import _parse_transaction_time_text, parse_transaction_time
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark legacy vs cached transaction time parsing.")
+    parser.add_argument("--values", type=int, default=200000, help="Total strings parsed.")
+    parser.add_argument("--unique", type=int, default=10000, help="Distinct strings among them.")
+    parser.add_argument("--seed", type=int, default=11, help="Random seed.")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    rng = random.Random(args.seed)
+    distinct = [_sample_value(rng) for _ in range(args.unique)]
+    values = [rng.choice(distinct) for _ in range(args.values)]
+
+    started = time.perf_counter()
+    legacy = [_legacy_parse_datetime(value) for value in values]
+    legacy_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    uncached = []
+    for value in values:
+        _parse_transaction_time_text.cache_clear()
+        uncached.append(parse_transaction_time(value))
+    uncached_seconds = time.perf_counter() - started
+
+    _parse_transaction_time_text.cache_clear()
+    started = time.perf_counter()
+    cached = [parse_transaction_time(value) for value in values]
+    cached_seconds = time.perf_counter() - started
+
+    print_json(
+        {
+            "values": len(values),
+            "unique": len(distinct),
+            "same_result": legacy == uncached == cached,
+            "legacy_seconds": round(legacy_seconds, 3),
+            "uncached_seconds": round(uncached_seconds, 3),
+            "cached_seconds": round(cached_seconds, 3),
+            "speedup": round(legacy_seconds / cached_seconds, 1) if cached_seconds else None,
+        }
+    )
+    return 0
+
+
+def _legacy_parse_datetime(value: str) -> datetime | None:
+    text = str(value or "").strip()
+    if not text:
+        return None
+    for fmt in ["%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d", "%Y/%m/%d %H:%M:%S", "%Y/%m/%d"]:
+        try:
+            return datetime.strptime(text[: len(datetime.now().strftime(fmt))], fmt)
+        except ValueError:
+            continue
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        return None
+
+
+def _sample_value(rng: random.Random) -> str:
+    moment = datetime(2020, 1, 1) + timedelta(seconds=rng.randrange(6 * 365 * 86400))
+    return rng.choice(
+        [
+            moment.strftime("%Y-%m-%d %H:%M:%S"),
+            moment.strftime("%Y-%m-%d %H:%M:%S"),
+            moment.strftime("%Y-%m-%d %H:%M"),
+            moment.strftime("%Y-%m-%d"),
+            moment.strftime("%Y/%m/%d %H:%M:%S"),
+            moment.strftime("%Y/%m/%d"),
+            moment.isoformat(),
+            "",
+            "未知时间",
+        ]
+    )
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
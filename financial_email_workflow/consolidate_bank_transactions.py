@@ -13,6 +13,10 @@
   --email-records        流水邮件记录 JSONL 路径，默认 `raw_data/financial_email/financial_email_records.jsonl`。
   --attachment-manifest  附件提取清单路径，默认 `raw_data/financial_email/extracted_attachments/attachment_extract_manifest.json`。
   --output-dir           归一化流水输出目录，默认 `processed_data/normalized`。
+  --pdf-workers          多页 PDF 分页并行提取文本的进程数，默认 1 不并行，0 表示使用全部 CPU 核心；只有 8 页以上的 PDF 才会分页并行。
+  --no-text-cache        不读写 PDF 旁路文本缓存 `<pdf>.pages.json`，强制重新用 pypdf 提取。
+  --file-workers         按附件文件并行解析的进程数，默认 1 不并行，0 表示使用全部 CPU 核心；并行时 PDF 不再分页并行。
+  --incremental          复用 `<output-dir>/source_cache` 中内容未变的源文件解析结果，只解析新增或变化的文件后整体重新去重。
 
 示例：
   python financial_email_bot.py --stage normalize
@@ -55,6 +59,28 @@ def parse_args() -> argparse.Namespace:
         help="Path to attachment_extract_manifest.json.",
     )
     parser.add_argument("--output-dir", default="processed_data/normalized", help="Output directory.")
+    parser.add_argument(
+        "--pdf-workers",
+        type=int,
+        default=1,
+        help="Processes for page-parallel PDF text extraction; 1 (default) disables, 0 uses all CPU cores.",
+    )
+    parser.add_argument(
+        "--no-text-cache",
+        action="store_true",
+        help="Ignore and do not write the <pdf>.pages.json extracted-text cache.",
+    )
+    parser.add_argument(
+        "--file-workers",
+        type=int,
+        default=1,
+        help="Processes for parsing attachment files concurrently; 1 is serial, 0 uses all CPU cores.",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Reuse cached parse results for unchanged source files and only parse new or changed ones.",
+    )
     return parser.parse_args()
 
 
@@ -72,6 +98,10 @@ def main() -> int:
         email_records_path=args.email_records,
         attachment_manifest_path=args.attachment_manifest,
         output_dir=args.output_dir,
+        pdf_workers=args.pdf_workers,
+        use_text_cache=not args.no_text_cache,
+        file_workers=args.file_workers,
+        incremental=args.incremental,
     )
     print_json(summary)
     return 0
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import argparse
+import hashlib
 import struct
 import json
 import re
@@ -22,7 +23,11 @@ DEFAULT_OUTPUT = Path("raw_data/financial_email/cracked_attachment_passwords.env
 DEFAULT_MASKS = ["?d?d?d?d?d?d", "?d?d?d?d"]
 DEFAULT_ZIP_MODES = [13600, 17225, 17220, 17210, 17200]
 DEFAULT_PDF_MODES = [10700, 10600, 10500, 10400]
+PDF_REVISION_MODES = {2: [10400], 3: [10500], 4: [10500], 5: [10600], 6: [10700]}
 DEFAULT_PASSWORD_ENV = Path("financial_attachment_passwords.env")
+DEFAULT_CANDIDATE_STATS = Path("raw_data/financial_email/password_candidate_stats.json")
+DEFAULT_SESSION_DIR = Path("raw_data/financial_email/hashcat_sessions")
+BODY_TEXT_LIMIT = 200_000
 
 
 @dataclass(frozen=True)
@@ -34,6 +39,7 @@ class CrackTarget:
     subject: str
     sent_at: str
     status: str
+    body_text_file: str = ""
 
 
 @dataclass(frozen=True)
@@ -45,6 +51,60 @@ class CrackResult:
     mode: int | None = None
     mask: str = ""
     hash_file: Path | None = None
+    candidate_rule: str = ""
+
+
+@dataclass(frozen=True)
+class PendingHash:
+    target: CrackTarget
+    hash_string: str
+    modes: tuple[int, ...]
+    hash_file: Path
+    candidate_passwords: tuple[str, ...]
+
+
+class DiscoveredPasswords:
+    """本次运行已知可用的密码，按 bank_key 分组；同一持卡人的多份附件通常共用密码。"""
+
+    def __init__(self) -> None:
+        self.by_bank: dict[str, list[str]] = {}
+        # 已对当时全部未破解目标验证过的密码；之后的复用只需验证新发现的密码。
+        self.tried: set[str] = set()
+
+    @classmethod
+    def from_store(cls, store: Any | None) -> "DiscoveredPasswords":
+        discovered = cls()
+        if store is None:
+            return discovered
+        for bank_key, passwords in store.by_bank.items():
+            for password in passwords:
+                discovered.add(str(bank_key), password)
+        for group in [store.by_filename, store.by_pattern, store.by_type]:
+            for passwords in group.values():
+                for password in passwords:
+                    discovered.add("", password)
+        for password in store.default_passwords:
+            discovered.add("", password)
+        return discovered
+
+    def add(self, bank_key: str, password: str) -> bool:
+        if not password:
+            return False
+        passwords = self.by_bank.setdefault(bank_key or "", [])
+        if password in passwords:
+            return False
+        passwords.append(password)
+        return True
+
+    def ordered_for(self, bank_key: str) -> list[str]:
+        ordered = list(self.by_bank.get(bank_key or "", []))
+        for key, passwords in self.by_bank.items():
+            if key != (bank_key or ""):
+                ordered.extend(passwords)
+        return list(dict.fromkeys(ordered))
+
+    def untried_for(self, bank_key: str) -> list[str]:
+        return [password for password in self.ordered_for(bank_key) if password not in self.tried]
 
 
 def main() -> int:
@@ -70,8 +130,7 @@ def main() -> int:
 
     hashcat = resolve_executable(args.hashcat)
     if not hashcat:
-        print("未找到 hashcat，请安装 hashcat 或通过 --hashcat 指定完整路径。")
-        return 2
+        print("未找到 hashcat，改用多核 CPU 数字掩码穷举；需要 GPU 破解时请安装 hashcat 或通过 --hashcat 指定完整路径。")
 
     zip2john = (
         resolve_executable(args.zip2john)
@@ -88,30 +147,62 @@ def main() -> int:
     print(f"输出 env 片段：{args.output}")
     print("控制台默认不输出真实密码；需要显示时使用 --show-passwords。")
 
-    results: list[CrackResult] = []
+    outcomes: dict[Path, CrackResult] = {}
+    pending: list[PendingHash] = []
+    discovered = DiscoveredPasswords.from_store(load_password_store(args.password_env))
+    reuse_known_passwords(targets, discovered, outcomes, args.cpu_workers, args.show_passwords)
     with tempfile.TemporaryDirectory(prefix="financial_attachment_hashcat_") as temp_dir:
         for index, target in enumerate(targets, start=1):
+            if target.path in outcomes:
+                continue
             print(f"[{index}/{len(targets)}] {target.kind.upper()} {target.path}")
-            result = crack_target(
+            outcome = crack_target(
                 target=target,
                 temp_dir=Path(temp_dir),
                 hashcat=hashcat,
                 zip2john=zip2john,
                 pdf2john=pdf2john,
-                hashcat_extra_args=args.hashcat_extra_arg,
                 masks=args.mask,
-                wordlists=args.wordlist,
                 candidate_profile=args.candidate_profile,
                 password_env=args.password_env,
+                candidate_stats=args.candidate_stats,
                 zip_modes=args.zip_mode,
                 pdf_modes=args.pdf_mode,
+                cpu_workers=args.cpu_workers,
+            )
+            if isinstance(outcome, PendingHash):
+                pending.append(outcome)
+                print(f"  -> 已提取 hash，mode={','.join(str(mode) for mode in outcome.modes)}，等待 hashcat 批量会话")
+                continue
+            outcomes[target.path] = outcome
+            print(format_result(outcome, show_passwords=args.show_passwords))
+            if outcome.status == "cracked" and discovered.add(target.bank_key, outcome.password):
+                reuse_known_passwords(targets, discovered, outcomes, args.cpu_workers, args.show_passwords)
+
+        pending = [item for item in pending if item.target.path not in outcomes]
+        if pending and hashcat is not None:
+            print(f"hashcat 批量会话：{len(pending)} 个 hash，会话目录 {args.session_dir}")
+            for result in crack_pending_hashes(
+                pending=pending,
+                hashcat=hashcat,
+                session_dir=args.session_dir,
+                wordlists=args.wordlist,
+                masks=args.mask,
                 workload=args.workload,
+                extra_args=args.hashcat_extra_arg,
+                parallel_jobs=args.hashcat_parallel_jobs,
                 keep_hashes=args.keep_hashes,
-            )
-            results.append(result)
-            print(format_result(result, show_passwords=args.show_passwords))
+            ):
+                outcomes[result.target.path] = result
+                print(f"{result.target.kind.upper()} {result.target.path}")
+                print(format_result(result, show_passwords=args.show_passwords))
+                if result.status == "cracked":
+                    discovered.add(result.target.bank_key, result.password)
+            reuse_known_passwords(targets, discovered, outcomes, args.cpu_workers, args.show_passwords)
+    results = [outcomes[target.path] for target in targets if target.path in outcomes]
 
     persisted_count = persist_cracked_passwords(results, args.password_env)
+    record_candidate_rule_successes(results, args.candidate_stats)
     write_password_snippet(results, args.output)
     print_summary(results, args.output, args.password_env, persisted_count)
     return (
@@ -179,6 +270,12 @@ def parse_args() -> argparse.Namespace:
         default=DEFAULT_PASSWORD_ENV,
         help="项目附件密码 env 文件，用于优先尝试已配置候选。",
     )
+    parser.add_argument(
+        "--candidate-stats",
+        type=Path,
+        default=DEFAULT_CANDIDATE_STATS,
+        help="候选密码规则按 bank_key 的历史命中统计，用于调整候选顺序。",
+    )
     parser.add_argument(
         "--zip-mode",
         action="append",
@@ -203,6 +300,24 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--zip2john", help="zip2john 可执行文件路径或命令名。")
     parser.add_argument("--pdf2john", help="pdf2john 可执行文件路径或命令名。")
     parser.add_argument("--workload", default="3", help="hashcat -w 工作负载，默认 3。")
+    parser.add_argument(
+        "--session-dir",
+        type=Path,
+        default=DEFAULT_SESSION_DIR,
+        help="hashcat 会话目录，保存批量 hash 文件、outfile 和 .restore，中断后重跑会自动恢复。",
+    )
+    parser.add_argument(
+        "--hashcat-parallel-jobs",
+        type=int,
+        default=1,
+        help="同一攻击阶段内并发运行的 hashcat 会话数，默认 1；多 GPU 时可调大。",
+    )
+    parser.add_argument(
+        "--cpu-workers",
+        type=int,
+        default=0,
+        help="CPU 数字掩码穷举的进程数，默认 0 表示使用全部 CPU 核心。",
+    )
     parser.add_argument(
         "--list-targets",
         action="store_true",
@@ -243,6 +358,8 @@ def apply_config_defaults(args: argparse.Namespace) -> None:
     args.inventory = resolve_runtime_path(args.inventory)
     args.output = resolve_runtime_path(args.output)
     args.password_env = resolve_runtime_path(args.password_env)
+    args.candidate_stats = resolve_runtime_path(args.candidate_stats)
+    args.session_dir = resolve_runtime_path(args.session_dir)
     args.wordlist = [resolve_runtime_path(path) for path in args.wordlist]
     if args.attachment:
         args.attachment = [resolve_runtime_path(path) for path in args.attachment]
@@ -259,9 +376,7 @@ def apply_config_defaults(args: argparse.Namespace) -> None:
 
 
 def load_project_config(config_path: Path) -> dict[str, Any]:
-    src_path = PROJECT_ROOT / "src"
-    if str(src_path) not in sys.path:
-        sys.path.insert(0, str(src_path))
+    ensure_src_path()
     try:
         from localai.modules.config_loader import load_config
     except Exception:
@@ -277,6 +392,12 @@ def load_project_config(config_path: Path) -> dict[str, Any]:
     return data if isinstance(data, dict) else {}
 
 
+def ensure_src_path() -> None:
+    src_path = PROJECT_ROOT / "src"
+    if str(src_path) not in sys.path:
+        sys.path.insert(0, str(src_path))
+
+
 def resolve_config_path(value: Any) -> str | None:
     if value is None or str(value).strip() == "":
         return None
@@ -363,35 +484,36 @@ def saved_attachment_filenames(password_env: Path) -> set[str]:
 def crack_target(
     target: CrackTarget,
     temp_dir: Path,
-    hashcat: Path,
+    hashcat: Path | None,
     zip2john: Path | None,
     pdf2john: Path | None,
-    hashcat_extra_args: list[str],
     masks: list[str],
-    wordlists: list[Path],
     candidate_profile: str,
     password_env: Path,
+    candidate_stats: Path,
     zip_modes: list[int],
     pdf_modes: list[int],
-    workload: str,
-    keep_hashes: bool,
-) -> CrackResult:
+    cpu_workers: int = 0,
+) -> CrackResult | PendingHash:
+    """先走候选密码和 CPU 直接验证；需要 hashcat 时返回 PendingHash，交给批量会话统一处理。"""
     if not target.path.exists():
         return CrackResult(target=target, status="error", reason="附件文件不存在")
 
-    candidate_passwords = build_candidate_passwords(target, password_env) if candidate_profile == "auto" else []
-    for password in candidate_passwords:
+    candidates = build_candidate_passwords(target, password_env, candidate_stats) if candidate_profile == "auto" else []
+    for password, rule in candidates:
         if verify_password(target, password):
             return CrackResult(
                 target=target,
                 status="cracked",
-                reason="已通过候选密码验证",
+                reason=f"已通过候选密码验证（{rule}）",
                 password=password,
                 mode=None,
                 mask="candidate",
+                candidate_rule=rule,
             )
+    candidate_passwords = [password for password, _ in candidates]
 
-    direct_zip_result = crack_traditional_zip_numeric_masks(target, masks)
+    direct_zip_result = crack_traditional_zip_numeric_masks(target, masks, cpu_workers)
     if direct_zip_result is not None:
         password, mask = direct_zip_result
         return CrackResult(
@@ -403,18 +525,28 @@ def crack_target(
             mask=mask,
         )
 
-    john_tool = zip2john if target.kind == "zip" else pdf2john
-    if not john_tool:
+    if hashcat is None:
+        direct_pdf_result = crack_pdf_numeric_masks(target, masks, cpu_workers)
+        if direct_pdf_result is not None:
+            password, mask = direct_pdf_result
+            return CrackResult(
+                target=target,
+                status="cracked",
+                reason="已通过 PDF 直接数字掩码验证",
+                password=password,
+                mode=None,
+                mask=mask,
+            )
         return CrackResult(
             target=target,
-            status="error",
-            reason=f"未找到 {target.kind}2john，请用 --{target.kind}2john 指定",
+            status="not_cracked",
+            reason="未找到 hashcat，CPU 数字掩码未破解",
         )
 
     try:
-        hash_string = extract_hash(john_tool, target.path, target.kind)
+        hash_string = extract_target_hash(target, zip2john, pdf2john)
     except RuntimeError as exc:
-        direct_pdf_result = crack_pdf_numeric_masks(target, masks)
+        direct_pdf_result = crack_pdf_numeric_masks(target, masks, cpu_workers)
         if direct_pdf_result is not None:
             password, mask = direct_pdf_result
             return CrackResult(
@@ -429,103 +561,227 @@ def crack_target(
 
     hash_file = temp_dir / f"{safe_stem(target.path)}.{target.kind}.hash"
     hash_file.write_text(hash_string + "\n", encoding="utf-8")
-
-    modes = compatible_modes(hash_string, target.kind, zip_modes, pdf_modes)
-    generated_wordlist = write_candidate_wordlist(temp_dir, target, candidate_passwords)
-    effective_wordlists = [path for path in [generated_wordlist, *wordlists] if path and path.exists()]
-    for mode in modes:
-        for wordlist in effective_wordlists:
-            run_hashcat_wordlist(hashcat=hashcat, hash_file=hash_file, mode=mode, wordlist=wordlist, workload=workload, extra_args=hashcat_extra_args)
-            password = show_hashcat_password(hashcat=hashcat, hash_string=hash_string, hash_file=hash_file, mode=mode, extra_args=hashcat_extra_args)
-            if password is not None and verify_password(target, password):
-                kept_hash = keep_hash(hash_file, target) if keep_hashes else None
-                return CrackResult(
-                    target=target,
-                    status="cracked",
-                    reason="已破解",
-                    password=password,
-                    mode=mode,
-                    mask=f"wordlist:{wordlist.name}",
-                    hash_file=kept_hash,
-                )
-
-    for mode in modes:
-        for mask in masks:
-            run_hashcat(
-                hashcat=hashcat,
-                hash_file=hash_file,
-                mode=mode,
-                mask=mask,
-                workload=workload,
-                extra_args=hashcat_extra_args,
-            )
-            password = show_hashcat_password(hashcat=hashcat, hash_string=hash_string, hash_file=hash_file, mode=mode, extra_args=hashcat_extra_args)
-            if password is not None and verify_password(target, password):
-                kept_hash = keep_hash(hash_file, target) if keep_hashes else None
-                return CrackResult(
-                    target=target,
-                    status="cracked",
-                    reason="已破解",
-                    password=password,
-                    mode=mode,
-                    mask=mask,
-                    hash_file=kept_hash,
-                )
-
-    kept_hash = keep_hash(hash_file, target) if keep_hashes else None
-    return CrackResult(
+    return PendingHash(
         target=target,
-        status="not_cracked",
-        reason="当前 mode/mask 未破解",
-        hash_file=kept_hash,
+        hash_string=hash_string,
+        modes=tuple(compatible_modes(hash_string, target.kind, zip_modes, pdf_modes)),
+        hash_file=hash_file,
+        candidate_passwords=tuple(candidate_passwords),
+    )
+
+
+def reuse_known_passwords(
+    targets: list[CrackTarget],
+    discovered: DiscoveredPasswords,
+    outcomes: dict[Path, CrackResult],
+    cpu_workers: int,
+    show_passwords: bool,
+) -> int:
+    """用已知密码并行验证所有未破解目标，同银行密码优先；命中的直接记为已破解，不再进入掩码/字典攻击。
+
+    每个密码只对未破解目标验证一次：已验证过的记入 discovered.tried，之后每次调用只试新发现的密码。
+    """
+    remaining = [
+        target
+        for target in targets
+        if target.path.exists()
+        and (target.path not in outcomes or outcomes[target.path].status == "not_cracked")
+    ]
+    candidates = [discovered.untried_for(target.bank_key) for target in remaining]
+    if not remaining or not any(candidates):
+        return 0
+    ensure_src_path()
+    from localai.modules.financial_attachment_bruteforce import match_known_passwords
+
+    matches = match_known_passwords(
+        [(target.kind, target.path) for target in remaining],
+        candidates,
+        workers=cpu_workers,
+    )
+    discovered.tried.update(password for passwords in candidates for password in passwords)
+    reused = 0
+    for target, password in zip(remaining, matches):
+        if password is None or not verify_password(target, password):
+            continue
+        same_bank = password in discovered.by_bank.get(target.bank_key or "", [])
+        outcomes[target.path] = CrackResult(
+            target=target,
+            status="cracked",
+            reason="已通过同银行已知密码验证" if same_bank else "已通过已知密码复用验证",
+            password=password,
+            mode=None,
+            mask="reuse",
+        )
+        discovered.add(target.bank_key, password)
+        reused += 1
+        print(f"{target.kind.upper()} {target.path}")
+        print(format_result(outcomes[target.path], show_passwords=show_passwords))
+    return reused
+
+
+def crack_pending_hashes(
+    pending: list[PendingHash],
+    hashcat: Path,
+    session_dir: Path,
+    wordlists: list[Path],
+    masks: list[str],
+    workload: str,
+    extra_args: list[str],
+    parallel_jobs: int,
+    keep_hashes: bool,
+) -> list[CrackResult]:
+    """按攻击阶段（候选字典、用户字典、掩码）依次运行；每阶段同 mode 的所有待破解 hash 合并为一个会话。"""
+    ensure_src_path()
+    from localai.modules.financial_attachment_hashcat import (
+        HashcatAttack,
+        HashcatSessionRunner,
+        build_jobs,
+        run_job_queue,
+    )
+
+    runner = HashcatSessionRunner(
+        hashcat=hashcat,
+        session_dir=session_dir,
+        workload=workload,
+        extra_args=extra_args,
+        on_status=print_hashcat_status,
     )
+    candidate_wordlist = write_candidate_wordlist(session_dir, pending)
+    attacks = [
+        HashcatAttack.wordlist(path)
+        for path in [candidate_wordlist, *wordlists]
+        if path and path.exists()
+    ]
+    attacks.extend(HashcatAttack.mask(mask) for mask in masks)
+
+    remaining: dict[str, list[PendingHash]] = {}
+    for item in pending:
+        remaining.setdefault(item.hash_string, []).append(item)
+    cracked: dict[Path, CrackResult] = {}
+    for attack in attacks:
+        if not remaining:
+            break
+        hashes_by_mode: dict[int, list[str]] = {}
+        for items in remaining.values():
+            for mode in items[0].modes:
+                hashes_by_mode.setdefault(mode, []).append(items[0].hash_string)
+        for job_result in run_job_queue(runner, build_jobs(attack, hashes_by_mode), parallel_jobs):
+            for hash_string, password in job_result.cracked.items():
+                items = remaining.get(hash_string, [])
+                if not items or not verify_password(items[0].target, password):
+                    continue
+                remaining.pop(hash_string)
+                for item in items:
+                    cracked[item.target.path] = CrackResult(
+                        target=item.target,
+                        status="cracked",
+                        reason="已破解（恢复会话）" if job_result.restored else "已破解",
+                        password=password,
+                        mode=job_result.job.mode,
+                        mask=attack.name,
+                        hash_file=keep_hash(item.hash_file, item.target) if keep_hashes else None,
+                    )
+
+    return [
+        cracked.get(item.target.path)
+        or CrackResult(
+            target=item.target,
+            status="not_cracked",
+            reason="当前 mode/mask 未破解",
+            hash_file=keep_hash(item.hash_file, item.target) if keep_hashes else None,
+        )
+        for item in pending
+    ]
 
 
-def crack_traditional_zip_numeric_masks(target: CrackTarget, masks: list[str]) -> tuple[str, str] | None:
+def print_hashcat_status(job: Any, status: Any) -> None:
+    recovered, total = status.recovered
+    print(
+        f"  hashcat m{job.mode} {job.attack.name}: {status.percent:5.1f}% "
+        f"已恢复 {recovered}/{total} 速度 {status.speed:,} H/s",
+        flush=True,
+    )
+
+
+def crack_traditional_zip_numeric_masks(
+    target: CrackTarget, masks: list[str], cpu_workers: int = 0
+) -> tuple[str, str] | None:
     if target.kind != "zip" or is_aes_zip(target.path):
         return None
 
-    numeric_masks = [
-        (mask, length)
-        for mask in masks
-        if (length := numeric_digit_mask_length(mask)) is not None and length <= 6
-    ]
+    numeric_masks = direct_numeric_masks(masks)
     if not numeric_masks:
         return None
 
     try:
         with zipfile.ZipFile(target.path) as archive:
-            first_file = next((info for info in archive.infolist() if not info.is_dir()), None)
-            if first_file is None:
+            if not any(not info.is_dir() for info in archive.infolist()):
                 return "", numeric_masks[0][0]
-            for mask, length in numeric_masks:
-                for number in range(10**length):
-                    password = f"{number:0{length}d}"
-                    if zip_member_opens_with_password(archive, first_file, password):
-                        return password, mask
+        return search_numeric_masks_on_cpu(target, numeric_masks, cpu_workers)
     except (OSError, zipfile.BadZipFile):
         return None
-    return None
 
 
-def crack_pdf_numeric_masks(target: CrackTarget, masks: list[str]) -> tuple[str, str] | None:
+def crack_pdf_numeric_masks(
+    target: CrackTarget, masks: list[str], cpu_workers: int = 0
+) -> tuple[str, str] | None:
     if target.kind != "pdf":
         return None
 
-    numeric_masks = [
+    numeric_masks = direct_numeric_masks(masks)
+    if not numeric_masks:
+        return None
+    return search_numeric_masks_on_cpu(target, numeric_masks, cpu_workers)
+
+
+def direct_numeric_masks(masks: list[str]) -> list[tuple[str, int]]:
+    return [
         (mask, length)
         for mask in masks
         if (length := numeric_digit_mask_length(mask)) is not None and length <= 6
     ]
-    if not numeric_masks:
-        return None
 
-    for mask, length in numeric_masks:
-        for number in range(10**length):
-            password = f"{number:0{length}d}"
-            if verify_pdf_password(target.path, password):
-                return password, mask
-    return None
+
+def search_numeric_masks_on_cpu(
+    target: CrackTarget, numeric_masks: list[tuple[str, int]], cpu_workers: int
+) -> tuple[str, str] | None:
+    ensure_src_path()
+    from localai.modules.financial_attachment_bruteforce import (
+        resolve_worker_count,
+        search_numeric_masks,
+    )
+
+    print(f"  CPU 数字掩码穷举：{', '.join(mask for mask, _ in numeric_masks)}，进程数 {resolve_worker_count(cpu_workers)}")
+    return search_numeric_masks(
+        kind=target.kind,
+        path=target.path,
+        numeric_masks=numeric_masks,
+        workers=cpu_workers,
+        progress=MaskProgressPrinter(),
+    )
+
+
+class MaskProgressPrinter:
+    def __init__(self, interval_seconds: float = 5.0) -> None:
+        self.interval_seconds = interval_seconds
+        self.last_printed = 0.0
+
+    def __call__(self, progress: Any) -> None:
+        if progress.checked < progress.total and progress.elapsed - self.last_printed < self.interval_seconds:
+            return
+        self.last_printed = progress.elapsed
+        percent = progress.checked * 100 / progress.total if progress.total else 100.0
+        print(
+            f"  {progress.mask}: {percent:5.1f}% {progress.checked}/{progress.total} "
+            f"{progress.rate:,.0f}/s ETA {format_seconds(progress.eta_seconds)}",
+            flush=True,
+        )
+
+
+def format_seconds(value: float) -> str:
+    minutes, seconds = divmod(int(value), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
 
 
 def numeric_digit_mask_length(mask: str) -> int | None:
@@ -537,54 +793,133 @@ def numeric_digit_mask_length(mask: str) -> int | None:
     return None
 
 
-def zip_member_opens_with_password(
-    archive: zipfile.ZipFile, info: zipfile.ZipInfo, password: str
-) -> bool:
-    try:
-        with archive.open(info, pwd=password.encode("ascii")) as source:
-            source.read(1)
-            source.read()
-        return True
-    except Exception:
-        return False
-
-
 def compatible_modes(hash_string: str, kind: str, zip_modes: list[int], pdf_modes: list[int]) -> list[int]:
     if kind == "pdf":
-        return pdf_modes
+        revision_modes = PDF_REVISION_MODES.get(pdf_hash_revision(hash_string))
+        if revision_modes is None:
+            return pdf_modes
+        return [mode for mode in pdf_modes if mode in revision_modes] or revision_modes
     if hash_string.startswith("$zip2$"):
         return [mode for mode in zip_modes if mode == 13600] or [13600]
     if hash_string.startswith(("$pkzip2$", "$pkzip$")):
-        pkzip_modes = {17225, 17220, 17210, 17200}
-        return [mode for mode in zip_modes if mode in pkzip_modes] or [17225, 17220, 17210, 17200]
+        pkzip_modes = pkzip_hash_modes(hash_string) or [17225, 17220, 17210, 17200]
+        return [mode for mode in zip_modes if mode in pkzip_modes] or pkzip_modes
     return zip_modes
 
 
-def build_candidate_passwords(target: CrackTarget, password_env: Path) -> list[str]:
-    candidates: list[str] = []
-    candidates.extend(resolve_configured_passwords(target, password_env))
-    candidates.extend(derive_password_candidates(target))
-    return unique_nonempty(candidates)
+def pdf_hash_revision(hash_string: str) -> int | None:
+    try:
+        return int(hash_string[len("$pdf$") :].split("*")[1])
+    except (IndexError, ValueError):
+        return None
 
 
-def resolve_configured_passwords(target: CrackTarget, password_env: Path) -> list[str]:
-    if not password_env.exists():
+def pkzip_hash_modes(hash_string: str) -> list[int]:
+    ensure_src_path()
+    try:
+        from localai.modules.financial_attachment_zipcrypto import pkzip_hash_modes as parse_modes
+    except Exception:
         return []
-    src_path = PROJECT_ROOT / "src"
-    if str(src_path) not in sys.path:
-        sys.path.insert(0, str(src_path))
+    return parse_modes(hash_string)
+
+
+def build_candidate_passwords(
+    target: CrackTarget, password_env: Path, candidate_stats: Path
+) -> list[tuple[str, str]]:
+    """返回按优先级排好的 (候选密码, 规则名)；env 中已配置的密码始终最先尝试。"""
+    candidates = [(password, "configured") for password in resolve_configured_passwords(target, password_env)]
+    candidates.extend(generate_rule_candidates(target, password_env, candidate_stats))
+    seen: set[str] = set()
+    result: list[tuple[str, str]] = []
+    for password, rule in candidates:
+        item = str(password).strip()
+        if not item or item in seen:
+            continue
+        seen.add(item)
+        result.append((item, rule))
+    return result
+
+
+def load_password_store(password_env: Path) -> Any | None:
+    if not password_env.exists():
+        return None
+    ensure_src_path()
     try:
         from localai.modules.financial_attachment_passwords import AttachmentPasswordStore
     except Exception:
+        return None
+    try:
+        return AttachmentPasswordStore.from_env_file(password_env)
+    except Exception:
+        return None
+
+
+def resolve_configured_passwords(target: CrackTarget, password_env: Path) -> list[str]:
+    store = load_password_store(password_env)
+    if store is None:
         return []
     try:
-        store = AttachmentPasswordStore.from_env_file(password_env)
         match = store.resolve(bank_key=target.bank_key, attachment_path=target.path)
     except Exception:
         return []
     return match.passwords if match else []
 
 
+def generate_rule_candidates(
+    target: CrackTarget, password_env: Path, candidate_stats: Path
+) -> list[tuple[str, str]]:
+    ensure_src_path()
+    try:
+        from localai.modules.financial_attachment_password_candidates import (
+            CandidateContext,
+            generate_password_candidates,
+            read_rule_stats,
+        )
+    except Exception:
+        return [(password, "attachment_digits") for password in derive_password_candidates(target)]
+
+    store = load_password_store(password_env)
+    context = CandidateContext(
+        bank_key=target.bank_key,
+        filename=target.filename,
+        subject=target.subject,
+        sent_at=target.sent_at,
+        path=str(target.path),
+        body_text=read_body_text(target.body_text_file),
+        hints=store.hints if store is not None else {},
+    )
+    return [
+        (candidate.password, candidate.rule)
+        for candidate in generate_password_candidates(context, read_rule_stats(candidate_stats))
+    ]
+
+
+def read_body_text(body_text_file: str) -> str:
+    if not body_text_file:
+        return ""
+    path = resolve_runtime_path(Path(body_text_file))
+    try:
+        return path.read_text(encoding="utf-8", errors="replace")[:BODY_TEXT_LIMIT]
+    except OSError:
+        return ""
+
+
+def record_candidate_rule_successes(results: list[CrackResult], candidate_stats: Path) -> int:
+    successes = [
+        (item.target.bank_key, item.candidate_rule)
+        for item in results
+        if item.status == "cracked" and item.candidate_rule and item.candidate_rule != "configured"
+    ]
+    if not successes:
+        return 0
+    ensure_src_path()
+    try:
+        from localai.modules.financial_attachment_password_candidates import record_rule_successes
+    except Exception:
+        return 0
+    return record_rule_successes(candidate_stats, successes)
+
+
 def derive_password_candidates(target: CrackTarget) -> list[str]:
     text = " ".join([target.filename, target.subject, target.sent_at, str(target.path)])
     dates = re.findall(r"(20\d{6})", text)
@@ -601,26 +936,50 @@ def derive_password_candidates(target: CrackTarget) -> list[str]:
     return candidates
 
 
-def unique_nonempty(values: list[str]) -> list[str]:
-    seen: set[str] = set()
-    result: list[str] = []
-    for value in values:
-        item = str(value).strip()
-        if not item or item in seen:
-            continue
-        seen.add(item)
-        result.append(item)
-    return result
-
-
-def write_candidate_wordlist(temp_dir: Path, target: CrackTarget, candidates: list[str]) -> Path | None:
+def write_candidate_wordlist(session_dir: Path, pending: list[PendingHash]) -> Path | None:
+    candidates = list(dict.fromkeys(password for item in pending for password in item.candidate_passwords))
     if not candidates:
         return None
-    wordlist = temp_dir / f"{safe_stem(target.path)}.candidates.txt"
-    wordlist.write_text("\n".join(candidates) + "\n", encoding="utf-8")
+    content = "\n".join(candidates) + "\n"
+    # 文件名取内容指纹，保证中断恢复时 hashcat 能找到原来的字典。
+    fingerprint = hashlib.sha1(content.encode("utf-8")).hexdigest()[:16]
+    session_dir.mkdir(parents=True, exist_ok=True)
+    wordlist = session_dir / f"candidates_{fingerprint}.txt"
+    wordlist.write_text(content, encoding="utf-8")
     return wordlist
 
 
+def extract_target_hash(target: CrackTarget, zip2john: Path | None, pdf2john: Path | None) -> str:
+    """优先用纯 Python 直接生成 hash；无法识别时才回退到 zip2john/pdf2john。"""
+    hash_string = extract_native_hash(target.path, target.kind)
+    if hash_string:
+        return hash_string
+    john_tool = zip2john if target.kind == "zip" else pdf2john
+    if not john_tool:
+        raise RuntimeError(
+            f"未能直接提取 {target.kind.upper()} hash，且未找到 {target.kind}2john，请用 --{target.kind}2john 指定"
+        )
+    return extract_hash(john_tool, target.path, target.kind)
+
+
+def extract_native_hash(attachment: Path, kind: str) -> str:
+    ensure_src_path()
+    try:
+        if kind == "zip":
+            if is_aes_zip(attachment):
+                return extract_winzip_aes_hash(attachment)
+            from localai.modules.financial_attachment_zipcrypto import extract_pkzip_hash
+
+            return extract_pkzip_hash(attachment)
+        if kind == "pdf":
+            from localai.modules.financial_attachment_pdf_security import extract_pdf_hash
+
+            return extract_pdf_hash(attachment)
+    except (ImportError, OSError, zipfile.BadZipFile, struct.error):
+        return ""
+    return ""
+
+
 def extract_hash(john_tool: Path, attachment: Path, kind: str) -> str:
     completed = subprocess.run(
         executable_command(john_tool) + [str(attachment)],
@@ -735,62 +1094,6 @@ def is_aes_zip(path: Path) -> bool:
         return False
 
 
-def run_hashcat(
-    hashcat: Path, hash_file: Path, mode: int, mask: str, workload: str, extra_args: list[str]
-) -> None:
-    cmd = [
-        str(hashcat),
-        *extra_args,
-        "-m",
-        str(mode),
-        "-a",
-        "3",
-        "-w",
-        workload,
-        "--status",
-        "--status-timer",
-        "30",
-        str(hash_file),
-        mask,
-    ]
-    subprocess.run(cmd, cwd=hashcat.parent, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, text=True)
-
-
-def run_hashcat_wordlist(hashcat: Path, hash_file: Path, mode: int, wordlist: Path, workload: str, extra_args: list[str]) -> None:
-    cmd = [
-        str(hashcat),
-        *extra_args,
-        "-m",
-        str(mode),
-        "-a",
-        "0",
-        "-w",
-        workload,
-        "--status",
-        "--status-timer",
-        "30",
-        str(hash_file),
-        str(wordlist),
-    ]
-    subprocess.run(cmd, cwd=hashcat.parent, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, text=True)
-
-
-def show_hashcat_password(hashcat: Path, hash_string: str, hash_file: Path, mode: int, extra_args: list[str] | None = None) -> str | None:
-    completed = subprocess.run(
-        [str(hashcat), *(extra_args or []), "-m", str(mode), str(hash_file), "--show"],
-        cwd=hashcat.parent,
-        capture_output=True,
-        text=True,
-        encoding="utf-8",
-        errors="replace",
-    )
-    for line in completed.stdout.splitlines():
-        if not line.startswith(hash_string + ":"):
-            continue
-        return line[len(hash_string) + 1 :]
-    return None
-
-
 def verify_password(target: CrackTarget, password: str) -> bool:
     if not password or "exception" in password.lower() or "error" in password.lower():
         return False
@@ -1064,6 +1367,7 @@ def target_from_item(item: dict[str, Any]) -> CrackTarget:
         subject=str(item.get("subject", "")),
         sent_at=str(item.get("sent_at", "")),
         status=str(item.get("status") or item.get("encrypted_status") or ""),
+        body_text_file=str(item.get("body_text_file", "") or ""),
     )
 
 
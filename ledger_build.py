@@ -31,6 +31,22 @@ def parse_args() -> argparse.Namespace:
         default="processed_data/ledger",
         help="Output directory for ledger records.",
     )
+    parser.add_argument(
+        "--rule-pack",
+        action="append",
+        dest="rule_packs",
+        help="YAML/JSON ledger rule pack merged over the built-in rules; repeatable. Defaults to ledger.rule_packs in config.",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Reuse entries from the previous ledger_entries.jsonl whose fact, linked orders and rules are unchanged.",
+    )
+    parser.add_argument(
+        "--manual-overrides",
+        default=None,
+        help="Manual overrides JSON applied after classification. Defaults to <output-dir>/manual_overrides.json when present.",
+    )
     return parser.parse_args()
 
 
@@ -41,6 +57,9 @@ def main() -> int:
         ctx=ctx,
         normalized_dir=args.normalized_dir,
         output_dir=args.output_dir,
+        rule_pack_paths=args.rule_packs,
+        incremental=args.incremental,
+        manual_overrides_path=args.manual_overrides,
     )
     print_json(summary)
     return 0
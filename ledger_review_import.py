@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""读取人工校核 Excel 的人工修正列，生成 manual_overrides.json。"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+SRC_PATH = str(PROJECT_ROOT / "src")
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+from localai.entrypoints import bootstrap_context, print_json
+from localai.flows.ledger_review_import import run as run_ledger_review_import
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Import manual corrections from the ledger review workbook.")
+    parser.add_argument("--config", default="config.yaml", help="Path to config.yaml.")
+    parser.add_argument(
+        "--review",
+        default="processed_data/review/ledger_review.xlsx",
+        help="Reviewed ledger workbook (.xlsx).",
+    )
+    parser.add_argument(
+        "--output",
+        default="processed_data/ledger/manual_overrides.json",
+        help="Manual overrides JSON path.",
+    )
+    parser.add_argument(
+        "--replace",
+        action="store_true",
+        help="Discard existing overrides instead of merging the imported rows into them.",
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    ctx = bootstrap_context(__file__, args.config)
+    summary = run_ledger_review_import(
+        ctx=ctx,
+        review_path=args.review,
+        output_path=args.output,
+        replace=args.replace,
+    )
+    print_json(summary)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
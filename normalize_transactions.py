@@ -58,6 +58,16 @@ def parse_args() -> argparse.Namespace:
         default=None,
         help="Order platform to normalize. Can be repeated. Defaults to pdd and meituan.",
     )
+    parser.add_argument(
+        "--assign-links",
+        action="store_true",
+        help="Resolve order-payment candidates into one-to-one assignments; unassigned candidates are downgraded.",
+    )
+    parser.add_argument(
+        "--aggregate-links",
+        action="store_true",
+        help="Propose split-payment and multi-order links whose amounts add up exactly on the same platform.",
+    )
     return parser.parse_args()
 
 
@@ -72,6 +82,8 @@ def main() -> int:
         attachment_manifest_path=args.attachment_manifest,
         order_json_root=args.order_json_root,
         order_platforms=args.order_platform or ["pdd", "meituan"],
+        assign_links=args.assign_links,
+        aggregate_links=args.aggregate_links,
     )
     print_json(summary)
     return 0
@@ -6,28 +6,55 @@ from pathlib import Path
 from typing import Any
 
 from localai.context import AppContext
+from localai.modules import bank_transaction_schema, financial_attachment_reader, financial_email_record_reader
 from localai.modules.financial_attachment_reader import read_attachment_transactions
 from localai.modules.financial_email_record_reader import read_email_candidate_transactions
+from localai.modules.bank_transaction_source_cache import TransactionSourceCache, code_fingerprint
 from localai.modules.bank_transaction_deduper import dedupe_transactions
 from localai.modules.bank_transaction_quality_report import build_quality_report
 
 
 logger = logging.getLogger(__name__)
 
+SOURCE_CACHE_DIRNAME = "source_cache"
+
 
 def run(
     ctx: AppContext,
     email_records_path: str | Path,
     attachment_manifest_path: str | Path,
     output_dir: str | Path,
+    pdf_workers: int = 1,
+    use_text_cache: bool = True,
+    file_workers: int = 1,
+    incremental: bool = False,
 ) -> dict[str, Any]:
+    """整理邮件候选和附件流水并去重。
+
+    incremental 为真时每个源文件的解析结果写入 output_dir/source_cache，并复用其中内容未变的文件，
+    只解析新增或变化的源文件，再对合并后的全部流水重新去重，输出与全量重建一致；非增量运行不读写该缓存。
+    """
     email_records_file = ctx.resolve_path(email_records_path)
     attachment_manifest_file = ctx.resolve_path(attachment_manifest_path)
     output_path = ctx.resolve_path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
 
-    email_transactions, email_stats = read_email_candidate_transactions(email_records_file)
-    attachment_transactions, attachment_stats = read_attachment_transactions(attachment_manifest_file)
+    source_cache = TransactionSourceCache(
+        output_path / SOURCE_CACHE_DIRNAME,
+        code_fingerprint=code_fingerprint(
+            bank_transaction_schema, financial_attachment_reader, financial_email_record_reader
+        ),
+        reuse=incremental,
+    )
+    email_transactions, email_stats = _read_email_transactions(email_records_file, source_cache)
+    attachment_transactions, attachment_stats = read_attachment_transactions(
+        attachment_manifest_file,
+        pdf_workers=pdf_workers,
+        use_text_cache=use_text_cache,
+        file_workers=file_workers,
+        source_cache=source_cache,
+    )
+    pruned_cache_entries = source_cache.prune()
     raw_transactions = email_transactions + attachment_transactions
     deduped_transactions, dedupe_stats = dedupe_transactions(raw_transactions)
 
@@ -58,9 +85,25 @@ def run(
         "deduped_transactions": len(deduped_transactions),
         "email_transactions": len(email_transactions),
         "attachment_transactions": len(attachment_transactions),
+        "incremental": incremental,
+        "sources_reused": source_cache.hits,
+        "sources_parsed": source_cache.misses,
+        "pruned_cache_entries": pruned_cache_entries,
         "jsonl": str(jsonl_path),
         "json": str(json_path),
         "quality_report": str(report_path),
     }
     logger.info("Finished bank transaction consolidation: %s", summary)
     return summary
+
+
+def _read_email_transactions(
+    email_records_file: Path, source_cache: TransactionSourceCache
+) -> tuple[list[dict[str, Any]], dict[str, Any]]:
+    cache_key = source_cache.key(email_records_file)
+    cached = source_cache.load(cache_key)
+    if cached is not None:
+        return cached
+    transactions, stats = read_email_candidate_transactions(email_records_file)
+    source_cache.store(cache_key, email_records_file, transactions, stats)
+    return transactions, stats
@@ -22,6 +22,8 @@ def run(
     output_dir: str | Path,
     bank_transactions_path: str | Path | None = None,
     orders_path: str | Path | None = None,
+    assign_links: bool = False,
+    aggregate_links: bool = False,
 ) -> dict[str, Any]:
     output_path = ctx.resolve_path(output_dir)
     bank_path = ctx.resolve_path(bank_transactions_path or output_path / "bank_transactions.jsonl")
@@ -32,7 +34,9 @@ def run(
 
     bank_facts = [bank_transaction_to_fact(item) for item in bank_transactions]
     order_facts = [order_to_fact(item) for item in orders]
-    links, link_stats = link_orders_to_payments(order_facts, bank_facts)
+    links, link_stats = link_orders_to_payments(
+        order_facts, bank_facts, assign=assign_links, aggregate=aggregate_links
+    )
     _apply_link_status(order_facts, bank_facts, links)
 
     facts = sorted(
@@ -128,6 +132,9 @@ def _add_link(fact: dict[str, Any], linked_id: str, link: dict[str, Any]) -> Non
     if linked_id not in fact["linked_financial_transaction_ids"]:
         fact["linked_financial_transaction_ids"].append(linked_id)
     fact["link_candidate_count"] = len(fact["linked_financial_transaction_ids"])
+    # 一对一分配模式下未分到的候选只计入候选数，不参与最佳分数和 linked 判定。
+    if link.get("assignment", "assigned") != "assigned":
+        return
     score = int(link.get("score", 0))
     if score > int(fact.get("best_link_score", 0)):
         fact["best_link_score"] = score
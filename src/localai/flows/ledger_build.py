@@ -6,27 +6,68 @@ from pathlib import Path
 from typing import Any
 
 from localai.context import AppContext
+from localai.modules import (
+    bank_transaction_schema,
+    financial_transaction_schema,
+    ledger_builder,
+    ledger_category_rules,
+    ledger_order_enricher,
+    ledger_rule_packs,
+    ledger_schema,
+    transaction_time,
+)
+from localai.modules.bank_transaction_source_cache import code_fingerprint
 from localai.modules.ledger_builder import build_ledger_entries
+from localai.modules.ledger_manual_overrides import load_manual_overrides
 from localai.modules.ledger_quality_report import build_ledger_quality_report
+from localai.modules.ledger_rule_packs import load_rule_set
 
 
 logger = logging.getLogger(__name__)
 
+MANUAL_OVERRIDES_FILENAME = "manual_overrides.json"
+
 
 def run(
     ctx: AppContext,
     normalized_dir: str | Path,
     output_dir: str | Path,
+    rule_pack_paths: list[str | Path] | None = None,
+    incremental: bool = False,
+    manual_overrides_path: str | Path | None = None,
 ) -> dict[str, Any]:
+    """构建账本。
+
+    incremental 为真时把上次输出的 ledger_entries.jsonl 当作按来源流水 id 索引的存储，
+    流水、关联订单和账本代码都没变、且命中规则及其内容也没变的条目原样复用，只重建其余条目。
+    manual_overrides_path 默认读取输出目录下的 manual_overrides.json（不存在则不应用人工修正）。
+    """
     normalized_path = ctx.resolve_path(normalized_dir)
     output_path = ctx.resolve_path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
+    if rule_pack_paths is None:
+        rule_pack_paths = _configured_rule_packs(ctx.config.get("ledger", {}).get("rule_packs"))
+    rule_set = load_rule_set([ctx.resolve_path(path) for path in rule_pack_paths])
 
     facts = _read_jsonl(normalized_path / "financial_transactions.jsonl")
     links = _read_jsonl(normalized_path / "financial_transaction_links.jsonl")
-    entries, stats = build_ledger_entries(facts, links)
-
+    overrides_file = (
+        ctx.resolve_path(manual_overrides_path) if manual_overrides_path else output_path / MANUAL_OVERRIDES_FILENAME
+    )
+    if manual_overrides_path and not overrides_file.exists():
+        raise RuntimeError(f"Manual overrides file not found: {overrides_file}")
+    overrides = load_manual_overrides(overrides_file)
     jsonl_path = output_path / "ledger_entries.jsonl"
+    previous_entries = _read_jsonl(jsonl_path) if incremental else None
+    entries, stats = build_ledger_entries(
+        facts,
+        links,
+        rule_set=rule_set,
+        previous_entries=previous_entries,
+        code_fingerprint=_ledger_code_fingerprint(),
+        overrides=overrides,
+    )
+
     json_path = output_path / "ledger_entries.json"
     report_path = output_path / "ledger_quality_report.md"
 
@@ -38,15 +79,43 @@ def run(
         "normalized_dir": str(normalized_path),
         "output_dir": str(output_path),
         "ledger_entries": len(entries),
+        "incremental": incremental,
+        "reused_entries": stats["reused_entries"],
+        "rebuilt_entries": stats["rebuilt_entries"],
+        "manual_overrides": str(overrides_file) if overrides_file.exists() else "",
+        "override_applied_entries": stats["override_applied_entries"],
         "jsonl": str(jsonl_path),
         "json": str(json_path),
         "quality_report": str(report_path),
+        "rule_set_fingerprint": rule_set.fingerprint,
         "stats": stats,
     }
     logger.info("Finished ledger build: %s", summary)
     return summary
 
 
+def _ledger_code_fingerprint() -> str:
+    """账本条目输出依赖的全部代码：含金额/日期解析、文本归一化和规则包的解析合并方式，任一改动都让增量复用失效。"""
+    return code_fingerprint(
+        ledger_builder,
+        ledger_category_rules,
+        ledger_order_enricher,
+        ledger_schema,
+        ledger_rule_packs,
+        transaction_time,
+        bank_transaction_schema,
+        financial_transaction_schema,
+    )
+
+
+def _configured_rule_packs(value: Any) -> list[str]:
+    if isinstance(value, list):
+        return [str(item).strip() for item in value if str(item).strip()]
+    if isinstance(value, str):
+        return [item.strip() for item in value.split(",") if item.strip()]
+    return []
+
+
 def _read_jsonl(path: Path) -> list[dict[str, Any]]:
     if not path.exists():
         return []
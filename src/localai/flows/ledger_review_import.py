@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+from typing import Any
+
+from localai.context import AppContext
+from localai.modules.ledger_manual_overrides import (
+    merge_override_records,
+    read_override_records,
+    write_override_records,
+)
+from localai.modules.ledger_review_importer import read_review_overrides
+
+
+logger = logging.getLogger(__name__)
+
+
+def run(
+    ctx: AppContext,
+    review_path: str | Path,
+    output_path: str | Path,
+    replace: bool = False,
+) -> dict[str, Any]:
+    """把校核 Excel 中的人工修正导入 manual_overrides.json；默认与已有修正合并，replace 为真时只保留本次导入。"""
+    review_file = ctx.resolve_path(review_path)
+    output_file = ctx.resolve_path(output_path)
+
+    imported, stats = read_review_overrides(review_file)
+    existing = [] if replace else read_override_records(output_file)
+    records = merge_override_records(existing, imported)
+    write_override_records(output_file, records)
+
+    summary = {
+        "review": str(review_file),
+        "output": str(output_file),
+        "imported_overrides": len(imported),
+        "existing_overrides": len(existing),
+        "total_overrides": len(records),
+        "replace": replace,
+        "stats": stats,
+    }
+    logger.info("Imported ledger review overrides: %s", summary)
+    return summary
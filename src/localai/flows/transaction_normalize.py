@@ -22,6 +22,8 @@ def run(
     attachment_manifest_path: str | Path,
     order_json_root: str | Path,
     order_platforms: list[str],
+    assign_links: bool = False,
+    aggregate_links: bool = False,
 ) -> dict[str, Any]:
     output_path = ctx.resolve_path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
@@ -48,6 +50,8 @@ def run(
     summary["results"]["financial_transactions"] = run_financial_normalize(
         ctx=ctx,
         output_dir=output_path,
+        assign_links=assign_links,
+        aggregate_links=aggregate_links,
     )
 
     summary_path = output_path / "normalized_summary.json"
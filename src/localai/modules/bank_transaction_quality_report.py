@@ -56,6 +56,18 @@ def build_quality_report(
     if failures:
         lines.extend(["", "## 附件解析失败", ""])
         lines.extend(f"- {item}" for item in failures)
+    unsupported = attachment_stats.get("unsupported_files", [])
+    if unsupported:
+        lines.extend(["", "## 未识别格式的附件", ""])
+        lines.extend(f"- {item}" for item in unsupported)
+    file_stats = sorted(attachment_stats.get("files", []), key=lambda item: -float(item.get("seconds", 0)))
+    if file_stats:
+        lines.extend(["", "## 附件解析耗时（前 20 个）", ""])
+        lines.extend(
+            f"- {item.get('seconds', 0):.3f}s parser={item.get('parser') or '-'} status={item.get('status')} "
+            f"transactions={item.get('transactions', 0)} file={item.get('file')}"
+            for item in file_stats[:20]
+        )
     if review_records:
         lines.extend(["", "## 需要人工复核的前 50 条", ""])
         for item in review_records:
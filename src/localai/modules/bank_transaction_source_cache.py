@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+
+
+SOURCE_CACHE_VERSION = 1
+
+
+class TransactionSourceCache:
+    """按源文件缓存解析出的流水，供增量归一化复用。
+
+    缓存键由源文件路径、内容 sha256、解析上下文（如提取清单条目）、解析代码指纹和缓存版本组成：
+    任一变化都会重新解析。调用方用 key() 对每个文件只算一次键，再分别传给 load() 和 store()。
+    每个源文件一份 JSON，本次运行未用到的条目由 prune() 清理。
+    reuse 为假（非增量运行）时既不读也不写、不清理，源文件也不做哈希：全量运行不为缓存付出代价，
+    已有条目按内容键保持有效，留给下一次增量运行；代价是首次增量运行前缓存是冷的。
+    """
+
+    def __init__(self, cache_dir: Path, code_fingerprint: str = "", reuse: bool = True) -> None:
+        self.cache_dir = cache_dir
+        self.code_fingerprint = code_fingerprint
+        self.reuse = reuse
+        self.hits = 0
+        self.misses = 0
+        self._touched: set[str] = set()
+
+    def key(self, path: Path, context: str = "") -> str | None:
+        """返回源文件的缓存键；不使用缓存或文件不可读时返回 None。"""
+        if not self.reuse:
+            return None
+        try:
+            content_hash = file_sha256(path)
+        except OSError:
+            return None
+        material = "\0".join([str(SOURCE_CACHE_VERSION), self.code_fingerprint, str(path), context, content_hash])
+        key = hashlib.sha256(material.encode("utf-8")).hexdigest()
+        self._touched.add(key)
+        return key
+
+    def load(self, key: str | None) -> tuple[list[dict[str, Any]], dict[str, Any]] | None:
+        if key is None:
+            self.misses += 1
+            return None
+        try:
+            data = json.loads((self.cache_dir / f"{key}.json").read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            self.misses += 1
+            return None
+        if not isinstance(data, dict) or not isinstance(data.get("transactions"), list):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return data["transactions"], data.get("stats", {})
+
+    def store(
+        self, key: str | None, path: Path, transactions: list[dict[str, Any]], stats: dict[str, Any]
+    ) -> None:
+        if key is None:
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        entry = {"source_file": str(path), "stats": stats, "transactions": transactions}
+        (self.cache_dir / f"{key}.json").write_text(json.dumps(entry, ensure_ascii=False), encoding="utf-8")
+
+    def prune(self) -> int:
+        if not self.reuse or not self.cache_dir.exists():
+            return 0
+        removed = 0
+        for entry_path in self.cache_dir.glob("*.json"):
+            if entry_path.stem not in self._touched:
+                entry_path.unlink()
+                removed += 1
+        return removed
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as file:
+        for block in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def code_fingerprint(*modules: ModuleType) -> str:
+    """解析代码指纹：模块源码任一改动都会让旧缓存失效。"""
+    digest = hashlib.sha256()
+    for module in modules:
+        source_file = getattr(module, "__file__", None)
+        if source_file and Path(source_file).exists():
+            digest.update(Path(source_file).read_bytes())
+    return digest.hexdigest()[:16]
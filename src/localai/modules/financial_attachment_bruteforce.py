@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+import time
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+
+CHUNK_SIZE = 5000
+PARALLEL_MIN_KEYSPACE = 20000
+# 已知密码总验证次数少于此值时不值得启动进程池。
+PARALLEL_MIN_KNOWN_CHECKS = 64
+
+
+@dataclass(frozen=True)
+class MaskProgress:
+    mask: str
+    checked: int
+    total: int
+    elapsed: float
+
+    @property
+    def rate(self) -> float:
+        return self.checked / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def eta_seconds(self) -> float:
+        rate = self.rate
+        return (self.total - self.checked) / rate if rate > 0 else 0.0
+
+
+ProgressCallback = Callable[[MaskProgress], None]
+
+
+class PasswordChecker:
+    """按附件类型准备一次的候选口令校验器。
+
+    ZIP 保持归档句柄，并先用传统加密的校验字节预筛，通过预筛才完整解密并校验 CRC；
+    WinZip AES 成员交给 pyzipper；PDF 只解析一次 /Encrypt，与 PdfReader.decrypt 一样接受用户口令或所有者口令。
+    """
+
+    def __init__(self, kind: str, path: Path) -> None:
+        self.kind = kind
+        self.path = path
+        self._archive: zipfile.ZipFile | None = None
+        self._member: zipfile.ZipInfo | None = None
+        self._zip_prefilter = None
+        self._pdf_security = None
+        if kind == "zip":
+            from localai.modules.financial_attachment_zipcrypto import ZipCryptoPrefilter
+
+            self._archive = zipfile.ZipFile(path)
+            members = [info for info in self._archive.infolist() if not info.is_dir()]
+            # 通过预筛的候选需要完整解密，选压缩后最小的成员以降低误通过的代价。
+            self._member = min(members, key=lambda info: info.compress_size, default=None)
+            self._zip_prefilter = ZipCryptoPrefilter.from_zip(path)
+        elif kind == "pdf":
+            from localai.modules.financial_attachment_pdf_security import PdfStandardSecurity
+
+            self._pdf_security = PdfStandardSecurity.from_pdf(path)
+
+    def __call__(self, password: str) -> bool:
+        if self.kind == "zip":
+            return self._check_zip(password)
+        if self.kind == "pdf":
+            if self._pdf_security is not None:
+                return self._pdf_security.check_password(password)
+            return _verify_pdf_with_reader(self.path, password)
+        return False
+
+    def close(self) -> None:
+        if self._archive is not None:
+            self._archive.close()
+            self._archive = None
+
+    def _check_zip(self, password: str) -> bool:
+        if self._archive is None or self._member is None:
+            return True
+        pwd = password.encode("utf-8")
+        if self._member.compress_type == 99:
+            return _verify_aes_zip_with_pyzipper(self.path, pwd)
+        if self._zip_prefilter is not None and not self._zip_prefilter.passes(pwd):
+            return False
+        try:
+            with self._archive.open(self._member, pwd=pwd) as source:
+                source.read()
+            return True
+        except Exception:
+            return False
+
+
+def resolve_worker_count(workers: int) -> int:
+    if workers and workers > 0:
+        return workers
+    return os.cpu_count() or 1
+
+
+def search_numeric_masks(
+    kind: str,
+    path: Path,
+    numeric_masks: list[tuple[str, int]],
+    workers: int = 0,
+    progress: ProgressCallback | None = None,
+) -> tuple[str, str] | None:
+    """按数字掩码穷举；键空间足够大时按块分配到多进程，任一进程命中即终止全部进程。"""
+    worker_count = resolve_worker_count(workers)
+    for mask, length in numeric_masks:
+        total = 10**length
+        if worker_count <= 1 or total < PARALLEL_MIN_KEYSPACE:
+            password = _search_inline(kind, path, mask, length, progress)
+        else:
+            password = _search_parallel(kind, path, mask, length, worker_count, progress)
+        if password is not None:
+            return password, mask
+    return None
+
+
+def match_known_passwords(
+    targets: list[tuple[str, Path]],
+    passwords: list[list[str]],
+    workers: int = 0,
+) -> list[str | None]:
+    """对每个目标按给定顺序试一组已知密码，返回首个可用密码；验证次数较多时目标之间按进程并行。"""
+    tasks = [(kind, str(path), list(candidates)) for (kind, path), candidates in zip(targets, passwords)]
+    worker_count = min(resolve_worker_count(workers), len(tasks))
+    if worker_count <= 1 or sum(len(task[2]) for task in tasks) < PARALLEL_MIN_KNOWN_CHECKS:
+        return [_match_target(task) for task in tasks]
+    with multiprocessing.get_context().Pool(processes=worker_count) as pool:
+        return pool.map(_match_target, tasks, chunksize=1)
+
+
+def _match_target(task: tuple[str, str, list[str]]) -> str | None:
+    kind, path, candidates = task
+    if not candidates:
+        return None
+    try:
+        checker = PasswordChecker(kind, Path(path))
+    except Exception:
+        return None
+    try:
+        for password in candidates:
+            if checker(password):
+                return password
+    finally:
+        checker.close()
+    return None
+
+
+def _search_inline(
+    kind: str, path: Path, mask: str, length: int, progress: ProgressCallback | None
+) -> str | None:
+    total = 10**length
+    started = time.monotonic()
+    checker = PasswordChecker(kind, path)
+    try:
+        for chunk_start in range(0, total, CHUNK_SIZE):
+            chunk_end = min(chunk_start + CHUNK_SIZE, total)
+            for number in range(chunk_start, chunk_end):
+                password = f"{number:0{length}d}"
+                if checker(password):
+                    return password
+            if progress is not None:
+                progress(MaskProgress(mask, chunk_end, total, time.monotonic() - started))
+    finally:
+        checker.close()
+    return None
+
+
+def _search_parallel(
+    kind: str, path: Path, mask: str, length: int, workers: int, progress: ProgressCallback | None
+) -> str | None:
+    total = 10**length
+    chunks = [(length, start, min(start + CHUNK_SIZE, total)) for start in range(0, total, CHUNK_SIZE)]
+    started = time.monotonic()
+    checked = 0
+    pool = multiprocessing.get_context().Pool(
+        processes=workers, initializer=_init_worker, initargs=(kind, str(path))
+    )
+    try:
+        for chunk_checked, password in pool.imap_unordered(_search_chunk, chunks):
+            if password is not None:
+                pool.terminate()
+                return password
+            checked += chunk_checked
+            if progress is not None:
+                progress(MaskProgress(mask, checked, total, time.monotonic() - started))
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+    return None
+
+
+_WORKER_CHECKER: PasswordChecker | None = None
+
+
+def _init_worker(kind: str, path: str) -> None:
+    global _WORKER_CHECKER
+    _WORKER_CHECKER = PasswordChecker(kind, Path(path))
+
+
+def _search_chunk(chunk: tuple[int, int, int]) -> tuple[int, str | None]:
+    length, start, end = chunk
+    checker = _WORKER_CHECKER
+    if checker is None:
+        return 0, None
+    for number in range(start, end):
+        password = f"{number:0{length}d}"
+        if checker(password):
+            return number - start + 1, password
+    return end - start, None
+
+
+def _verify_pdf_with_reader(path: Path, password: str) -> bool:
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        return False
+    try:
+        reader = PdfReader(str(path))
+        if not reader.is_encrypted:
+            return True
+        return bool(reader.decrypt(password))
+    except Exception:
+        return False
+
+
+def _verify_aes_zip_with_pyzipper(path: Path, pwd: bytes) -> bool:
+    try:
+        import pyzipper
+    except ImportError:
+        return False
+    try:
+        with pyzipper.AESZipFile(path) as archive:
+            archive.setpassword(pwd)
+            member = next((info for info in archive.infolist() if not info.is_dir()), None)
+            if member is None:
+                return True
+            with archive.open(member) as source:
+                source.read(1)
+            return True
+    except Exception:
+        return False
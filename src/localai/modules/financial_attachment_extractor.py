@@ -141,6 +141,7 @@ def _base_result(item: dict[str, Any], path: Path) -> dict[str, Any]:
         "bank_key": str(item.get("bank_key", "")),
         "subject": str(item.get("subject", "")),
         "sent_at": str(item.get("sent_at", "")),
+        "body_text_file": str(item.get("body_text_file", "")),
         "message_uid": str(item.get("message_uid", "")),
         "message_id": str(item.get("message_id", "")),
     }
@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+
+HASHCAT_EXIT_CRACKED = 0
+HASHCAT_EXIT_EXHAUSTED = 1
+
+
+@dataclass(frozen=True)
+class HashcatAttack:
+    name: str
+    attack_mode: int
+    argument: str
+
+    @classmethod
+    def wordlist(cls, path: Path) -> "HashcatAttack":
+        return cls(name=f"wordlist:{path.name}", attack_mode=0, argument=str(path))
+
+    @classmethod
+    def mask(cls, mask: str) -> "HashcatAttack":
+        return cls(name=mask, attack_mode=3, argument=mask)
+
+
+@dataclass(frozen=True)
+class HashcatJob:
+    mode: int
+    attack: HashcatAttack
+    hashes: tuple[str, ...]
+
+    @property
+    def session_name(self) -> str:
+        fingerprint = hashlib.sha1(
+            "\n".join([str(self.mode), self.attack.name, self.attack.argument, *sorted(self.hashes)]).encode("utf-8")
+        ).hexdigest()[:16]
+        return f"financial_attachment_m{self.mode}_{fingerprint}"
+
+
+@dataclass(frozen=True)
+class HashcatStatus:
+    session: str
+    status: int
+    progress: tuple[int, int]
+    recovered: tuple[int, int]
+    speed: int
+
+    @property
+    def percent(self) -> float:
+        done, total = self.progress
+        return done * 100 / total if total else 0.0
+
+
+@dataclass(frozen=True)
+class HashcatJobResult:
+    job: HashcatJob
+    returncode: int
+    restored: bool
+    cracked: dict[str, str]
+
+
+StatusCallback = Callable[[HashcatJob, HashcatStatus], None]
+
+
+class HashcatSessionRunner:
+    """一个 mode + 攻击方式一次 hashcat 会话：同 mode 的所有 hash 写入同一个 hash 文件。
+
+    会话名由 mode、攻击参数和 hash 集合指纹决定，中断后再次运行会检测到 .restore 文件并用
+    --restore 继续；进度来自 --status-json，结果从 --outfile 读取，不再单独调用 --show。
+    """
+
+    def __init__(
+        self,
+        hashcat: Path,
+        session_dir: Path,
+        workload: str,
+        extra_args: list[str],
+        status_timer: int = 30,
+        on_status: StatusCallback | None = None,
+    ) -> None:
+        self.hashcat = hashcat
+        self.session_dir = session_dir
+        self.workload = workload
+        self.extra_args = extra_args
+        self.status_timer = status_timer
+        self.on_status = on_status
+
+    def run(self, job: HashcatJob) -> HashcatJobResult:
+        self.session_dir.mkdir(parents=True, exist_ok=True)
+        paths = self._session_paths(job)
+        restored = paths["restore"].exists()
+        if restored:
+            cmd = [
+                str(self.hashcat),
+                "--session",
+                job.session_name,
+                "--restore",
+                "--restore-file-path",
+                str(paths["restore"]),
+            ]
+        else:
+            paths["hash"].write_text("\n".join(job.hashes) + "\n", encoding="utf-8")
+            cmd = self._attack_command(job, paths)
+        returncode = self._run_with_status(job, cmd)
+        return HashcatJobResult(
+            job=job,
+            returncode=returncode,
+            restored=restored,
+            cracked=read_outfile(paths["outfile"], job.hashes),
+        )
+
+    def _attack_command(self, job: HashcatJob, paths: dict[str, Path]) -> list[str]:
+        return [
+            str(self.hashcat),
+            *self.extra_args,
+            "-m",
+            str(job.mode),
+            "-a",
+            str(job.attack.attack_mode),
+            "-w",
+            self.workload,
+            "--session",
+            job.session_name,
+            "--restore-file-path",
+            str(paths["restore"]),
+            "--outfile",
+            str(paths["outfile"]),
+            "--outfile-format",
+            "1,2",
+            "--outfile-autohex-disable",
+            "--potfile-disable",
+            "--status",
+            "--status-json",
+            "--status-timer",
+            str(self.status_timer),
+            str(paths["hash"]),
+            job.attack.argument,
+        ]
+
+    def _run_with_status(self, job: HashcatJob, cmd: list[str]) -> int:
+        process = subprocess.Popen(
+            cmd,
+            cwd=self.hashcat.parent,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+        )
+        assert process.stdout is not None
+        for line in process.stdout:
+            status = parse_status_line(line)
+            if status is not None and self.on_status is not None:
+                self.on_status(job, status)
+        return process.wait()
+
+    def _session_paths(self, job: HashcatJob) -> dict[str, Path]:
+        stem = self.session_dir / job.session_name
+        return {
+            "hash": stem.with_suffix(".hashes"),
+            "outfile": stem.with_suffix(".out"),
+            "restore": stem.with_suffix(".restore"),
+        }
+
+
+def build_jobs(attack: HashcatAttack, hashes_by_mode: dict[int, list[str]]) -> list[HashcatJob]:
+    return [
+        HashcatJob(mode=mode, attack=attack, hashes=tuple(dict.fromkeys(hashes)))
+        for mode, hashes in hashes_by_mode.items()
+        if hashes
+    ]
+
+
+def run_job_queue(runner: HashcatSessionRunner, jobs: list[HashcatJob], parallel_jobs: int = 1) -> list[HashcatJobResult]:
+    if parallel_jobs <= 1 or len(jobs) <= 1:
+        return [runner.run(job) for job in jobs]
+    with ThreadPoolExecutor(max_workers=parallel_jobs) as executor:
+        return list(executor.map(runner.run, jobs))
+
+
+def parse_status_line(line: str) -> HashcatStatus | None:
+    text = line.strip()
+    if not text.startswith("{"):
+        return None
+    try:
+        data: Any = json.loads(text)
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    devices = data.get("devices") if isinstance(data.get("devices"), list) else []
+    return HashcatStatus(
+        session=str(data.get("session", "")),
+        status=int(data.get("status", 0) or 0),
+        progress=_int_pair(data.get("progress")),
+        recovered=_int_pair(data.get("recovered_hashes")),
+        speed=sum(int(device.get("speed", 0) or 0) for device in devices if isinstance(device, dict)),
+    )
+
+
+def read_outfile(path: Path, hashes: tuple[str, ...] | list[str]) -> dict[str, str]:
+    """outfile 每行是 hash:plain；按已知 hash 前缀匹配，口令中含冒号也能正确切分。"""
+    if not path.exists():
+        return {}
+    known = sorted(set(hashes), key=len, reverse=True)
+    cracked: dict[str, str] = {}
+    for line in path.read_text(encoding="utf-8", errors="replace").splitlines():
+        for hash_string in known:
+            if line.startswith(hash_string + ":"):
+                cracked.setdefault(hash_string, line[len(hash_string) + 1 :])
+                break
+    return cracked
+
+
+def _int_pair(value: Any) -> tuple[int, int]:
+    if isinstance(value, list) and len(value) >= 2:
+        try:
+            return int(value[0]), int(value[1])
+        except (TypeError, ValueError):
+            return 0, 0
+    return 0, 0
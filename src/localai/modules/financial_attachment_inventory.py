@@ -31,6 +31,7 @@ def build_attachment_inventory(records_file: Path, password_store: AttachmentPas
                     "message_id": str(record.get("message_id", "")),
                     "sent_at": str(record.get("sent_at", "")),
                     "subject": str(record.get("subject", "")),
+                    "body_text_file": str(record.get("body_text_file", "") or ""),
                     "exists": attachment_path.exists(),
                     "kind": _detect_kind(attachment_path),
                     "encrypted_status": _detect_encrypted_status(attachment_path),
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+from localai.modules.financial_email_parser import ACCOUNT_TAIL_RE
+
+
+DATE_RE = re.compile(r"(?<!\d)(20\d{6})(?!\d)")
+SIX_DIGIT_RE = re.compile(r"(?<!\d)(\d{6})(?!\d)")
+LONG_DIGIT_RE = re.compile(r"\d{8,24}")
+CARD_NUMBER_RE = re.compile(r"(?<!\d)(\d{12,19})(?!\d)")
+ID_CARD_RE = re.compile(r"^\d{17}[\dXx]$")
+
+
+@dataclass(frozen=True)
+class CandidateContext:
+    bank_key: str
+    filename: str
+    subject: str
+    sent_at: str
+    path: str
+    body_text: str = ""
+    hints: dict[str, list[str]] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class PasswordCandidate:
+    password: str
+    rule: str
+
+
+@dataclass(frozen=True)
+class CandidateRule:
+    name: str
+    priority: int
+    generate: Callable[[CandidateContext], Iterable[str]]
+
+
+def _id_card_candidates(context: CandidateContext) -> Iterable[str]:
+    for value in context.hints.get("id_card", []):
+        card = re.sub(r"\s", "", value).upper()
+        if not card:
+            continue
+        yield card[-6:]
+        if card.endswith("X"):
+            yield card[-6:].lower()
+            yield card[-7:-1]
+        yield card[-8:]
+        yield card
+
+
+def _birthday_candidates(context: CandidateContext) -> Iterable[str]:
+    birthdays = list(context.hints.get("birthday", []))
+    for value in context.hints.get("id_card", []):
+        card = re.sub(r"\s", "", value)
+        if ID_CARD_RE.match(card):
+            birthdays.append(card[6:14])
+    for value in birthdays:
+        digits = re.sub(r"\D", "", value)
+        if len(digits) != 8:
+            continue
+        year, month, day = digits[:4], digits[4:6], digits[6:8]
+        yield year[2:] + month + day
+        yield year + month + day
+        yield month + day
+        yield day + month + year[2:]
+        yield month + day + year[2:]
+        yield day + month + year
+        yield year + month
+
+
+def _phone_candidates(context: CandidateContext) -> Iterable[str]:
+    for value in context.hints.get("phone", []):
+        digits = re.sub(r"\D", "", value)
+        if len(digits) < 4:
+            continue
+        yield digits[-6:]
+        yield digits[-4:]
+        yield digits[-8:]
+        yield digits
+
+
+def _card_tail_candidates(context: CandidateContext) -> Iterable[str]:
+    texts = [context.body_text, context.subject, context.filename]
+    for text in texts:
+        for match in ACCOUNT_TAIL_RE.finditer(text):
+            yield match.group(1)
+        for match in CARD_NUMBER_RE.finditer(text):
+            yield match.group(1)[-6:]
+            yield match.group(1)[-4:]
+    for value in context.hints.get("card", []):
+        digits = re.sub(r"\D", "", value)
+        if len(digits) >= 4:
+            yield digits[-6:]
+            yield digits[-4:]
+
+
+def _attachment_date_candidates(context: CandidateContext) -> Iterable[str]:
+    text = " ".join([context.filename, context.subject, context.sent_at, context.path])
+    dates = DATE_RE.findall(text)
+    yield from dates
+    for date in dates:
+        yield date[2:]
+        yield date[4:]
+        yield date[-4:]
+
+
+def _attachment_digit_candidates(context: CandidateContext) -> Iterable[str]:
+    text = " ".join([context.filename, context.subject, context.sent_at, context.path])
+    yield from SIX_DIGIT_RE.findall(text)
+    for value in LONG_DIGIT_RE.findall(text):
+        yield value
+        yield value[-4:]
+        yield value[-6:]
+        yield value[-8:]
+
+
+CANDIDATE_RULES: tuple[CandidateRule, ...] = (
+    CandidateRule(name="id_card_tail", priority=10, generate=_id_card_candidates),
+    CandidateRule(name="birthday", priority=20, generate=_birthday_candidates),
+    CandidateRule(name="phone_tail", priority=30, generate=_phone_candidates),
+    CandidateRule(name="card_tail", priority=40, generate=_card_tail_candidates),
+    CandidateRule(name="attachment_date", priority=50, generate=_attachment_date_candidates),
+    CandidateRule(name="attachment_digits", priority=60, generate=_attachment_digit_candidates),
+)
+
+
+def generate_password_candidates(
+    context: CandidateContext,
+    rule_stats: dict[str, dict[str, int]] | None = None,
+    rules: tuple[CandidateRule, ...] = CANDIDATE_RULES,
+) -> list[PasswordCandidate]:
+    """按规则生成候选密码；同一 bank_key 历史命中越多的规则越靠前，其次看全局命中和规则优先级。"""
+    stats = rule_stats or {}
+    bank_stats = stats.get(context.bank_key, {}) if context.bank_key else {}
+    global_stats = _global_rule_stats(stats)
+    ordered_rules = sorted(
+        rules,
+        key=lambda rule: (-bank_stats.get(rule.name, 0), -global_stats.get(rule.name, 0), rule.priority),
+    )
+    seen: set[str] = set()
+    candidates: list[PasswordCandidate] = []
+    for rule in ordered_rules:
+        for value in rule.generate(context):
+            password = str(value).strip()
+            if not password or password in seen:
+                continue
+            seen.add(password)
+            candidates.append(PasswordCandidate(password=password, rule=rule.name))
+    return candidates
+
+
+def read_rule_stats(path: Path) -> dict[str, dict[str, int]]:
+    if not path.exists():
+        return {}
+    try:
+        data: Any = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    return {
+        str(bank_key): {str(rule): int(count) for rule, count in rules.items() if isinstance(count, int)}
+        for bank_key, rules in data.items()
+        if isinstance(rules, dict)
+    }
+
+
+def record_rule_successes(path: Path, successes: list[tuple[str, str]]) -> int:
+    """把 (bank_key, rule) 命中记录累加到统计文件，返回新增条数。"""
+    if not successes:
+        return 0
+    stats = read_rule_stats(path)
+    for bank_key, rule in successes:
+        bank_stats = stats.setdefault(bank_key or "unknown", {})
+        bank_stats[rule] = bank_stats.get(rule, 0) + 1
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(stats, ensure_ascii=False, indent=2, sort_keys=True), encoding="utf-8")
+    return len(successes)
+
+
+def _global_rule_stats(stats: dict[str, dict[str, int]]) -> dict[str, int]:
+    totals: dict[str, int] = {}
+    for rules in stats.values():
+        for rule, count in rules.items():
+            totals[rule] = totals.get(rule, 0) + count
+    return totals
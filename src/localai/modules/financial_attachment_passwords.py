@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import json
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
@@ -23,6 +23,7 @@ class AttachmentPasswordStore:
     by_filename: dict[str, list[str]]
     by_pattern: dict[str, list[str]]
     by_type: dict[str, list[str]]
+    hints: dict[str, list[str]] = field(default_factory=dict)
 
     @classmethod
     def from_env_file(cls, env_path: Path) -> "AttachmentPasswordStore":
@@ -33,6 +34,7 @@ class AttachmentPasswordStore:
             by_filename=_lower_keys(_json_password_map(values.get("FINANCIAL_ATTACHMENT_PASSWORD_BY_FILENAME_JSON", "{}"))),
             by_pattern=_json_password_map(values.get("FINANCIAL_ATTACHMENT_PASSWORD_BY_PATTERN_JSON", "{}")),
             by_type=_normalize_type_keys(_type_password_map(values)),
+            hints=_json_password_map(values.get("FINANCIAL_ATTACHMENT_PASSWORD_HINTS_JSON", "{}")),
         )
 
     def resolve(self, bank_key: str, attachment_path: str | Path) -> PasswordMatch | None:
@@ -0,0 +1,320 @@
+from __future__ import annotations
+
+import hashlib
+import struct
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
+from typing import Any, Callable
+
+
+PASSWORD_PADDING = bytes.fromhex("28bf4e5e4e758a4164004e56fffa01082e2e00b6d0683e802f0ca9fe6453697a")
+SUPPORTED_REVISIONS = {2, 3, 4, 5, 6}
+
+
+@dataclass(frozen=True)
+class PdfStandardSecurity:
+    """PDF 标准安全处理器的口令校验参数，只从 /Encrypt 字典解析一次。
+
+    校验时不再构造 PdfReader，直接按 ISO 32000 的 R2-R6 算法计算并比对 /U、/O。
+    """
+
+    revision: int
+    key_length: int
+    owner_entry: bytes
+    user_entry: bytes
+    permissions: int
+    document_id: bytes
+    encrypt_metadata: bool
+
+    @classmethod
+    def from_pdf(cls, path: Path) -> "PdfStandardSecurity | None":
+        loaded = _read_encrypt_dict(path)
+        if loaded is None:
+            return None
+        return cls.from_encrypt_dict(*loaded)
+
+    @classmethod
+    def from_encrypt_dict(cls, encrypt: Any, document_id: bytes) -> "PdfStandardSecurity | None":
+        if str(encrypt.get("/Filter", "")) != "/Standard":
+            return None
+        revision = int(encrypt.get("/R", 0))
+        if revision not in SUPPORTED_REVISIONS:
+            return None
+        if revision == 6 and _aes_cbc_provider() is None:
+            return None
+        return cls(
+            revision=revision,
+            key_length=_key_length(encrypt),
+            owner_entry=_pdf_bytes(encrypt.get("/O", b"")),
+            user_entry=_pdf_bytes(encrypt.get("/U", b"")),
+            permissions=int(encrypt.get("/P", 0)),
+            document_id=document_id,
+            encrypt_metadata=bool(encrypt.get("/EncryptMetadata", True)),
+        )
+
+    def check_password(self, password: str) -> bool:
+        """与 PdfReader.decrypt 一致：用户口令或所有者口令任一通过即视为可打开。"""
+        return self.check_user_password(password) or self.check_owner_password(password)
+
+    def check_user_password(self, password: str) -> bool:
+        if self.revision >= 5:
+            return self._check_aes256_user(_encode_password_r5(password))
+        return self._check_rc4_user(_pad_password(_encode_password_r4(password)))
+
+    def check_owner_password(self, password: str) -> bool:
+        if self.revision >= 5:
+            return self._check_aes256_owner(_encode_password_r5(password))
+        return self._check_rc4_owner(_pad_password(_encode_password_r4(password)))
+
+    @cached_property
+    def _rc4_key_suffix(self) -> bytes:
+        suffix = self.owner_entry[:32] + struct.pack("<I", self.permissions & 0xFFFFFFFF) + self.document_id
+        if self.revision >= 4 and not self.encrypt_metadata:
+            suffix += b"\xff\xff\xff\xff"
+        return suffix
+
+    @cached_property
+    def _rc4_user_check(self) -> bytes:
+        if self.revision == 2:
+            return self.user_entry[:32]
+        return self.user_entry[:16]
+
+    @cached_property
+    def _rc4_user_seed(self) -> bytes:
+        return hashlib.md5(PASSWORD_PADDING + self.document_id).digest()
+
+    def _check_rc4_user(self, padded_password: bytes) -> bool:
+        rc4 = _rc4_provider()
+        key_length = self.key_length
+        key = hashlib.md5(padded_password + self._rc4_key_suffix).digest()
+        if self.revision >= 3:
+            for _ in range(50):
+                key = hashlib.md5(key[:key_length]).digest()
+        key = key[:key_length]
+        if self.revision == 2:
+            return rc4(key, PASSWORD_PADDING) == self._rc4_user_check
+        value = self._rc4_user_seed
+        for index in range(20):
+            value = rc4(_xor_key(key, index), value)
+        return value == self._rc4_user_check
+
+    def _check_rc4_owner(self, padded_password: bytes) -> bool:
+        rc4 = _rc4_provider()
+        key = hashlib.md5(padded_password).digest()
+        if self.revision >= 3:
+            for _ in range(50):
+                key = hashlib.md5(key).digest()
+        key = key[: self.key_length]
+        value = self.owner_entry[:32]
+        if self.revision == 2:
+            value = rc4(key, value)
+        else:
+            for index in range(19, -1, -1):
+                value = rc4(_xor_key(key, index), value)
+        return self._check_rc4_user(value)
+
+    def _check_aes256_user(self, password: bytes) -> bool:
+        validation_salt = self.user_entry[32:40]
+        return self._aes256_hash(password, validation_salt, b"") == self.user_entry[:32]
+
+    def _check_aes256_owner(self, password: bytes) -> bool:
+        validation_salt = self.owner_entry[32:40]
+        return self._aes256_hash(password, validation_salt, self.user_entry[:48]) == self.owner_entry[:32]
+
+    def _aes256_hash(self, password: bytes, salt: bytes, user_data: bytes) -> bytes:
+        digest = hashlib.sha256(password + salt + user_data).digest()
+        if self.revision == 5:
+            return digest
+        return _hash_r6(password, digest, user_data)
+
+
+def extract_pdf_hash(path: Path) -> str:
+    """直接从 /Encrypt 生成 hashcat 10400-10700 / john 通用的 $pdf$ hash，不再调用 pdf2john.pl。"""
+    loaded = _read_encrypt_dict(path)
+    if loaded is None:
+        return ""
+    encrypt, document_id = loaded
+    if str(encrypt.get("/Filter", "")) != "/Standard":
+        return ""
+    revision = int(encrypt.get("/R", 0))
+    if revision not in SUPPORTED_REVISIONS:
+        return ""
+    # R2-R4 的 /U、/O 取前 32 字节；R5/R6 含 8 字节校验盐和 8 字节密钥盐，共 48 字节。
+    entry_length = 32 if revision <= 4 else 48
+    user_entry = _pdf_bytes(encrypt.get("/U", b""))[:entry_length]
+    owner_entry = _pdf_bytes(encrypt.get("/O", b""))[:entry_length]
+    permissions = struct.unpack("<i", struct.pack("<I", int(encrypt.get("/P", 0)) & 0xFFFFFFFF))[0]
+    fields = [
+        int(encrypt.get("/V", 0)),
+        revision,
+        _key_length(encrypt) * 8,
+        permissions,
+        int(bool(encrypt.get("/EncryptMetadata", True))),
+        len(document_id),
+        document_id.hex(),
+        len(user_entry),
+        user_entry.hex(),
+        len(owner_entry),
+        owner_entry.hex(),
+    ]
+    return "$pdf$" + "*".join(str(field) for field in fields)
+
+
+def _read_encrypt_dict(path: Path) -> tuple[Any, bytes] | None:
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        return None
+    try:
+        reader = PdfReader(str(path))
+        if not reader.is_encrypted:
+            return None
+        encrypt = reader.trailer["/Encrypt"].get_object()
+        id_entry = reader.trailer.get("/ID")
+        document_id = _pdf_bytes(id_entry.get_object()[0]) if id_entry else b""
+    except Exception:
+        return None
+    return encrypt, document_id
+
+
+def _hash_r6(password: bytes, digest: bytes, user_data: bytes) -> bytes:
+    aes_cbc = _aes_cbc_provider()
+    assert aes_cbc is not None
+    hash_functions = (hashlib.sha256, hashlib.sha384, hashlib.sha512)
+    round_index = 0
+    while True:
+        block = (password + digest + user_data) * 64
+        encrypted = aes_cbc(digest[:16], digest[16:32], block)
+        # 前 16 字节按大端整数取模 3，等价于逐字节求和取模 3（256 ≡ 1 mod 3）。
+        digest = hash_functions[sum(encrypted[:16]) % 3](encrypted).digest()
+        round_index += 1
+        if round_index >= 64 and encrypted[-1] <= round_index - 32:
+            return digest[:32]
+
+
+def _key_length(encrypt: Any) -> int:
+    version = int(encrypt.get("/V", 0))
+    if version in {0, 1}:
+        return 5
+    if version == 4:
+        crypt_filter = encrypt.get("/CF", {}).get(str(encrypt.get("/StmF", "/StdCF")), {})
+        length = int(crypt_filter.get("/Length", 16)) if hasattr(crypt_filter, "get") else 16
+        return length if length <= 32 else length // 8
+    if version >= 5:
+        return 32
+    return int(encrypt.get("/Length", 40)) // 8
+
+
+def _pdf_bytes(value: Any) -> bytes:
+    value = value.get_object() if hasattr(value, "get_object") else value
+    original = getattr(value, "original_bytes", None)
+    if original is not None:
+        return bytes(original)
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value)
+    return str(value).encode("latin-1", errors="ignore")
+
+
+def _encode_password_r4(password: str) -> bytes:
+    try:
+        return password.encode("latin-1")
+    except UnicodeEncodeError:
+        return password.encode("utf-8")
+
+
+def _encode_password_r5(password: str) -> bytes:
+    return password.encode("utf-8")[:127]
+
+
+def _pad_password(password: bytes) -> bytes:
+    return (password + PASSWORD_PADDING)[:32]
+
+
+def _xor_key(key: bytes, value: int) -> bytes:
+    if value == 0:
+        return key
+    return bytes(byte ^ value for byte in key)
+
+
+_RC4: Callable[[bytes, bytes], bytes] | None = None
+_AES_CBC: Callable[[bytes, bytes, bytes], bytes] | None = None
+_AES_CBC_RESOLVED = False
+
+
+def _rc4_provider() -> Callable[[bytes, bytes], bytes]:
+    global _RC4
+    if _RC4 is not None:
+        return _RC4
+    try:
+        from Cryptodome.Cipher import ARC4
+    except ImportError:
+        try:
+            from Crypto.Cipher import ARC4
+        except ImportError:
+            ARC4 = None
+    if ARC4 is not None:
+        cipher = ARC4
+
+        def _rc4_native(key: bytes, data: bytes) -> bytes:
+            return cipher.new(key).encrypt(data)
+
+        _RC4 = _rc4_native
+    else:
+        _RC4 = _rc4_python
+    return _RC4
+
+
+def _aes_cbc_provider() -> Callable[[bytes, bytes, bytes], bytes] | None:
+    global _AES_CBC, _AES_CBC_RESOLVED
+    if _AES_CBC_RESOLVED:
+        return _AES_CBC
+    _AES_CBC_RESOLVED = True
+    try:
+        from Cryptodome.Cipher import AES
+    except ImportError:
+        try:
+            from Crypto.Cipher import AES
+        except ImportError:
+            AES = None
+    if AES is not None:
+        cipher = AES
+
+        def _aes_cbc_native(key: bytes, iv: bytes, data: bytes) -> bytes:
+            return cipher.new(key, cipher.MODE_CBC, iv).encrypt(data)
+
+        _AES_CBC = _aes_cbc_native
+        return _AES_CBC
+    try:
+        from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+    except ImportError:
+        return None
+
+    def _aes_cbc_cryptography(key: bytes, iv: bytes, data: bytes) -> bytes:
+        encryptor = Cipher(algorithms.AES(key), modes.CBC(iv)).encryptor()
+        return encryptor.update(data) + encryptor.finalize()
+
+    _AES_CBC = _aes_cbc_cryptography
+    return _AES_CBC
+
+
+def _rc4_python(key: bytes, data: bytes) -> bytes:
+    state = list(range(256))
+    repeated_key = (key * (256 // len(key) + 1))[:256]
+    j = 0
+    for i in range(256):
+        value = state[i]
+        j = (j + value + repeated_key[i]) & 0xFF
+        state[i] = state[j]
+        state[j] = value
+    output = bytearray(data)
+    i = j = 0
+    for index in range(len(output)):
+        i = (i + 1) & 0xFF
+        value = state[i]
+        j = (j + value) & 0xFF
+        other = state[j]
+        state[i] = other
+        state[j] = value
+        output[index] ^= state[(value + other) & 0xFF]
+    return bytes(output)
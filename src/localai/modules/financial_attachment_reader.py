@@ -1,59 +1,250 @@
 from __future__ import annotations
 
+import codecs
+import hashlib
 import json
 import csv
+import multiprocessing
+import os
 import re
-from io import StringIO
+import time
+from dataclasses import dataclass
+from itertools import chain
 from pathlib import Path
-from typing import Any
+from typing import Any, BinaryIO, Callable, Iterable, Iterator, TextIO
 
 from localai.modules.bank_transaction_schema import make_transaction, parse_money_token
+from localai.modules.bank_transaction_source_cache import TransactionSourceCache
 
 
 DATE_LINE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
 TIME_RE = re.compile(r"^\d{2}:\d{2}:\d{2}$")
 ACCOUNT_RE = re.compile(r"(?:卡号|账号|卡号/账号)[:： ]*([0-9*]{4,})")
 CARD_TAIL_RE = re.compile(r"\(([0-9*]{4,})\)")
+ICBC_PDF_DATE_LINE_RE = re.compile(r"(?m)^\s*\d{4}-\d{2}-\d{2}\s*$")
+ALIPAY_CSV_HEADERS = ("交易时间", "交易分类", "交易对方", "收/支", "金额")
+MEITUAN_CSV_HEADERS = ("交易创建时间", "交易成功时间", "订单标题", "收/支", "实付金额")
+CCB_XLS_HEADERS = ("交易日期", "交易金额")
+STATEMENT_SNIFF_XLS_ROWS = 30
 SIGNED_AMOUNT_RE = re.compile(r"^[+-]\d{1,3}(?:,\d{3})*(?:\.\d{2})$|^[+-]\d+(?:\.\d{2})$")
+PDF_PARALLEL_MIN_PAGES = 8
+PDF_PAGES_PER_TASK = 4
+CSV_ENCODINGS = ("utf-8-sig", "gb18030", "gbk", "utf-16", "latin1")
+CSV_SAMPLE_BYTES = 64 * 1024
+NON_CJK_RE = re.compile(r"[^\u4e00-\u9fff]+")
+PDF_TEXT_CACHE_SUFFIX = ".pages.json"
+# 缓存的是 _fix_mojibake 之后的页文本；修复逻辑或缓存格式变化时递增，旧缓存自动失效。
+PDF_TEXT_CACHE_VERSION = 1
+
+
+@dataclass(frozen=True)
+class StatementReadOptions:
+    pdf_workers: int = 1
+    use_text_cache: bool = True
+    xls_on_demand: bool = True
+
+
+@dataclass(frozen=True)
+class StatementSniff:
+    """一次廉价嗅探的结果；选中的解析器复用其中已算好的编码、缓存键和页文本，不再重复计算。
+
+    header_rows 是解析器会当作表头的行（CSV 为第一条含“交易时间/交易创建时间”的行，XLS 为各表前几行）拆出的单元格集合；
+    pdf_pages 是修复乱码后的页文本，命中 .pages.json 缓存时为全部页（pdf_pages_complete），否则只有首页。
+    """
+
+    path: Path
+    suffix: str
+    text: str = ""
+    header_rows: tuple[frozenset[str], ...] = ()
+    csv_encoding: tuple[str, bool] | None = None
+    pdf_cache_key: dict[str, Any] | None = None
+    pdf_pages: tuple[str, ...] = ()
+    pdf_pages_complete: bool = False
+
+
+StatementParse = Callable[[Path, dict[str, Any], StatementReadOptions, StatementSniff], Iterable[dict[str, Any]]]
+
+
+@dataclass(frozen=True)
+class StatementParser:
+    """一种流水文件格式的签名和解析函数。
+
+    签名只看后缀、表头字段（全部出现在同一表头行的单元格中）和首页标记（任一出现，可为正则）；
+    匹配在一次廉价嗅探（CSV 开头样本、PDF 首页、XLS 各表前几行）上完成，不匹配的文件不做完整解析。
+    """
+
+    name: str
+    suffixes: tuple[str, ...]
+    parse: StatementParse
+    header_tokens: tuple[str, ...] = ()
+    first_page_markers: tuple[str | re.Pattern[str], ...] = ()
+
+    def matches(self, sniff: StatementSniff) -> bool:
+        if sniff.suffix not in self.suffixes:
+            return False
+        if self.header_tokens and not any(row.issuperset(self.header_tokens) for row in sniff.header_rows):
+            return False
+        if not self.first_page_markers:
+            return True
+        return any(
+            marker.search(sniff.text) if isinstance(marker, re.Pattern) else marker in sniff.text
+            for marker in self.first_page_markers
+        )
+
+
+STATEMENT_PARSERS: list[StatementParser] = []
+
+
+def register_statement_parser(parser: StatementParser) -> StatementParser:
+    """登记一种流水格式，先登记的优先匹配；新增银行格式只需实现 parse 并登记签名。"""
+    STATEMENT_PARSERS.append(parser)
+    return parser
+
+
+def sniff_statement(path: Path, options: StatementReadOptions) -> StatementSniff | None:
+    suffix = path.suffix.lower()
+    sniffer = STATEMENT_SNIFFERS.get(suffix)
+    if sniffer is None or not any(suffix in parser.suffixes for parser in STATEMENT_PARSERS):
+        return None
+    return sniffer(path, options)
+
 
+def select_statement_parser(sniff: StatementSniff) -> StatementParser | None:
+    return next((parser for parser in STATEMENT_PARSERS if parser.matches(sniff)), None)
 
-def read_attachment_transactions(manifest_path: Path) -> tuple[list[dict[str, Any]], dict[str, Any]]:
+
+def read_attachment_transactions(
+    manifest_path: Path,
+    pdf_workers: int = 1,
+    use_text_cache: bool = True,
+    file_workers: int = 1,
+    source_cache: TransactionSourceCache | None = None,
+) -> tuple[list[dict[str, Any]], dict[str, Any]]:
+    """读取提取清单中的全部附件流水。
+
+    file_workers 不为 1 时按文件分给进程池并行解析（0 表示全部核心），结果仍按清单顺序合并；
+    此时单个 PDF 不再分页并行，避免进程池嵌套。每个文件的解析器、耗时和流水数写入 stats["files"]。
+    传入 source_cache 时，内容和清单条目都没变的文件直接复用上次解析结果，只解析新增或变化的文件。
+    """
     if not manifest_path.exists():
-        return [], {"manifest_exists": False, "files_seen": 0, "transactions": 0, "parse_failures": []}
+        return [], {
+            "manifest_exists": False,
+            "files_seen": 0,
+            "transactions": 0,
+            "parse_failures": [],
+            "unsupported_files": [],
+            "parsers": {},
+            "files": [],
+        }
     manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    tasks = [
+        (output_file, item)
+        for item in manifest
+        if item.get("status") == "success"
+        for output_file in item.get("output_files", [])
+    ]
+    results: list[tuple[list[dict[str, Any]], dict[str, Any]] | None] = [None] * len(tasks)
+    cache_keys: list[str | None] = [None] * len(tasks)
+    if source_cache is not None:
+        for index, (output_file, item) in enumerate(tasks):
+            cache_keys[index] = source_cache.key(Path(output_file), _manifest_cache_context(item))
+            cached = source_cache.load(cache_keys[index])
+            if cached is not None:
+                results[index] = (cached[0], {**cached[1], "cached": True})
+    pending = [index for index, result in enumerate(results) if result is None]
+    worker_count = min(file_workers if file_workers > 0 else os.cpu_count() or 1, len(pending))
+    if worker_count <= 1:
+        options = StatementReadOptions(pdf_workers=pdf_workers, use_text_cache=use_text_cache)
+        parsed = [_read_statement_file(*tasks[index], options) for index in pending]
+    else:
+        options = StatementReadOptions(pdf_workers=1, use_text_cache=use_text_cache)
+        with multiprocessing.get_context().Pool(processes=worker_count) as pool:
+            parsed = pool.starmap(_read_statement_file, [(*tasks[index], options) for index in pending], chunksize=1)
+    for index, result in zip(pending, parsed):
+        results[index] = result
+        # 解析失败可能是临时问题（文件被占用等），不缓存，下次重试。
+        if source_cache is not None and result[1]["status"] != "failed":
+            source_cache.store(cache_keys[index], Path(tasks[index][0]), result[0], result[1])
+
     transactions: list[dict[str, Any]] = []
     failures: list[str] = []
-    files_seen = 0
-    for item in manifest:
-        if item.get("status") != "success":
-            continue
-        for output_file in item.get("output_files", []):
-            files_seen += 1
-            path = Path(output_file)
-            try:
-                if path.suffix.lower() == ".pdf":
-                    transactions.extend(_read_pdf_transactions(path, item))
-                elif path.suffix.lower() == ".xls":
-                    transactions.extend(_read_xls_transactions(path, item))
-                elif path.suffix.lower() == ".csv":
-                    transactions.extend(_read_csv_transactions(path, item))
-            except Exception as exc:
-                failures.append(f"{path}: {exc}")
-    return transactions, {"manifest_exists": True, "files_seen": files_seen, "transactions": len(transactions), "parse_failures": failures}
-
-
-def _read_pdf_transactions(path: Path, manifest_item: dict[str, Any]) -> list[dict[str, Any]]:
-    from pypdf import PdfReader
+    unsupported: list[str] = []
+    parser_counts: dict[str, int] = {}
+    file_stats: list[dict[str, Any]] = []
+    for file_transactions, file_stat in filter(None, results):
+        transactions.extend(file_transactions)
+        file_stats.append(file_stat)
+        if file_stat["status"] == "failed":
+            failures.append(f"{file_stat['file']}: {file_stat['error']}")
+        elif file_stat["status"] == "unsupported":
+            unsupported.append(file_stat["file"])
+        elif file_stat["parser"]:
+            parser_counts[file_stat["parser"]] = parser_counts.get(file_stat["parser"], 0) + 1
+    return transactions, {
+        "manifest_exists": True,
+        "files_seen": len(tasks),
+        "transactions": len(transactions),
+        "parse_failures": failures,
+        "unsupported_files": unsupported,
+        "parsers": parser_counts,
+        "files": file_stats,
+    }
+
+
+def _read_statement_file(
+    output_file: str, manifest_item: dict[str, Any], options: StatementReadOptions
+) -> tuple[list[dict[str, Any]], dict[str, Any]]:
+    """解析单个附件，交易收集为列表返回；解析器可以是生成器，但不会流式传到这里之外。"""
+    path = Path(output_file)
+    started = time.perf_counter()
+    file_stat: dict[str, Any] = {"file": str(path), "parser": "", "status": "skipped", "transactions": 0}
+    transactions: list[dict[str, Any]] = []
+    try:
+        sniff = sniff_statement(path, options)
+        parser = select_statement_parser(sniff) if sniff is not None else None
+        if parser is None:
+            if path.suffix.lower() in STATEMENT_SNIFFERS:
+                file_stat["status"] = "unsupported"
+        else:
+            file_stat["parser"] = parser.name
+            transactions = list(parser.parse(path, manifest_item, options, sniff))
+            file_stat["status"] = "success"
+            file_stat["transactions"] = len(transactions)
+    except Exception as exc:
+        transactions = []
+        file_stat["status"] = "failed"
+        file_stat["error"] = str(exc)
+    file_stat["seconds"] = round(time.perf_counter() - started, 3)
+    return transactions, file_stat
+
+
+def _manifest_cache_context(manifest_item: dict[str, Any]) -> str:
+    return json.dumps(manifest_item, ensure_ascii=False, sort_keys=True, default=str)
+
+
+def _read_icbc_pdf_transactions(
+    path: Path, manifest_item: dict[str, Any], options: StatementReadOptions, sniff: StatementSniff | None = None
+) -> list[dict[str, Any]]:
+    return _read_pdf_transactions(
+        path, manifest_item, workers=options.pdf_workers, use_text_cache=options.use_text_cache, sniff=sniff
+    )
 
-    reader = PdfReader(str(path))
-    text = "\n".join(_fix_mojibake(page.extract_text() or "") for page in reader.pages)
-    lines = [line.strip() for line in text.splitlines() if line.strip()]
-    account_tail = _account_tail_from_lines(lines)
+
+def _read_pdf_transactions(
+    path: Path,
+    manifest_item: dict[str, Any],
+    workers: int = 1,
+    use_text_cache: bool = True,
+    sniff: StatementSniff | None = None,
+) -> list[dict[str, Any]]:
+    page_lines = _read_pdf_page_lines(path, workers, use_text_cache, sniff)
+    account_tail = _account_tail_from_lines([line for _, line in page_lines[:20]])
     transactions: list[dict[str, Any]] = []
-    for index, line in enumerate(lines[:-1]):
+    # 按页保留行号后整体扫描：日期在上一页末行、明细在下一页首行时也能配对。
+    for index, (page, line) in enumerate(page_lines[:-1]):
         if not DATE_LINE_RE.match(line):
             continue
-        next_line = lines[index + 1]
+        next_page, next_line = page_lines[index + 1]
         if not TIME_RE.match(next_line.split()[0] if next_line.split() else ""):
             continue
         tx = _parse_icbc_pdf_line(
@@ -62,129 +253,281 @@ def _read_pdf_transactions(path: Path, manifest_item: dict[str, Any]) -> list[di
             account_tail=account_tail,
             path=path,
             manifest_item=manifest_item,
-            page_hint="",
+            page_hint=str(page) if next_page == page else f"{page}-{next_page}",
         )
         if tx is not None:
             transactions.append(tx)
     return transactions
 
 
-def _read_csv_transactions(path: Path, manifest_item: dict[str, Any]) -> list[dict[str, Any]]:
-    text = _read_csv_text(path)
-    rows = _read_dict_rows_from_text(text)
-    if not rows:
-        return []
-    headers = set(rows[0])
-    if {"交易时间", "交易分类", "交易对方", "收/支", "金额"}.issubset(headers):
-        return _read_alipay_csv_rows(path, manifest_item, rows)
-    if {"交易创建时间", "交易成功时间", "订单标题", "收/支", "实付金额"}.issubset(headers):
-        return _read_meituan_csv_rows(path, manifest_item, rows)
-    return []
+def _read_pdf_page_lines(
+    path: Path, workers: int = 1, use_text_cache: bool = True, sniff: StatementSniff | None = None
+) -> list[tuple[int, str]]:
+    page_lines: list[tuple[int, str]] = []
+    for page_number, text in enumerate(_read_pdf_page_texts(path, workers, use_text_cache, sniff), start=1):
+        for line in text.splitlines():
+            if line.strip():
+                page_lines.append((page_number, line.strip()))
+    return page_lines
+
+
+def _read_pdf_page_texts(
+    path: Path, workers: int = 1, use_text_cache: bool = True, sniff: StatementSniff | None = None
+) -> list[str]:
+    """读取修复乱码后的页文本；旁路缓存 <pdf>.pages.json 按文件 sha256 和 pypdf 版本失效。
+
+    传入嗅探结果时，缓存已在嗅探中按同样的 use_text_cache 查过：直接复用其缓存键和首页文本，不再重复哈希和提取首页。
+    """
+    cache_path = path.with_name(path.name + PDF_TEXT_CACHE_SUFFIX)
+    first_pages: list[str] = []
+    if sniff is not None:
+        if sniff.pdf_pages_complete:
+            return list(sniff.pdf_pages)
+        cache_key = sniff.pdf_cache_key
+        first_pages = list(sniff.pdf_pages[:1])
+    else:
+        cache_key = _pdf_text_cache_key(path) if use_text_cache else None
+        if cache_key is not None:
+            cached = _load_pdf_text_cache(cache_path, cache_key)
+            if cached is not None:
+                return cached
+    texts = first_pages + [
+        _fix_mojibake(text) for text in _extract_pdf_page_texts(path, workers, start=len(first_pages))
+    ]
+    if cache_key is not None:
+        try:
+            cache_path.write_text(json.dumps({**cache_key, "pages": texts}, ensure_ascii=False), encoding="utf-8")
+        except OSError:
+            pass
+    return texts
+
+
+def _pdf_text_cache_key(path: Path) -> dict[str, Any]:
+    import pypdf
+
+    digest = hashlib.sha256()
+    with path.open("rb") as file:
+        for block in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(block)
+    return {"sha256": digest.hexdigest(), "pypdf_version": pypdf.__version__, "cache_version": PDF_TEXT_CACHE_VERSION}
+
+
+def _load_pdf_text_cache(cache_path: Path, cache_key: dict[str, Any]) -> list[str] | None:
+    if not cache_path.exists():
+        return None
+    try:
+        data = json.loads(cache_path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+    if not isinstance(data, dict) or any(data.get(key) != value for key, value in cache_key.items()):
+        return None
+    pages = data.get("pages")
+    if not isinstance(pages, list) or not all(isinstance(page, str) for page in pages):
+        return None
+    return pages
+
+
+def _extract_pdf_page_texts(path: Path, workers: int = 1, start: int = 0) -> list[str]:
+    """从第 start 页（0 起）开始逐页提取文本；workers 不为 1（0 表示全部核心）且页数较多时按页段分给多个进程，每个进程各自打开 PDF。
+
+    进程池启动有固定开销（Windows 下每个进程要重新导入模块），默认不并行，只在确有大 PDF 时由调用方开启。
+    """
+    from pypdf import PdfReader
+
+    reader = PdfReader(str(path))
+    page_count = len(reader.pages)
+    remaining = page_count - start
+    worker_count = min(workers if workers > 0 else os.cpu_count() or 1, -(-remaining // PDF_PAGES_PER_TASK))
+    if worker_count <= 1 or remaining < PDF_PARALLEL_MIN_PAGES:
+        return [reader.pages[index].extract_text() or "" for index in range(start, page_count)]
+    tasks = [
+        (str(path), first, min(first + PDF_PAGES_PER_TASK, page_count))
+        for first in range(start, page_count, PDF_PAGES_PER_TASK)
+    ]
+    with multiprocessing.get_context().Pool(processes=worker_count) as pool:
+        chunks = pool.map(_extract_pdf_page_range, tasks)
+    return [text for chunk in chunks for text in chunk]
+
+
+def _extract_pdf_page_range(task: tuple[str, int, int]) -> list[str]:
+    from pypdf import PdfReader
+
+    path, start, end = task
+    reader = PdfReader(path)
+    return [reader.pages[index].extract_text() or "" for index in range(start, end)]
+
+
+def _iter_alipay_csv_transactions(
+    path: Path, manifest_item: dict[str, Any], options: StatementReadOptions, sniff: StatementSniff | None = None
+) -> Iterator[dict[str, Any]]:
+    rows = _iter_csv_file_rows(path, ALIPAY_CSV_HEADERS, sniff.csv_encoding if sniff is not None else None)
+    yield from _read_alipay_csv_rows(path, manifest_item, rows)
+
+
+def _iter_meituan_csv_transactions(
+    path: Path, manifest_item: dict[str, Any], options: StatementReadOptions, sniff: StatementSniff | None = None
+) -> Iterator[dict[str, Any]]:
+    rows = _iter_csv_file_rows(path, MEITUAN_CSV_HEADERS, sniff.csv_encoding if sniff is not None else None)
+    yield from _read_meituan_csv_rows(path, manifest_item, rows)
+
+
+def _iter_csv_file_rows(
+    path: Path, required_headers: tuple[str, ...], detected: tuple[str, bool] | None = None
+) -> Iterator[dict[str, str]]:
+    """从文件句柄流式读取：定位表头后逐行产出行字典，大导出文件不整体解码进内存。
+
+    流式只到解析器为止：_read_statement_file 会把交易收集成列表（进程池返回、源文件缓存和整体去重都需要完整列表），
+    省下的是整文件解码后的文本、拆分的行和中间的行字典列表。
+    """
+    detected = detected or _detect_csv_encoding(path)
+    if detected is None:
+        return
+    encoding, fix_mojibake = detected
+    with path.open(encoding=encoding, newline="") as file:
+        headers, rows = _iter_csv_dict_rows(_iter_csv_lines(file, fix_mojibake))
+        if set(required_headers).issubset(headers):
+            yield from rows
 
 
 def _read_alipay_csv_rows(
-    path: Path, manifest_item: dict[str, Any], rows: list[dict[str, str]]
-) -> list[dict[str, Any]]:
-    transactions: list[dict[str, Any]] = []
+    path: Path, manifest_item: dict[str, Any], rows: Iterable[dict[str, str]]
+) -> Iterator[dict[str, Any]]:
     for row_index, row in enumerate(rows, start=1):
         amount = _clean_money(row.get("金额", ""))
         if not parse_money_token(amount):
             continue
         direction = _direction_from_cn(row.get("收/支", ""))
-        transactions.append(
-            make_transaction(
-                bank_key="alipay",
-                bank_name="支付宝",
-                account_tail=_account_tail_from_text(row.get("收/付款方式", "")),
-                transaction_time=row.get("交易时间", "").strip(),
-                direction=direction,
-                amount=amount,
-                merchant=row.get("交易对方", "").strip(),
-                counterparty=row.get("交易对方", "").strip(),
-                summary=row.get("商品说明", "").strip() or row.get("交易分类", "").strip(),
-                channel=row.get("收/付款方式", "").strip(),
-                transaction_reference=row.get("交易订单号", "").strip(),
-                source_records=[
-                    {
-                        "source_type": "email_attachment_csv",
-                        "source_file": str(path),
-                        "message_uid": manifest_item.get("message_uid", ""),
-                        "message_id": manifest_item.get("message_id", ""),
-                        "row": row_index,
-                    }
-                ],
-                confidence=0.9,
-                raw_record=row,
-            )
+        yield make_transaction(
+            bank_key="alipay",
+            bank_name="支付宝",
+            account_tail=_account_tail_from_text(row.get("收/付款方式", "")),
+            transaction_time=row.get("交易时间", "").strip(),
+            direction=direction,
+            amount=amount,
+            merchant=row.get("交易对方", "").strip(),
+            counterparty=row.get("交易对方", "").strip(),
+            summary=row.get("商品说明", "").strip() or row.get("交易分类", "").strip(),
+            channel=row.get("收/付款方式", "").strip(),
+            transaction_reference=row.get("交易订单号", "").strip(),
+            source_records=[
+                {
+                    "source_type": "email_attachment_csv",
+                    "source_file": str(path),
+                    "message_uid": manifest_item.get("message_uid", ""),
+                    "message_id": manifest_item.get("message_id", ""),
+                    "row": row_index,
+                }
+            ],
+            confidence=0.9,
+            raw_record=row,
         )
-    return transactions
 
 
 def _read_meituan_csv_rows(
-    path: Path, manifest_item: dict[str, Any], rows: list[dict[str, str]]
-) -> list[dict[str, Any]]:
-    transactions: list[dict[str, Any]] = []
+    path: Path, manifest_item: dict[str, Any], rows: Iterable[dict[str, str]]
+) -> Iterator[dict[str, Any]]:
     for row_index, row in enumerate(rows, start=1):
         amount = _clean_money(row.get("实付金额", "") or row.get("订单金额", ""))
         if not parse_money_token(amount):
             continue
-        transactions.append(
-            make_transaction(
-                bank_key="meituan",
-                bank_name="美团",
-                account_tail=_account_tail_from_text(row.get("支付方式", "")),
-                transaction_time=(row.get("交易成功时间", "") or row.get("交易创建时间", "")).strip(),
-                direction=_direction_from_cn(row.get("收/支", "")),
-                amount=amount,
-                merchant=row.get("订单标题", "").strip(),
-                counterparty=row.get("订单标题", "").strip(),
-                summary=row.get("交易类型", "").strip(),
-                channel=row.get("支付方式", "").strip(),
-                transaction_reference=row.get("交易单号", "").strip(),
-                source_records=[
-                    {
-                        "source_type": "email_attachment_csv",
-                        "source_file": str(path),
-                        "message_uid": manifest_item.get("message_uid", ""),
-                        "message_id": manifest_item.get("message_id", ""),
-                        "row": row_index,
-                    }
-                ],
-                confidence=0.9,
-                raw_record=row,
-            )
+        yield make_transaction(
+            bank_key="meituan",
+            bank_name="美团",
+            account_tail=_account_tail_from_text(row.get("支付方式", "")),
+            transaction_time=(row.get("交易成功时间", "") or row.get("交易创建时间", "")).strip(),
+            direction=_direction_from_cn(row.get("收/支", "")),
+            amount=amount,
+            merchant=row.get("订单标题", "").strip(),
+            counterparty=row.get("订单标题", "").strip(),
+            summary=row.get("交易类型", "").strip(),
+            channel=row.get("支付方式", "").strip(),
+            transaction_reference=row.get("交易单号", "").strip(),
+            source_records=[
+                {
+                    "source_type": "email_attachment_csv",
+                    "source_file": str(path),
+                    "message_uid": manifest_item.get("message_uid", ""),
+                    "message_id": manifest_item.get("message_id", ""),
+                    "row": row_index,
+                }
+            ],
+            confidence=0.9,
+            raw_record=row,
         )
-    return transactions
 
 
-def _read_csv_text(path: Path) -> str:
-    data = path.read_bytes()
-    best_text = ""
-    best_score = -1
-    for encoding in ("utf-8-sig", "gb18030", "gbk", "utf-16", "latin1"):
-        try:
-            decoded = data.decode(encoding)
-        except UnicodeDecodeError:
+def _detect_csv_encoding(path: Path) -> tuple[str, bool] | None:
+    """只用文件开头样本选编码和是否需要逐行修复乱码。
+
+    样本判定的编码再用增量解码器分块确认全文可解码；非法字节出现在样本之后时，按样本得分退到下一个编码。
+    """
+    with path.open("rb") as file:
+        sample = file.read(CSV_SAMPLE_BYTES + 1)
+        complete = len(sample) <= CSV_SAMPLE_BYTES
+        for encoding, fix_mojibake in _rank_csv_encodings(sample[:CSV_SAMPLE_BYTES], complete=complete):
+            if complete or _decodes_fully(file, encoding):
+                return encoding, fix_mojibake
+    return None
+
+
+def _decodes_fully(file: BinaryIO, encoding: str) -> bool:
+    file.seek(0)
+    decoder = codecs.getincrementaldecoder(encoding)()
+    try:
+        for block in iter(lambda: file.read(1024 * 1024), b""):
+            decoder.decode(block)
+        decoder.decode(b"", final=True)
+    except UnicodeError:
+        return False
+    return True
+
+
+def _rank_csv_encodings(sample: bytes, complete: bool = False) -> list[tuple[str, bool]]:
+    """按 CJK 字符数给候选编码排序，返回 (编码, 是否需要逐行修复乱码)；得分相同时保持 CSV_ENCODINGS 顺序。"""
+    scored: list[tuple[int, int, str, bool]] = []
+    for order, encoding in enumerate(CSV_ENCODINGS):
+        decoded = _decode_sample(sample, encoding, complete)
+        if decoded is None:
             continue
-        fixed = "\n".join(_fix_mojibake(line) for line in decoded.splitlines())
-        score = _score_cjk(fixed)
-        if score > best_score:
-            best_text = fixed
-            best_score = score
-    return best_text
-
-
-def _read_dict_rows_from_text(text: str) -> list[dict[str, str]]:
-    lines = [line for line in text.splitlines() if line.strip().strip('"')]
-    for index, line in enumerate(lines):
-        if "交易时间" not in line and "交易创建时间" not in line:
+        raw_score = _score_cjk(decoded)
+        fixed_score = _score_cjk("\n".join(_fix_mojibake(line) for line in decoded.splitlines()))
+        scored.append((max(raw_score, fixed_score), order, encoding, fixed_score > raw_score))
+    scored.sort(key=lambda item: (-item[0], item[1]))
+    return [(encoding, fix_mojibake) for _, _, encoding, fix_mojibake in scored]
+
+
+def _decode_sample(sample: bytes, encoding: str, complete: bool) -> str | None:
+    # 用增量解码器：样本截断切在多字节字符中间时，未完成的尾部字节留在解码器缓冲里，不算错误。
+    try:
+        return codecs.getincrementaldecoder(encoding)().decode(sample, final=complete)
+    except UnicodeError:
+        return None
+
+
+def _iter_csv_lines(file: TextIO, fix_mojibake: bool) -> Iterator[str]:
+    for line in file:
+        if not line.strip().strip('"'):
+            continue
+        yield _fix_mojibake(line) if fix_mojibake else line
+
+
+def _iter_csv_dict_rows(lines: Iterator[str]) -> tuple[set[str], Iterator[dict[str, str]]]:
+    """跳过导出文件开头的说明行，从表头行开始按需产出去空白后的行字典。"""
+    for line in lines:
+        if not _is_csv_header_line(line):
             continue
-        reader = csv.DictReader(StringIO("\n".join(lines[index:])))
-        return [
+        reader = csv.DictReader(chain([line], lines))
+        headers = {str(name or "").strip() for name in reader.fieldnames or []}
+        rows = (
             {str(key or "").strip(): str(value or "").strip() for key, value in row.items()}
             for row in reader
-        ]
-    return []
+        )
+        return headers, rows
+    return set(), iter(())
+
+
+def _is_csv_header_line(line: str) -> bool:
+    return "交易时间" in line or "交易创建时间" in line
 
 
 def _parse_icbc_pdf_line(
@@ -230,56 +573,90 @@ def _parse_icbc_pdf_line(
     )
 
 
-def _read_xls_transactions(path: Path, manifest_item: dict[str, Any]) -> list[dict[str, Any]]:
+def _read_xls_transactions(
+    path: Path,
+    manifest_item: dict[str, Any],
+    options: StatementReadOptions | None = None,
+    sniff: StatementSniff | None = None,
+) -> list[dict[str, Any]]:
+    """按表头预先算好列号，逐行用 row_values 整行读取；on_demand 时逐个加载并释放工作表。"""
     import xlrd
 
-    book = xlrd.open_workbook(str(path))
+    on_demand = options.xls_on_demand if options is not None else True
+    book = xlrd.open_workbook(str(path), on_demand=on_demand)
+    transactions: list[dict[str, Any]] = []
+    try:
+        for sheet_index in range(book.nsheets):
+            sheet = book.sheet_by_index(sheet_index)
+            transactions.extend(_read_xls_sheet_transactions(sheet, path, manifest_item))
+            if on_demand:
+                book.unload_sheet(sheet_index)
+    finally:
+        book.release_resources()
+    return transactions
+
+
+def _read_xls_sheet_transactions(sheet: Any, path: Path, manifest_item: dict[str, Any]) -> list[dict[str, Any]]:
+    header_row = _find_header_row(sheet)
+    if header_row is None:
+        return []
+    headers = [str(value).strip() for value in sheet.row_values(header_row)]
+    columns = {header: col for col, header in enumerate(headers)}
+    date_col = columns["交易日期"]
+    amount_col = columns["交易金额"]
+    summary_col = columns.get("摘要")
+    balance_col = columns.get("账户余额")
+    counterparty_col = columns.get("对方账号与户名")
+    channel_col = columns.get("交易地点/附言")
+    account_tail = _account_tail_from_xls(sheet)
+    bank_key = str(manifest_item.get("bank_key", "ccb") or "ccb")
     transactions: list[dict[str, Any]] = []
-    for sheet in book.sheets():
-        header_row = _find_header_row(sheet)
-        if header_row is None:
+    for row_index in range(header_row + 1, sheet.nrows):
+        values = sheet.row_values(row_index)
+        date = str(values[date_col]).strip()
+        if not date:
             continue
-        headers = [str(sheet.cell_value(header_row, col)).strip() for col in range(sheet.ncols)]
-        account_tail = _account_tail_from_xls(sheet)
-        for row_index in range(header_row + 1, sheet.nrows):
-            row = {headers[col]: sheet.cell_value(row_index, col) for col in range(min(sheet.ncols, len(headers)))}
-            if not str(row.get("交易日期", "")).strip():
-                continue
-            amount = str(row.get("交易金额", "")).strip()
-            if not parse_money_token(amount):
-                continue
-            transactions.append(
-                make_transaction(
-                    bank_key=str(manifest_item.get("bank_key", "ccb") or "ccb"),
-                    bank_name="建设银行",
-                    account_tail=account_tail,
-                    transaction_time=_format_yyyymmdd(str(row.get("交易日期", "")).strip()),
-                    direction="inflow" if not amount.startswith("-") else "outflow",
-                    amount=amount,
-                    summary=str(row.get("摘要", "")).strip(),
-                    balance=str(row.get("账户余额", "")).strip(),
-                    counterparty=str(row.get("对方账号与户名", "")).strip(),
-                    channel=str(row.get("交易地点/附言", "")).strip(),
-                    source_records=[
-                        {
-                            "source_type": "email_attachment_xls",
-                            "source_file": str(path),
-                            "message_uid": manifest_item.get("message_uid", ""),
-                            "message_id": manifest_item.get("message_id", ""),
-                            "sheet": sheet.name,
-                            "row": row_index + 1,
-                        }
-                    ],
-                    confidence=0.92,
-                    raw_record=row,
-                )
+        amount = str(values[amount_col]).strip()
+        if not parse_money_token(amount):
+            continue
+        transactions.append(
+            make_transaction(
+                bank_key=bank_key,
+                bank_name="建设银行",
+                account_tail=account_tail,
+                transaction_time=_format_yyyymmdd(date),
+                direction="inflow" if not amount.startswith("-") else "outflow",
+                amount=amount,
+                summary=_xls_cell_text(values, summary_col),
+                balance=_xls_cell_text(values, balance_col),
+                counterparty=_xls_cell_text(values, counterparty_col),
+                channel=_xls_cell_text(values, channel_col),
+                source_records=[
+                    {
+                        "source_type": "email_attachment_xls",
+                        "source_file": str(path),
+                        "message_uid": manifest_item.get("message_uid", ""),
+                        "message_id": manifest_item.get("message_id", ""),
+                        "sheet": sheet.name,
+                        "row": row_index + 1,
+                    }
+                ],
+                confidence=0.92,
+                raw_record=dict(zip(headers, values)),
             )
+        )
     return transactions
 
 
+def _xls_cell_text(values: list[Any], col: int | None) -> str:
+    if col is None or col >= len(values):
+        return ""
+    return str(values[col]).strip()
+
+
 def _find_header_row(sheet: Any) -> int | None:
     for row_index in range(sheet.nrows):
-        values = [str(sheet.cell_value(row_index, col)).strip() for col in range(sheet.ncols)]
+        values = [str(value).strip() for value in sheet.row_values(row_index)]
         if "交易日期" in values and "交易金额" in values:
             return row_index
     return None
@@ -287,9 +664,8 @@ def _find_header_row(sheet: Any) -> int | None:
 
 def _account_tail_from_xls(sheet: Any) -> str:
     for row_index in range(min(sheet.nrows, 5)):
-        for col in range(sheet.ncols):
-            value = str(sheet.cell_value(row_index, col))
-            match = ACCOUNT_RE.search(value)
+        for value in sheet.row_values(row_index):
+            match = ACCOUNT_RE.search(str(value))
             if match:
                 return match.group(1)[-4:]
     return ""
@@ -350,4 +726,111 @@ def _fix_mojibake(value: str) -> str:
 
 
 def _score_cjk(value: str) -> int:
-    return sum(1 for char in value if "\u4e00" <= char <= "\u9fff")
+    return len(NON_CJK_RE.sub("", value))
+
+
+def _sniff_pdf(path: Path, options: StatementReadOptions) -> StatementSniff:
+    """PDF 只取首页文本；use_text_cache 时先查 .pages.json 缓存，命中则带上全部页文本交给解析器。"""
+    cache_key = _pdf_text_cache_key(path) if options.use_text_cache else None
+    if cache_key is not None:
+        cached = _load_pdf_text_cache(path.with_name(path.name + PDF_TEXT_CACHE_SUFFIX), cache_key)
+        if cached is not None:
+            return StatementSniff(
+                path=path,
+                suffix=".pdf",
+                text=cached[0] if cached else "",
+                pdf_cache_key=cache_key,
+                pdf_pages=tuple(cached),
+                pdf_pages_complete=True,
+            )
+    from pypdf import PdfReader
+
+    reader = PdfReader(str(path))
+    first_page = _fix_mojibake(reader.pages[0].extract_text() or "") if reader.pages else ""
+    return StatementSniff(
+        path=path,
+        suffix=".pdf",
+        text=first_page,
+        pdf_cache_key=cache_key,
+        pdf_pages=(first_page,) if reader.pages else (),
+        pdf_pages_complete=not reader.pages,
+    )
+
+
+def _sniff_csv(path: Path, options: StatementReadOptions) -> StatementSniff:
+    """用与解析相同的编码判定（含全文解码确认）解码开头样本，取解析器会用的表头行。"""
+    detected = _detect_csv_encoding(path)
+    if detected is None:
+        return StatementSniff(path=path, suffix=".csv")
+    encoding, fix_mojibake = detected
+    with path.open("rb") as file:
+        sample = file.read(CSV_SAMPLE_BYTES + 1)
+    text = _decode_sample(sample[:CSV_SAMPLE_BYTES], encoding, complete=len(sample) <= CSV_SAMPLE_BYTES) or ""
+    lines = [_fix_mojibake(line) if fix_mojibake else line for line in text.splitlines()]
+    header_line = next((line for line in lines if line.strip().strip('"') and _is_csv_header_line(line)), None)
+    header_rows = ()
+    if header_line is not None:
+        header_rows = (frozenset(str(cell or "").strip() for cell in next(csv.reader([header_line]), [])),)
+    return StatementSniff(
+        path=path,
+        suffix=".csv",
+        text="\n".join(lines),
+        header_rows=header_rows,
+        csv_encoding=detected,
+    )
+
+
+def _sniff_xls(path: Path, options: StatementReadOptions) -> StatementSniff:
+    import xlrd
+
+    book = xlrd.open_workbook(str(path), on_demand=True)
+    try:
+        rows: list[list[str]] = []
+        for sheet_index in range(book.nsheets):
+            sheet = book.sheet_by_index(sheet_index)
+            for row_index in range(min(sheet.nrows, STATEMENT_SNIFF_XLS_ROWS)):
+                rows.append([str(value).strip() for value in sheet.row_values(row_index)])
+            book.unload_sheet(sheet_index)
+    finally:
+        book.release_resources()
+    return StatementSniff(
+        path=path,
+        suffix=".xls",
+        text="\n".join("\t".join(row) for row in rows),
+        header_rows=tuple(frozenset(row) for row in rows),
+    )
+
+
+STATEMENT_SNIFFERS: dict[str, Callable[[Path, StatementReadOptions], StatementSniff]] = {
+    ".pdf": _sniff_pdf,
+    ".csv": _sniff_csv,
+    ".xls": _sniff_xls,
+}
+
+register_statement_parser(
+    StatementParser(
+        name="icbc_pdf",
+        suffixes=(".pdf",),
+        parse=_read_icbc_pdf_transactions,
+        first_page_markers=("工商银行", "ICBC", ICBC_PDF_DATE_LINE_RE),
+    )
+)
+register_statement_parser(
+    StatementParser(name="ccb_xls", suffixes=(".xls",), parse=_read_xls_transactions, header_tokens=CCB_XLS_HEADERS)
+)
+register_statement_parser(
+    StatementParser(
+        name="alipay_csv",
+        suffixes=(".csv",),
+        parse=_iter_alipay_csv_transactions,
+        header_tokens=ALIPAY_CSV_HEADERS,
+    )
+)
+register_statement_parser(
+    StatementParser(
+        name="meituan_csv",
+        suffixes=(".csv",),
+        parse=_iter_meituan_csv_transactions,
+        header_tokens=MEITUAN_CSV_HEADERS,
+    )
+)
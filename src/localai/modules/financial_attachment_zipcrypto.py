@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import struct
+import zipfile
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+
+
+MAX_PREFILTER_MEMBERS = 3
+MAX_HASH_MEMBERS = 3
+ENCRYPTION_HEADER_SIZE = 12
+DEFLATE_PROBE_SIZE = 256
+
+
+def _crc_table() -> tuple[int, ...]:
+    table = []
+    for index in range(256):
+        value = index
+        for _ in range(8):
+            value = (value >> 1) ^ 0xEDB88320 if value & 1 else value >> 1
+        table.append(value)
+    return tuple(table)
+
+
+CRC_TABLE = _crc_table()
+
+
+@dataclass(frozen=True)
+class ZipCryptoHeader:
+    member: str
+    encryption_header: bytes
+    check_byte: int
+    deflate_prefix: bytes = b""
+
+
+class ZipCryptoPrefilter:
+    """PKZIP 传统加密的校验字节预筛。
+
+    每个候选只跑口令和 12 字节加密头的密钥调度，解密出的最后一字节必须等于校验字节；
+    约 255/256 的错误口令在这里被拒绝；deflate 成员再解密数据开头一小段试解压，
+    只有两步都通过的候选才需要完整解密和 CRC 校验。
+    同一归档取前几个加密成员一起比对，误通过率按成员数继续下降。
+    """
+
+    def __init__(self, headers: list[ZipCryptoHeader]) -> None:
+        self.headers = headers
+
+    @classmethod
+    def from_zip(cls, path: Path) -> "ZipCryptoPrefilter | None":
+        try:
+            headers = read_zipcrypto_headers(path)
+        except (OSError, zipfile.BadZipFile, struct.error):
+            return None
+        return cls(headers) if headers else None
+
+    def passes(self, password: bytes) -> bool:
+        crc_table = CRC_TABLE
+        key0, key1, key2 = 0x12345678, 0x23456789, 0x34567890
+        for byte in password:
+            key0 = (key0 >> 8) ^ crc_table[(key0 ^ byte) & 0xFF]
+            key1 = ((key1 + (key0 & 0xFF)) * 134775813 + 1) & 0xFFFFFFFF
+            key2 = (key2 >> 8) ^ crc_table[(key2 ^ (key1 >> 24)) & 0xFF]
+        for header in self.headers:
+            keys = _decrypt_header(header, key0, key1, key2)
+            if keys is None:
+                return False
+            if header.deflate_prefix and not _deflate_prefix_valid(header.deflate_prefix, *keys):
+                return False
+        return True
+
+
+def read_zipcrypto_headers(path: Path, limit: int = MAX_PREFILTER_MEMBERS) -> list[ZipCryptoHeader]:
+    headers: list[ZipCryptoHeader] = []
+    with zipfile.ZipFile(path) as archive, path.open("rb") as file:
+        for info in archive.infolist():
+            if info.is_dir() or not info.flag_bits & 0x1 or info.compress_type == 99:
+                continue
+            file.seek(info.header_offset)
+            local_header = file.read(30)
+            if len(local_header) != 30 or local_header[:4] != b"PK\x03\x04":
+                continue
+            filename_len, extra_len = struct.unpack_from("<HH", local_header, 26)
+            file.seek(filename_len + extra_len, 1)
+            encryption_header = file.read(ENCRYPTION_HEADER_SIZE)
+            if len(encryption_header) != ENCRYPTION_HEADER_SIZE:
+                continue
+            deflate_prefix = b""
+            if info.compress_type == zipfile.ZIP_DEFLATED:
+                probe_size = min(DEFLATE_PROBE_SIZE, info.compress_size - ENCRYPTION_HEADER_SIZE)
+                deflate_prefix = file.read(max(probe_size, 0))
+            headers.append(
+                ZipCryptoHeader(
+                    member=info.filename,
+                    encryption_header=encryption_header,
+                    check_byte=_expected_check_byte(info),
+                    deflate_prefix=deflate_prefix,
+                )
+            )
+            if len(headers) >= limit:
+                break
+    return headers
+
+
+def extract_pkzip_hash(path: Path, limit: int = MAX_HASH_MEMBERS) -> str:
+    """生成 hashcat 17200-17225 / john 通用的 $pkzip2$ hash，不再调用 zip2john。
+
+    取压缩后最小的几个 ZipCrypto 成员（stored 或 deflate），完整数据内联到 hash 中。
+    """
+    items: list[str] = []
+    with zipfile.ZipFile(path) as archive, path.open("rb") as file:
+        members = sorted(
+            (
+                info
+                for info in archive.infolist()
+                if not info.is_dir() and info.flag_bits & 0x1 and info.compress_type in {zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED}
+            ),
+            key=lambda info: info.compress_size,
+        )
+        for info in members[:limit]:
+            file.seek(info.header_offset)
+            local_header = file.read(30)
+            if len(local_header) != 30 or local_header[:4] != b"PK\x03\x04":
+                continue
+            filename_len, extra_len = struct.unpack_from("<HH", local_header, 26)
+            file.seek(filename_len + extra_len, 1)
+            data = file.read(info.compress_size)
+            if len(data) != info.compress_size or len(data) <= ENCRYPTION_HEADER_SIZE:
+                continue
+            data_offset = 30 + filename_len + extra_len
+            # DT=2 表示完整数据内联，OF 随之为 0；MT=0 不做文件类型魔数校验。
+            items.append(
+                f"2*0*{info.compress_size:x}*{info.file_size:x}*{info.CRC:x}*0*{data_offset:x}*"
+                f"{info.compress_type}*{len(data):x}*{info.CRC >> 16:04x}*{_dos_time(info):04x}*{data.hex()}"
+            )
+    if not items:
+        return ""
+    return f"$pkzip2${len(items)}*1*" + "*".join(items) + "*$/pkzip2$"
+
+
+def pkzip_hash_modes(hash_string: str) -> list[int]:
+    """按 $pkzip2$ hash 的成员数和压缩方式给出 hashcat mode；无法解析时返回空列表。"""
+    try:
+        fields = hash_string.split("$")[2].split("*")
+        count = int(fields[0])
+        index = 2
+        compress_types = []
+        for _ in range(count):
+            data_type = int(fields[index])
+            index += 2 if data_type == 1 else 7
+            compress_types.append(int(fields[index]))
+            index += 5
+    except (IndexError, ValueError):
+        return []
+    if count == 1:
+        return [17200] if compress_types[0] == zipfile.ZIP_DEFLATED else [17210]
+    return [17220] if all(value == zipfile.ZIP_DEFLATED for value in compress_types) else [17225]
+
+
+def _dos_time(info: zipfile.ZipInfo) -> int:
+    hour, minute, second = info.date_time[3:6]
+    return (hour << 11) | (minute << 5) | (second // 2)
+
+
+def _expected_check_byte(info: zipfile.ZipInfo) -> int:
+    # 与 zipfile 一致：使用数据描述符时校验字节取 DOS 修改时间高字节，否则取 CRC 高字节。
+    if info.flag_bits & 0x8:
+        return (_dos_time(info) >> 8) & 0xFF
+    return (info.CRC >> 24) & 0xFF
+
+
+def _decrypt_header(header: ZipCryptoHeader, key0: int, key1: int, key2: int) -> tuple[int, int, int] | None:
+    crc_table = CRC_TABLE
+    plain = 0
+    for byte in header.encryption_header:
+        temp = key2 | 2
+        plain = byte ^ (((temp * (temp ^ 1)) >> 8) & 0xFF)
+        key0 = (key0 >> 8) ^ crc_table[(key0 ^ plain) & 0xFF]
+        key1 = ((key1 + (key0 & 0xFF)) * 134775813 + 1) & 0xFFFFFFFF
+        key2 = (key2 >> 8) ^ crc_table[(key2 ^ (key1 >> 24)) & 0xFF]
+    if plain != header.check_byte:
+        return None
+    return key0, key1, key2
+
+
+def _deflate_prefix_valid(data: bytes, key0: int, key1: int, key2: int) -> bool:
+    crc_table = CRC_TABLE
+    plain = bytearray(len(data))
+    for index, byte in enumerate(data):
+        temp = key2 | 2
+        value = byte ^ (((temp * (temp ^ 1)) >> 8) & 0xFF)
+        plain[index] = value
+        key0 = (key0 >> 8) ^ crc_table[(key0 ^ value) & 0xFF]
+        key1 = ((key1 + (key0 & 0xFF)) * 134775813 + 1) & 0xFFFFFFFF
+        key2 = (key2 >> 8) ^ crc_table[(key2 ^ (key1 >> 24)) & 0xFF]
+    try:
+        zlib.decompressobj(-15).decompress(bytes(plain))
+    except zlib.error:
+        return False
+    return True
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from itertools import combinations
+from typing import Iterable
+
+from localai.modules.financial_transaction_schema import FactRecord
+
+
+AGGREGATE_MAX_DAYS = 3
+AGGREGATE_MAX_PARTS = 4
+AGGREGATE_MAX_CANDIDATES = 20
+
+
+@dataclass(frozen=True)
+class AggregateMatch:
+    """一笔付款对应多张订单（multi_order），或一张订单由多笔付款支付（split_payment）。"""
+
+    kind: str
+    order_positions: tuple[int, ...]
+    payment_positions: tuple[int, ...]
+    platform: str
+    max_day_gap: int
+
+
+def propose_aggregate_matches(
+    orders: list[FactRecord],
+    payments: list[FactRecord],
+    payment_platforms: list[set[str]],
+    used_orders: set[int],
+    used_payments: set[int],
+) -> list[AggregateMatch]:
+    """在没有逐笔候选的订单和付款之间找金额相加恰好相等的组合。
+
+    只看同平台、日期相差不超过 AGGREGATE_MAX_DAYS 的记录，每个锚点最多取时间最近的
+    AGGREGATE_MAX_CANDIDATES 条、最多 AGGREGATE_MAX_PARTS 条相加，用折半枚举求子集和，
+    所以总耗时随记录数近似线性。已用于一个组合的记录不再参与其他组合。
+    """
+    used_orders = set(used_orders)
+    used_payments = set(used_payments)
+    order_index = _DayIndex(
+        (order.platform, order.epoch_day, position)
+        for position, order in enumerate(orders)
+        if position not in used_orders and _usable(order) and order.platform
+    )
+    payment_index = _DayIndex(
+        (platform, payment.epoch_day, position)
+        for position, payment in enumerate(payments)
+        if position not in used_payments and _usable(payment)
+        for platform in payment_platforms[position]
+    )
+    matches: list[AggregateMatch] = []
+
+    for position in sorted(payment_index.positions(), key=lambda item: (payments[item].epoch_day, item)):
+        payment = payments[position]
+        for platform in sorted(payment_platforms[position]):
+            if position in used_payments:
+                break
+            members = _best_subset(
+                payment,
+                [item for item in order_index.window(platform, payment.epoch_day) if item not in used_orders],
+                orders,
+            )
+            if members:
+                used_payments.add(position)
+                used_orders.update(members)
+                matches.append(
+                    AggregateMatch(
+                        kind="multi_order",
+                        order_positions=members,
+                        payment_positions=(position,),
+                        platform=platform,
+                        max_day_gap=_max_day_gap(payment, [orders[item] for item in members]),
+                    )
+                )
+
+    for position in sorted(order_index.positions(), key=lambda item: (orders[item].epoch_day, item)):
+        if position in used_orders:
+            continue
+        order = orders[position]
+        members = _best_subset(
+            order,
+            [item for item in payment_index.window(order.platform, order.epoch_day) if item not in used_payments],
+            payments,
+        )
+        if members:
+            used_orders.add(position)
+            used_payments.update(members)
+            matches.append(
+                AggregateMatch(
+                    kind="split_payment",
+                    order_positions=(position,),
+                    payment_positions=members,
+                    platform=order.platform,
+                    max_day_gap=_max_day_gap(order, [payments[item] for item in members]),
+                )
+            )
+    return matches
+
+
+def find_subset_sum(
+    amounts: list[int], costs: list[int], target: int, max_parts: int, min_parts: int = 2
+) -> tuple[int, ...] | None:
+    """折半枚举：两半各自枚举不超过 max_parts 项的子集和，再按差值查表。
+
+    多个组合都满足时取项数最少、其次 costs 之和最小的一个，返回下标（升序）。
+    """
+    middle = len(amounts) // 2
+    right_best: dict[tuple[int, int], tuple[int, tuple[int, ...]]] = {}
+    for subset in _subsets(range(middle, len(amounts)), max_parts):
+        key = (sum(amounts[item] for item in subset), len(subset))
+        cost = sum(costs[item] for item in subset)
+        if key not in right_best or cost < right_best[key][0]:
+            right_best[key] = (cost, subset)
+
+    best: tuple[int, int, tuple[int, ...]] | None = None
+    for left in _subsets(range(middle), max_parts):
+        remainder = target - sum(amounts[item] for item in left)
+        left_cost = sum(costs[item] for item in left)
+        for size in range(max(0, min_parts - len(left)), max_parts - len(left) + 1):
+            found = right_best.get((remainder, size))
+            if found is None:
+                continue
+            candidate = (len(left) + size, left_cost + found[0], tuple(sorted(left + found[1])))
+            if best is None or candidate < best:
+                best = candidate
+    return best[2] if best is not None else None
+
+
+class _DayIndex:
+    def __init__(self, entries: Iterable[tuple[str, int, int]]) -> None:
+        grouped: dict[str, list[tuple[int, int]]] = {}
+        for platform, day, position in entries:
+            grouped.setdefault(platform, []).append((day, position))
+        self._days: dict[str, list[int]] = {}
+        self._positions: dict[str, list[int]] = {}
+        for platform, items in grouped.items():
+            items.sort()
+            self._days[platform] = [day for day, _ in items]
+            self._positions[platform] = [position for _, position in items]
+
+    def positions(self) -> set[int]:
+        return {position for positions in self._positions.values() for position in positions}
+
+    def window(self, platform: str, day: int) -> list[int]:
+        days = self._days.get(platform, [])
+        start = bisect_left(days, day - AGGREGATE_MAX_DAYS)
+        end = bisect_right(days, day + AGGREGATE_MAX_DAYS)
+        return self._positions.get(platform, [])[start:end]
+
+
+def _best_subset(anchor: FactRecord, positions: list[int], records: list[FactRecord]) -> tuple[int, ...] | None:
+    target = anchor.amount_cents
+    candidates = [position for position in positions if 0 < records[position].amount_cents < target]
+    if len(candidates) < 2:
+        return None
+    candidates.sort(key=lambda position: (_seconds_apart(anchor, records[position]), position))
+    candidates = candidates[:AGGREGATE_MAX_CANDIDATES]
+    found = find_subset_sum(
+        [records[position].amount_cents for position in candidates],
+        [_seconds_apart(anchor, records[position]) for position in candidates],
+        target,
+        AGGREGATE_MAX_PARTS,
+    )
+    if found is None:
+        return None
+    return tuple(sorted(candidates[item] for item in found))
+
+
+def _subsets(items: range, max_parts: int):
+    for size in range(0, min(max_parts, len(items)) + 1):
+        yield from combinations(items, size)
+
+
+def _usable(record: FactRecord) -> bool:
+    return isinstance(record.amount_cents, int) and record.amount_cents > 0 and record.epoch_day is not None
+
+
+def _seconds_apart(left: FactRecord, right: FactRecord) -> int:
+    if left.epoch_seconds is None or right.epoch_seconds is None:
+        return AGGREGATE_MAX_DAYS * 86400
+    return abs(left.epoch_seconds - right.epoch_seconds)
+
+
+def _max_day_gap(anchor: FactRecord, members: list[FactRecord]) -> int:
+    return max(abs(anchor.epoch_day - member.epoch_day) for member in members)
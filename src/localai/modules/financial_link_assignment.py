@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import heapq
+from dataclasses import dataclass
+
+
+ASSIGNMENT_EXACT_MAX_NODES = 400
+
+
+@dataclass(frozen=True)
+class AssignmentResult:
+    pairs: dict[int, int]
+    components: int
+    largest_component: int
+    greedy_components: int
+
+
+def assign_one_to_one(
+    edges: list[tuple[int, int, int]], exact_max_nodes: int = ASSIGNMENT_EXACT_MAX_NODES
+) -> AssignmentResult:
+    """在稀疏二分图上求一对一最大权匹配，edges 为 (左节点, 右节点, 正整数权重)。
+
+    先按连通分量拆开（订单和付款只在同金额、相近日期间有边，分量通常很小）：单边分量直接取最大权，
+    节点数不超过 exact_max_nodes 的分量用最小费用流求精确解，更大的分量退回按权重贪心，避免长历史上耗时失控。
+    """
+    components = _components(edges)
+    pairs: dict[int, int] = {}
+    largest = 0
+    greedy = 0
+    for component_edges in components:
+        lefts = {left for left, _, _ in component_edges}
+        rights = {right for _, right, _ in component_edges}
+        largest = max(largest, len(lefts) + len(rights))
+        if len(lefts) == 1 or len(rights) == 1:
+            left, right, _ = max(component_edges, key=lambda edge: edge[2])
+            pairs[left] = right
+        elif len(lefts) + len(rights) <= exact_max_nodes:
+            pairs.update(_min_cost_matching(component_edges))
+        else:
+            greedy += 1
+            pairs.update(_greedy_matching(component_edges))
+    return AssignmentResult(
+        pairs=pairs, components=len(components), largest_component=largest, greedy_components=greedy
+    )
+
+
+def _components(edges: list[tuple[int, int, int]]) -> list[list[tuple[int, int, int]]]:
+    parent: dict[tuple[str, int], tuple[str, int]] = {}
+
+    def find(node: tuple[str, int]) -> tuple[str, int]:
+        parent.setdefault(node, node)
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    for left, right, _ in edges:
+        left_root, right_root = find(("L", left)), find(("R", right))
+        if left_root != right_root:
+            parent[right_root] = left_root
+    grouped: dict[tuple[str, int], list[tuple[int, int, int]]] = {}
+    for edge in edges:
+        grouped.setdefault(find(("L", edge[0])), []).append(edge)
+    return list(grouped.values())
+
+
+def _greedy_matching(edges: list[tuple[int, int, int]]) -> dict[int, int]:
+    pairs: dict[int, int] = {}
+    used_rights: set[int] = set()
+    for left, right, _ in sorted(edges, key=lambda edge: edge[2], reverse=True):
+        if left not in pairs and right not in used_rights:
+            pairs[left] = right
+            used_rights.add(right)
+    return pairs
+
+
+def _min_cost_matching(edges: list[tuple[int, int, int]]) -> dict[int, int]:
+    """逐条最短增广路（Dijkstra + 势函数），增广路总费用不再为负时停止，得到最大权匹配。"""
+    lefts = list(dict.fromkeys(left for left, _, _ in edges))
+    rights = list(dict.fromkeys(right for _, right, _ in edges))
+    left_ids = {left: index + 1 for index, left in enumerate(lefts)}
+    right_ids = {right: index + 1 + len(lefts) for index, right in enumerate(rights)}
+    source, sink = 0, len(lefts) + len(rights) + 1
+    graph: list[list[list[int]]] = [[] for _ in range(sink + 1)]
+
+    def add_edge(start: int, end: int, cost: int) -> None:
+        graph[start].append([end, 1, cost, len(graph[end])])
+        graph[end].append([start, 0, -cost, len(graph[start]) - 1])
+
+    for left in lefts:
+        add_edge(source, left_ids[left], 0)
+    for left, right, weight in edges:
+        add_edge(left_ids[left], right_ids[right], -weight)
+    for right in rights:
+        add_edge(right_ids[right], sink, 0)
+
+    # 初始图无环且只有正向边，势取各点最短距离即可保证约化费用非负。
+    potential = [0] * (sink + 1)
+    for left, right, weight in edges:
+        potential[right_ids[right]] = min(potential[right_ids[right]], -weight)
+    potential[sink] = min(potential[right_ids[right]] for right in rights)
+
+    while True:
+        dist, previous = _dijkstra(graph, potential, source)
+        if dist[sink] is None or dist[sink] + potential[sink] - potential[source] >= 0:
+            break
+        for node in range(sink + 1):
+            potential[node] += min(dist[node], dist[sink]) if dist[node] is not None else dist[sink]
+        node = sink
+        while node != source:
+            start, edge_index = previous[node]
+            edge = graph[start][edge_index]
+            edge[1] -= 1
+            graph[node][edge[3]][1] += 1
+            node = start
+
+    pairs: dict[int, int] = {}
+    for left in lefts:
+        for end, capacity, cost, _ in graph[left_ids[left]]:
+            if capacity == 0 and cost < 0 and end != source:
+                pairs[left] = rights[end - 1 - len(lefts)]
+    return pairs
+
+
+def _dijkstra(
+    graph: list[list[list[int]]], potential: list[int], source: int
+) -> tuple[list[int | None], list[tuple[int, int]]]:
+    dist: list[int | None] = [None] * len(graph)
+    previous: list[tuple[int, int]] = [(-1, -1)] * len(graph)
+    dist[source] = 0
+    heap = [(0, source)]
+    while heap:
+        current, node = heapq.heappop(heap)
+        if current != dist[node]:
+            continue
+        for edge_index, (end, capacity, cost, _) in enumerate(graph[node]):
+            if capacity <= 0:
+                continue
+            candidate = current + cost + potential[node] - potential[end]
+            if dist[end] is None or candidate < dist[end]:
+                dist[end] = candidate
+                previous[end] = (node, edge_index)
+                heapq.heappush(heap, (candidate, end))
+    return dist, previous
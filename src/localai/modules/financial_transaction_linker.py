@@ -2,65 +2,191 @@ from __future__ import annotations
 
 import hashlib
 import json
-from datetime import datetime
+from bisect import bisect_left, bisect_right
 from decimal import Decimal
 from typing import Any
 
-from localai.modules.bank_transaction_schema import parse_decimal
-from localai.modules.financial_transaction_schema import normalized_text
+from localai.modules.bank_transaction_schema import decimal_to_string, parse_decimal
+from localai.modules.financial_link_aggregate import AggregateMatch, propose_aggregate_matches
+from localai.modules.financial_link_assignment import assign_one_to_one
+from localai.modules.financial_transaction_schema import DIRECTION_CODES, FactRecord, build_fact_records, normalized_text
 
 
 MAX_DAYS = 7
 MIN_CANDIDATE_SCORE = 65
+AGGREGATE_LINK_SCORE = 70
+OUTFLOW = DIRECTION_CODES["outflow"]
+PLATFORM_TEXT_ALIASES = {
+    platform: [normalized_text(alias) for alias in aliases]
+    for platform, aliases in {
+        "pdd": ["pdd", "拼多多"],
+        "meituan": ["meituan", "美团"],
+        "jd": ["jd", "京东"],
+        "taobao": ["taobao", "淘宝", "天猫"],
+    }.items()
+}
 
 
 def link_orders_to_payments(
     order_facts: list[dict[str, Any]],
     bank_facts: list[dict[str, Any]],
+    assign: bool = False,
+    aggregate: bool = False,
 ) -> tuple[list[dict[str, Any]], dict[str, Any]]:
+    """为每个订单找出同金额、日期相近的付款候选，每单最多保留 5 条。
+
+    assign 为真时再做一次全局一对一分配：同一笔付款只归给一个订单，未分到的候选降为 candidate，
+    并按付款是否已分给其他订单标记为 conflict 或 alternative。
+    aggregate 为真时，在没有逐笔候选的订单和付款之间按同平台金额相加找一单多付、一付多单，
+    以 pays_for_part 候选关联输出。
+    """
     payments = [
-        fact
-        for fact in bank_facts
-        if fact.get("direction") == "outflow" and fact.get("amount") and fact.get("business_type") == "expense"
+        record
+        for record in build_fact_records(bank_facts)
+        if record.direction == OUTFLOW and record.fact.get("amount") and record.business_type == "expense"
     ]
-    links: list[dict[str, Any]] = []
-    for order in order_facts:
-        if not order.get("amount"):
-            continue
+    index = PaymentIndex(payments)
+    orders = [record for record in build_fact_records(order_facts) if record.fact.get("amount")]
+    order_candidates: list[list[tuple[int, list[str], int]]] = []
+    scored_pairs = 0
+    for order in orders:
         candidates = []
-        for payment in payments:
-            score, evidence = _score_pair(order, payment)
+        for position in index.candidates(order.amount_cents, order.epoch_day):
+            payment = payments[position]
+            scored_pairs += 1
+            score, evidence = _score_matched_amount(order, payment, _day_gap(order.epoch_day, payment.epoch_day))
             if score >= MIN_CANDIDATE_SCORE:
-                candidates.append((score, evidence, payment))
+                candidates.append((score, evidence, position))
         candidates.sort(key=lambda item: item[0], reverse=True)
-        for score, evidence, payment in candidates[:5]:
-            links.append(_make_link(order, payment, score, evidence))
+        order_candidates.append(candidates)
+
+    assignment_stats: dict[str, Any] = {}
+    if assign:
+        links, assignment_stats = _assigned_links(orders, payments, order_candidates)
+    else:
+        links = [
+            _make_link(order.fact, payments[position].fact, score, evidence)
+            for order, candidates in zip(orders, order_candidates)
+            for score, evidence, position in candidates[:5]
+        ]
+
+    aggregate_stats: dict[str, Any] = {}
+    if aggregate:
+        matches = propose_aggregate_matches(
+            orders,
+            payments,
+            [_payment_platforms(payment) for payment in payments],
+            used_orders={order_index for order_index, candidates in enumerate(order_candidates) if candidates},
+            used_payments={position for candidates in order_candidates for _, _, position in candidates},
+        )
+        aggregate_links = [link for match in matches for link in _aggregate_links(match, orders, payments)]
+        links.extend(aggregate_links)
+        aggregate_stats = {
+            "aggregate_multi_order": sum(1 for match in matches if match.kind == "multi_order"),
+            "aggregate_split_payment": sum(1 for match in matches if match.kind == "split_payment"),
+            "aggregate_links": len(aggregate_links),
+        }
 
     exact = sum(1 for link in links if link["match_strength"] == "linked")
     return links, {
         "payment_candidates": len(payments),
+        "scored_pairs": scored_pairs,
         "links": len(links),
         "linked_strength": exact,
         "candidate_strength": len(links) - exact,
         "min_candidate_score": MIN_CANDIDATE_SCORE,
         "max_days": MAX_DAYS,
+        "assignment": assign,
+        **assignment_stats,
+        "aggregate": aggregate,
+        **aggregate_stats,
     }
 
 
-def _score_pair(order: dict[str, Any], payment: dict[str, Any]) -> tuple[int, list[str]]:
-    score = 0
-    evidence: list[str] = []
-    order_amount = parse_decimal(order.get("amount"))
-    payment_amount = parse_decimal(payment.get("amount"))
-    if order_amount is None or payment_amount is None:
-        return 0, []
-    if order_amount != payment_amount:
-        return 0, []
-    score += 50
-    evidence.append("amount_exact")
+def _assigned_links(
+    orders: list[FactRecord],
+    payments: list[FactRecord],
+    order_candidates: list[list[tuple[int, list[str], int]]],
+) -> tuple[list[dict[str, Any]], dict[str, Any]]:
+    # 权重以分数为主；同分时按订单与付款的时间差（秒）取近者，时间差之和小于一个分数单位，不会改变分数最优。
+    gap_cap = (MAX_DAYS + 1) * 86400
+    scale = gap_cap * (len(orders) + 1)
+    edges = [
+        (order_index, position, score * scale - _seconds_gap(orders[order_index], payments[position], gap_cap))
+        for order_index, candidates in enumerate(order_candidates)
+        for score, _, position in candidates
+    ]
+    result = assign_one_to_one(edges)
+    assigned_payments = set(result.pairs.values())
+    links: list[dict[str, Any]] = []
+    conflicts = 0
+    for order_index, candidates in enumerate(order_candidates):
+        assigned = result.pairs.get(order_index)
+        ranked = sorted(candidates, key=lambda item: item[2] != assigned)
+        for score, evidence, position in ranked[:5]:
+            order, payment = orders[order_index].fact, payments[position].fact
+            if position == assigned:
+                link = _make_link(order, payment, score, evidence)
+                link["assignment"] = "assigned"
+            else:
+                conflict = position in assigned_payments
+                conflicts += conflict
+                link = _make_link(
+                    order, payment, score, evidence + ["assignment_conflict" if conflict else "assignment_alternative"]
+                )
+                link["match_strength"] = "candidate"
+                link["assignment"] = "conflict" if conflict else "alternative"
+            links.append(link)
+    return links, {
+        "assigned_links": len(result.pairs),
+        "assignment_conflicts": conflicts,
+        "assignment_components": result.components,
+        "assignment_largest_component": result.largest_component,
+        "assignment_greedy_components": result.greedy_components,
+    }
+
+
+class PaymentIndex:
+    """按金额（分）分桶、桶内按日期排序的付款索引。
+
+    金额不等的配对必定 0 分，日期相差超过 MAX_DAYS 的也必定 0 分，所以只需对同金额桶内
+    日期窗口 ±MAX_DAYS 的付款打分；没有日期的付款（以及订单没有日期时整个桶）仍全部参与，
+    由 _score_matched_amount 按商户文本决定。返回的下标按原付款顺序排列，同分时排序结果与逐一扫描一致。
+    """
+
+    def __init__(self, payments: list[FactRecord]) -> None:
+        self._dated: dict[int | Decimal, tuple[list[int], list[int]]] = {}
+        self._undated: dict[int | Decimal, list[int]] = {}
+        self._all: dict[int | Decimal, list[int]] = {}
+        dated_entries: dict[int | Decimal, list[tuple[int, int]]] = {}
+        for position, payment in enumerate(payments):
+            key = payment.amount_cents
+            if key is None:
+                continue
+            self._all.setdefault(key, []).append(position)
+            if payment.epoch_day is None:
+                self._undated.setdefault(key, []).append(position)
+            else:
+                dated_entries.setdefault(key, []).append((payment.epoch_day, position))
+        for key, entries in dated_entries.items():
+            entries.sort()
+            self._dated[key] = ([day for day, _ in entries], [position for _, position in entries])
+
+    def candidates(self, amount_key: int | Decimal | None, day: int | None) -> list[int]:
+        if amount_key is None:
+            return []
+        if day is None:
+            return self._all.get(amount_key, [])
+        days, positions = self._dated.get(amount_key, ([], []))
+        window = positions[bisect_left(days, day - MAX_DAYS) : bisect_right(days, day + MAX_DAYS)]
+        return sorted(window + self._undated.get(amount_key, []))
+
+
+def _score_matched_amount(order: FactRecord, payment: FactRecord, day_delta: int | None) -> tuple[int, list[str]]:
+    score = 50
+    evidence: list[str] = ["amount_exact"]
 
     merchant_match = _merchant_text_match(order, payment)
-    day_delta = _day_delta(order.get("occurrence_time", ""), payment.get("occurrence_time", ""))
     if day_delta is not None:
         if day_delta == 0:
             score += 25
@@ -77,10 +203,10 @@ def _score_pair(order: dict[str, Any], payment: dict[str, Any]) -> tuple[int, li
         else:
             return 0, []
 
-    if order.get("platform") and payment.get("platform") == order.get("platform"):
+    if order.platform and payment.platform == order.platform:
         score += 20
         evidence.append("platform_match")
-    elif order.get("platform") and _platform_text_match(order.get("platform", ""), payment):
+    elif order.platform and _platform_text_match(order.platform, payment):
         score += 12
         evidence.append("platform_text_match")
 
@@ -96,11 +222,52 @@ def _score_pair(order: dict[str, Any], payment: dict[str, Any]) -> tuple[int, li
     return max(0, min(100, score)), evidence
 
 
-def _make_link(order: dict[str, Any], payment: dict[str, Any], score: int, evidence: list[str]) -> dict[str, Any]:
+def _aggregate_links(match: AggregateMatch, orders: list[FactRecord], payments: list[FactRecord]) -> list[dict[str, Any]]:
+    order_facts = [orders[position].fact for position in match.order_positions]
+    payment_facts = [payments[position].fact for position in match.payment_positions]
+    if match.max_day_gap == 0:
+        day_evidence = "same_day"
+    elif match.max_day_gap <= 1:
+        day_evidence = "within_1_day"
+    else:
+        day_evidence = "within_3_days"
+    evidence = ["amount_aggregate", match.kind, "platform_match", day_evidence]
+    order_ids = [fact.get("financial_transaction_id", "") for fact in order_facts]
+    payment_ids = [fact.get("financial_transaction_id", "") for fact in payment_facts]
+    group_id = "fin_link_group_" + hashlib.sha256(
+        json.dumps({"orders": order_ids, "payments": payment_ids}, sort_keys=True).encode("utf-8")
+    ).hexdigest()[:20]
+    parts = order_facts if match.kind == "multi_order" else payment_facts
+    total = sum((parse_decimal(fact.get("amount")) or Decimal(0) for fact in parts), Decimal(0))
+    links = []
+    for order in order_facts:
+        for payment in payment_facts:
+            link = _make_link(order, payment, AGGREGATE_LINK_SCORE, list(evidence), relation="pays_for_part")
+            link["match_strength"] = "candidate"
+            link.update(
+                {
+                    "aggregate_kind": match.kind,
+                    "aggregate_group_id": group_id,
+                    "aggregate_amount": decimal_to_string(total),
+                    "aggregate_order_financial_transaction_ids": order_ids,
+                    "aggregate_payment_financial_transaction_ids": payment_ids,
+                }
+            )
+            links.append(link)
+    return links
+
+
+def _make_link(
+    order: dict[str, Any],
+    payment: dict[str, Any],
+    score: int,
+    evidence: list[str],
+    relation: str = "pays_for",
+) -> dict[str, Any]:
     link = {
         "link_id": "",
         "record_type": "financial_transaction_link",
-        "relation": "pays_for",
+        "relation": relation,
         "match_strength": "linked" if score >= 85 else "candidate",
         "score": score,
         "evidence": evidence,
@@ -127,46 +294,35 @@ def _make_link(order: dict[str, Any], payment: dict[str, Any], score: int, evide
     return link
 
 
-def _day_delta(left: str, right: str) -> int | None:
-    left_dt = _parse_datetime(left)
-    right_dt = _parse_datetime(right)
-    if left_dt is None or right_dt is None:
-        return None
-    return abs((left_dt.date() - right_dt.date()).days)
+def _seconds_gap(order: FactRecord, payment: FactRecord, cap: int) -> int:
+    if order.epoch_seconds is None or payment.epoch_seconds is None:
+        return cap
+    return min(abs(order.epoch_seconds - payment.epoch_seconds), cap)
 
 
-def _parse_datetime(value: str) -> datetime | None:
-    text = str(value or "").strip()
-    if not text:
-        return None
-    for fmt in ["%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d", "%Y/%m/%d %H:%M:%S", "%Y/%m/%d"]:
-        try:
-            return datetime.strptime(text[: len(datetime.now().strftime(fmt))], fmt)
-        except ValueError:
-            continue
-    try:
-        return datetime.fromisoformat(text)
-    except ValueError:
+def _day_gap(left: int | None, right: int | None) -> int | None:
+    if left is None or right is None:
         return None
+    return abs(left - right)
 
 
-def _platform_text_match(platform: str, payment: dict[str, Any]) -> bool:
-    text = normalized_text(" ".join([payment.get("merchant", ""), payment.get("counterparty", ""), payment.get("summary", "")]))
-    aliases = {
-        "pdd": ["pdd", "拼多多"],
-        "meituan": ["meituan", "美团"],
-        "jd": ["jd", "京东"],
-        "taobao": ["taobao", "淘宝", "天猫"],
-    }.get(platform, [platform])
-    return any(normalized_text(alias) in text for alias in aliases)
+def _payment_platforms(payment: FactRecord) -> set[str]:
+    platforms = {platform for platform in PLATFORM_TEXT_ALIASES if _platform_text_match(platform, payment)}
+    if payment.platform:
+        platforms.add(payment.platform)
+    return platforms
+
+
+def _platform_text_match(platform: str, payment: FactRecord) -> bool:
+    aliases = PLATFORM_TEXT_ALIASES.get(platform) or [normalized_text(platform)]
+    return any(alias in payment.payment_text for alias in aliases)
 
 
-def _merchant_text_match(order: dict[str, Any], payment: dict[str, Any]) -> bool:
-    merchant = normalized_text(order.get("merchant", ""))
-    title = normalized_text(order.get("title", ""))
-    payment_text = normalized_text(" ".join([payment.get("merchant", ""), payment.get("counterparty", ""), payment.get("summary", "")]))
-    if merchant and len(merchant) >= 4 and merchant[:8] in payment_text:
+def _merchant_text_match(order: FactRecord, payment: FactRecord) -> bool:
+    merchant = order.merchant_text
+    title = order.title_text
+    if merchant and len(merchant) >= 4 and merchant[:8] in payment.payment_text:
         return True
-    if title and len(title) >= 8 and title[:10] in payment_text:
+    if title and len(title) >= 8 and title[:10] in payment.payment_text:
         return True
     return False
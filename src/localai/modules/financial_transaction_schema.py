@@ -3,10 +3,13 @@ from __future__ import annotations
 import hashlib
 import json
 import re
+import sys
+from datetime import date, datetime
 from decimal import Decimal
 from typing import Any
 
 from localai.modules.bank_transaction_schema import decimal_to_string, parse_decimal
+from localai.modules.transaction_time import parse_transaction_time
 
 
 PLATFORM_ALIASES = {
@@ -17,6 +20,63 @@ PLATFORM_ALIASES = {
 }
 
 
+DIRECTION_CODES = {"unknown": 0, "outflow": 1, "inflow": 2}
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+class FactRecord:
+    """订单-付款关联（含组合匹配）用的紧凑事实记录，每条事实在关联开始时构建一次。
+
+    金额为整数分（超过两位小数时保留 Decimal），时间为纪元日/秒，方向为整数编码，平台字符串驻留，
+    商户、标题和付款文本预先归一化。fact 是原事实 dict，关联输出和 JSONL 仍从它取字段。
+    """
+
+    __slots__ = (
+        "fact",
+        "fact_id",
+        "amount_cents",
+        "epoch_day",
+        "epoch_seconds",
+        "direction",
+        "business_type",
+        "platform",
+        "merchant_text",
+        "title_text",
+        "payment_text",
+    )
+
+    def __init__(self, fact: dict[str, Any]) -> None:
+        occurred = parse_transaction_time(fact.get("occurrence_time", ""))
+        self.fact = fact
+        self.fact_id: str = fact.get("financial_transaction_id", "")
+        self.amount_cents = amount_cents(parse_decimal(fact.get("amount")))
+        self.epoch_day = occurred.date().toordinal() - EPOCH_ORDINAL if occurred is not None else None
+        self.epoch_seconds = _epoch_seconds(occurred) if occurred is not None else None
+        self.direction = DIRECTION_CODES.get(fact.get("direction", "unknown"), 0)
+        self.business_type: str = sys.intern(str(fact.get("business_type", "") or ""))
+        self.platform: str = sys.intern(str(fact.get("platform", "") or ""))
+        self.merchant_text = normalized_text(fact.get("merchant", ""))
+        self.title_text = normalized_text(fact.get("title", ""))
+        self.payment_text = normalized_text(
+            " ".join([fact.get("merchant", ""), fact.get("counterparty", ""), fact.get("summary", "")])
+        )
+
+
+def build_fact_records(facts: list[dict[str, Any]]) -> list[FactRecord]:
+    return [FactRecord(fact) for fact in facts]
+
+
+def amount_cents(amount: Decimal | None) -> int | Decimal | None:
+    """两位以内小数折成整数分，否则保留 Decimal；两者数值相等时哈希一致，可作同一索引键。NaN 永不相等，返回 None。"""
+    if amount is None or amount.is_nan():
+        return None
+    cents = amount * 100
+    if cents.is_finite() and cents == cents.to_integral_value():
+        return int(cents)
+    return amount
+
+
 def order_to_fact(order: dict[str, Any]) -> dict[str, Any]:
     amount = parse_decimal(order.get("paid_amount"))
     signed_amount = -abs(amount) if amount is not None else None
@@ -117,7 +177,7 @@ def stable_financial_transaction_id(source_type: str, source_id: str) -> str:
 
 
 def normalized_text(value: str) -> str:
-    return re.sub(r"\s+", "", str(value or "")).lower()
+    return WHITESPACE_RE.sub("", str(value or "")).lower()
 
 
 def _base_fact(
@@ -178,6 +238,12 @@ def _base_fact(
     }
 
 
+def _epoch_seconds(value: datetime) -> int:
+    if value.tzinfo is not None:
+        return int(value.timestamp())
+    return int((value - datetime(1970, 1, 1)).total_seconds())
+
+
 def _bank_business_type(transaction: dict[str, Any]) -> str:
     direction = transaction.get("direction")
     text = _record_text(transaction)
@@ -1,16 +1,37 @@
 from __future__ import annotations
 
+import hashlib
+import json
 from typing import Any
 
-from localai.modules.ledger_category_rules import classify_ledger_fact
-from localai.modules.ledger_order_enricher import build_order_enrichment
+from localai.modules.ledger_category_rules import DEFAULT_RULE_SET, RuleMatch, RuleSet
+from localai.modules.ledger_manual_overrides import ManualOverrideStore
+from localai.modules.ledger_order_enricher import build_order_enrichment, index_links_by_payment
 from localai.modules.ledger_schema import make_ledger_entry
 
 
 def build_ledger_entries(
     facts: list[dict[str, Any]],
     links: list[dict[str, Any]],
+    rule_set: RuleSet | None = None,
+    previous_entries: list[dict[str, Any]] | None = None,
+    code_fingerprint: str = "",
+    overrides: ManualOverrideStore | None = None,
 ) -> tuple[list[dict[str, Any]], dict[str, Any]]:
+    """由银行/支付流水事实生成账本条目。
+
+    每条条目记录 source_fingerprint（流水事实 + 其关联及关联订单 + code_fingerprint，不含规则集）；
+    传入上次的 previous_entries 时，按来源流水 id 找到指纹相同的旧条目，用其中的订单文本重新跑一次分类，
+    命中规则的 id 和规则指纹都与旧条目记录的相同才直接复用：规则包调整后只重建受影响的条目。
+    overrides 中的人工修正最后按账本 ID / 来源流水 ID 逐条套用；带人工修正的旧条目不复用，避免修正变化后残留旧值。
+    """
+    rule_set = rule_set or DEFAULT_RULE_SET
+    previous_by_source = {
+        entry.get("source_financial_transaction_id", ""): entry
+        for entry in previous_entries or []
+        if entry.get("source_fingerprint")
+    }
+    reused_entries = 0
     facts_by_id = {fact.get("financial_transaction_id", ""): fact for fact in facts if fact.get("financial_transaction_id")}
     bank_facts = [
         fact
@@ -18,11 +39,25 @@ def build_ledger_entries(
         if fact.get("source_type") == "bank_transaction"
         and fact.get("fact_type") in {"bank_payment", "bank_money_movement"}
     ]
+    links_by_payment = index_links_by_payment(links)
     entries = []
     for fact in bank_facts:
-        enrichment = build_order_enrichment(fact, links, facts_by_id)
+        fact_id = fact.get("financial_transaction_id", "")
+        fingerprint = ledger_source_fingerprint(fact, links_by_payment.get(fact_id, []), facts_by_id, code_fingerprint)
+        previous = previous_by_source.get(fact_id)
+        if (
+            previous is not None
+            and previous.get("source_fingerprint") == fingerprint
+            and not previous.get("override_applied")
+            and _same_rule_match(previous, rule_set.classify(_fact_with_order_text(fact, previous)))
+        ):
+            entries.append(overrides.apply(previous) if overrides else previous)
+            reused_entries += 1
+            continue
+        enrichment = build_order_enrichment(fact, links, facts_by_id, links_by_payment=links_by_payment)
         classification_fact = _fact_with_order_text(fact, enrichment)
-        classification = classify_ledger_fact(classification_fact)
+        rule_match = rule_set.classify(classification_fact)
+        classification = rule_match.classification
         entry = make_ledger_entry(
             source_fact=fact,
             transaction_type=classification.transaction_type,
@@ -36,17 +71,50 @@ def build_ledger_entries(
             budget_status=classification.budget_status,
             classification_confidence=classification.confidence,
             classification_reason=classification.reason,
+            classification_rule_id=rule_match.rule_id,
+            classification_rule_fingerprint=rule_match.rule_fingerprint,
             review_required=classification.review_required,
             matched_order=enrichment["matched_order"],
             linked_order_ids=enrichment["linked_order_ids"],
             linked_order_financial_transaction_ids=enrichment["linked_order_financial_transaction_ids"],
             item_or_service=enrichment["item_or_service"],
             order_detail_summary=enrichment["order_detail_summary"],
+            source_fingerprint=fingerprint,
         )
-        entries.append(entry)
+        entries.append(overrides.apply(entry) if overrides else entry)
 
     entries.sort(key=lambda item: (item.get("date", ""), item.get("transaction_type", ""), item.get("amount", "")))
-    return entries, _build_stats(entries, facts, links)
+    stats = _build_stats(entries, facts, links)
+    stats["rule_set_fingerprint"] = rule_set.fingerprint
+    stats["reused_entries"] = reused_entries
+    stats["rebuilt_entries"] = len(entries) - reused_entries
+    stats["manual_overrides"] = len(overrides) if overrides else 0
+    stats["override_applied_entries"] = sum(1 for entry in entries if entry.get("override_applied"))
+    stats["unmatched_overrides"] = overrides.unmatched if overrides else 0
+    stats["rule_sources"] = list(rule_set.sources)
+    return entries, stats
+
+
+def ledger_source_fingerprint(
+    fact: dict[str, Any],
+    payment_links: list[dict[str, Any]],
+    facts_by_id: dict[str, dict[str, Any]],
+    salt: str = "",
+) -> str:
+    """一条流水生成账本条目所依赖的全部输入的摘要：流水本身、指向它的关联和这些关联的订单事实。"""
+    order_facts = [
+        facts_by_id.get(link.get("order_financial_transaction_id", ""), {})
+        for link in payment_links
+    ]
+    payload = json.dumps([salt, fact, payment_links, order_facts], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:24]
+
+
+def _same_rule_match(entry: dict[str, Any], rule_match: RuleMatch) -> bool:
+    return (
+        entry.get("classification_rule_id") == rule_match.rule_id
+        and entry.get("classification_rule_fingerprint") == rule_match.rule_fingerprint
+    )
 
 
 def _fact_with_order_text(fact: dict[str, Any], enrichment: dict[str, Any]) -> dict[str, Any]:
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import hashlib
+import json
+from collections import deque
+from dataclasses import asdict, dataclass, replace
 from typing import Any
 
 from localai.modules.financial_transaction_schema import normalized_text
@@ -28,6 +31,18 @@ class KeywordRule:
     classification: LedgerClassification
     direction: str | None = None
     priority: int = 100
+    rule_id: str = ""
+
+
+@dataclass(frozen=True)
+class RuleMatch:
+    classification: LedgerClassification
+    rule_id: str
+    rule_fingerprint: str
+
+
+BUILTIN_RULE_PREFIX = "builtin"
+FALLBACK_RULE_PREFIX = "fallback"
 
 
 RULES: tuple[KeywordRule, ...] = (
@@ -460,10 +475,173 @@ RULES: tuple[KeywordRule, ...] = (
         ),
     ),
 )
+# 内置规则按表中顺序编号为 builtin:01、builtin:02 ...，规则包可用同一 id 覆盖或停用某条内置规则。
+RULES = tuple(
+    rule if rule.rule_id else replace(rule, rule_id=f"{BUILTIN_RULE_PREFIX}:{index:02d}")
+    for index, rule in enumerate(RULES, start=1)
+)
+
+FALLBACK_CLASSIFICATIONS: dict[str, LedgerClassification] = {
+    "inflow": LedgerClassification(
+        transaction_type="收入",
+        category_lv1="其他收入",
+        category_lv2="其他收入",
+        category_lv3="",
+        target_person="本人",
+        project="个人收入",
+        tags=("收入",),
+        budget_status="不纳入预算",
+        confidence=0.55,
+        reason="金额流入但未命中明确收入规则",
+        review_required=True,
+    ),
+    "outflow": LedgerClassification(
+        transaction_type="支出",
+        category_lv1="未分类",
+        category_lv2="未分类",
+        category_lv3="",
+        target_person="其他",
+        project="",
+        tags=(),
+        budget_status="未知",
+        confidence=0.35,
+        reason="金额流出但未命中支出分类规则",
+        review_required=True,
+    ),
+    "unknown": LedgerClassification(
+        transaction_type="未知",
+        category_lv1="未分类",
+        category_lv2="未分类",
+        confidence=0.1,
+        reason="无法判断资金方向",
+        review_required=True,
+    ),
+}
+
+
+class KeywordRuleMatcher:
+    """把规则表编译成一个 Aho-Corasick 自动机，一次扫描文本找出优先级最高的适用规则。
+
+    规则按 priority 稳定排序后编号，关键词预先归一化；每个节点（含 fail 链上的输出）记录各方向
+    （None 表示不限方向）命中的最小规则编号，扫描时取 None 与当前方向中较小者，与逐条规则判断结果一致。
+    """
+
+    def __init__(self, rules: tuple[KeywordRule, ...]) -> None:
+        self.rules = tuple(sorted(rules, key=lambda item: item.priority))
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._best: list[dict[str | None, int]] = [{}]
+        for rank, rule in enumerate(self.rules):
+            for keyword in rule.keywords:
+                # 空关键词（归一化后）与任何文本都算命中，和逐条判断 "" in text 保持一致，记在根节点上。
+                self._add_keyword(normalized_text(keyword), rank, rule.direction or None)
+        self._build_fail_links()
+
+    def match(self, text: str, direction: str) -> KeywordRule | None:
+        index = self.match_index(text, direction)
+        return self.rules[index] if index is not None else None
+
+    def match_index(self, text: str, direction: str) -> int | None:
+        """返回命中规则在 self.rules 中的下标，未命中返回 None。"""
+        goto, fail, best = self._goto, self._fail, self._best
+        limit = len(self.rules)
+        found = min(limit, best[0].get(None, limit), best[0].get(direction, limit))
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            outputs = best[node]
+            if outputs:
+                found = min(found, outputs.get(None, found), outputs.get(direction, found))
+                if found == 0:
+                    break
+        return found if found < limit else None
+
+    def _add_keyword(self, keyword: str, rank: int, direction: str | None) -> None:
+        node = 0
+        for char in keyword:
+            if char not in self._goto[node]:
+                self._goto.append({})
+                self._fail.append(0)
+                self._best.append({})
+                self._goto[node][char] = len(self._goto) - 1
+            node = self._goto[node][char]
+        outputs = self._best[node]
+        outputs[direction] = min(outputs.get(direction, rank), rank)
+
+    def _build_fail_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                for direction, rank in self._best[self._fail[child]].items():
+                    outputs = self._best[child]
+                    outputs[direction] = min(outputs.get(direction, rank), rank)
+
+
+class RuleSet:
+    """编译好的一组分类规则：Aho-Corasick 匹配器、每条规则的指纹，以及整组规则的指纹。
 
+    规则指纹只取决于关键词、方向、优先级和分类结果，改 id 不改内容时指纹不变；账本条目记录命中规则的
+    id 和指纹，增量构建（ledger_builder）重新匹配后两者都没变的条目直接复用，只重建改判或命中规则内容变了的条目。
+    整组指纹只写入构建统计，用来标识本次用的是哪套规则。
+    """
 
-def classify_ledger_fact(fact: dict[str, Any]) -> LedgerClassification:
-    text = normalized_text(
+    def __init__(self, rules: tuple[KeywordRule, ...], sources: tuple[dict[str, Any], ...] = ()) -> None:
+        self.matcher = KeywordRuleMatcher(tuple(rules))
+        self.rules = self.matcher.rules
+        self.sources = tuple(sources)
+        self._fingerprints = [rule_fingerprint(rule) for rule in self.rules]
+        self.fingerprint = _digest([[rule.rule_id, fingerprint] for rule, fingerprint in zip(self.rules, self._fingerprints)])
+
+    def classify(self, fact: dict[str, Any]) -> RuleMatch:
+        direction = fact.get("direction", "unknown")
+        index = self.matcher.match_index(_classification_text(fact), direction)
+        if index is not None:
+            rule = self.rules[index]
+            return RuleMatch(rule.classification, rule.rule_id, self._fingerprints[index])
+        key = direction if direction in {"inflow", "outflow"} else "unknown"
+        return RuleMatch(
+            FALLBACK_CLASSIFICATIONS[key],
+            f"{FALLBACK_RULE_PREFIX}:{key}",
+            FALLBACK_FINGERPRINTS[key],
+        )
+
+
+def rule_fingerprint(rule: KeywordRule) -> str:
+    return _digest(
+        {
+            "keywords": list(rule.keywords),
+            "direction": rule.direction,
+            "priority": rule.priority,
+            "classification": asdict(rule.classification),
+        }
+    )
+
+
+def _digest(payload: Any) -> str:
+    return hashlib.sha256(json.dumps(payload, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+FALLBACK_FINGERPRINTS = {
+    key: _digest({"fallback": key, "classification": asdict(classification)})
+    for key, classification in FALLBACK_CLASSIFICATIONS.items()
+}
+DEFAULT_RULE_SET = RuleSet(RULES, sources=({"name": BUILTIN_RULE_PREFIX, "rules": len(RULES)},))
+
+
+def classify_ledger_fact(fact: dict[str, Any], rule_set: RuleSet | None = None) -> LedgerClassification:
+    return (rule_set or DEFAULT_RULE_SET).classify(fact).classification
+
+
+def _classification_text(fact: dict[str, Any]) -> str:
+    return normalized_text(
         " ".join(
             [
                 fact.get("merchant", ""),
@@ -475,46 +653,3 @@ def classify_ledger_fact(fact: dict[str, Any]) -> LedgerClassification:
             ]
         )
     )
-    direction = fact.get("direction", "unknown")
-    for rule in sorted(RULES, key=lambda item: item.priority):
-        if rule.direction and rule.direction != direction:
-            continue
-        if any(normalized_text(keyword) in text for keyword in rule.keywords):
-            return rule.classification
-
-    if direction == "inflow":
-        return LedgerClassification(
-            transaction_type="收入",
-            category_lv1="其他收入",
-            category_lv2="其他收入",
-            category_lv3="",
-            target_person="本人",
-            project="个人收入",
-            tags=("收入",),
-            budget_status="不纳入预算",
-            confidence=0.55,
-            reason="金额流入但未命中明确收入规则",
-            review_required=True,
-        )
-    if direction == "outflow":
-        return LedgerClassification(
-            transaction_type="支出",
-            category_lv1="未分类",
-            category_lv2="未分类",
-            category_lv3="",
-            target_person="其他",
-            project="",
-            tags=(),
-            budget_status="未知",
-            confidence=0.35,
-            reason="金额流出但未命中支出分类规则",
-            review_required=True,
-        )
-    return LedgerClassification(
-        transaction_type="未知",
-        category_lv1="未分类",
-        category_lv2="未分类",
-        confidence=0.1,
-        reason="无法判断资金方向",
-        review_required=True,
-    )
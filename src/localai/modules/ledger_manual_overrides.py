@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import json
+import re
+from pathlib import Path
+from typing import Any
+
+from localai.modules.ledger_schema import COUNTED_TRANSACTION_TYPES
+
+
+OVERRIDE_SOURCE = "manual_overrides"
+# 校核 Excel 人工列 -> 账本字段；人工备注写入 note。
+MANUAL_COLUMN_FIELDS = {
+    "人工收支类型": "transaction_type",
+    "人工一级分类": "category_lv1",
+    "人工二级分类": "category_lv2",
+    "人工三级分类": "category_lv3",
+    "人工目标人": "target_person",
+    "人工项目": "project",
+    "人工标签": "tags",
+    "人工是否报销": "reimbursable_status",
+    "人工预算状态": "budget_status",
+    "人工备注": "note",
+}
+TAG_SPLIT_RE = re.compile(r"[,，、;；]")
+
+
+class ManualOverrideStore:
+    """人工修正存储：按 ledger_entry_id 和 source_financial_transaction_id 各建一个字典，每条账本 O(1) 查找。
+
+    先按账本 ID 找，找不到再按来源流水 ID 找；来源流水 ID 在账本 ID 因收支类型等变化而改变时仍能对上。
+    """
+
+    def __init__(self, records: list[dict[str, Any]] | None = None) -> None:
+        self.records = list(records or [])
+        self._by_entry_id: dict[str, dict[str, Any]] = {}
+        self._by_source_id: dict[str, dict[str, Any]] = {}
+        for record in self.records:
+            if record.get("ledger_entry_id"):
+                self._by_entry_id[record["ledger_entry_id"]] = record
+            if record.get("source_financial_transaction_id"):
+                self._by_source_id[record["source_financial_transaction_id"]] = record
+        self._applied: set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def lookup(self, entry: dict[str, Any]) -> dict[str, Any] | None:
+        record = self._by_entry_id.get(entry.get("ledger_entry_id", ""))
+        if record is None:
+            record = self._by_source_id.get(entry.get("source_financial_transaction_id", ""))
+        return record
+
+    def apply(self, entry: dict[str, Any]) -> dict[str, Any]:
+        """返回应用人工修正后的账本条目（新字典）；没有对应修正时原样返回。ledger_entry_id 保持机器生成的值。"""
+        record = self.lookup(entry)
+        if record is None:
+            return entry
+        self._applied.add(id(record))
+        return apply_override(entry, record)
+
+    @property
+    def unmatched(self) -> int:
+        return sum(1 for record in self.records if id(record) not in self._applied)
+
+
+def apply_override(entry: dict[str, Any], record: dict[str, Any]) -> dict[str, Any]:
+    fields = record.get("fields", {})
+    updated = dict(entry)
+    for field, value in fields.items():
+        updated[field] = sorted(set(value)) if field == "tags" else value
+    if record.get("note"):
+        updated["note"] = record["note"]
+    if "transaction_type" in fields:
+        transaction_type = updated["transaction_type"]
+        updated["include_in_income_stats"] = transaction_type == "收入"
+        updated["include_in_expense_stats"] = transaction_type == "支出"
+        updated["include_in_cashflow_stats"] = transaction_type in COUNTED_TRANSACTION_TYPES
+    updated["review_required"] = False
+    updated["override_applied"] = True
+    updated["override_source"] = OVERRIDE_SOURCE
+    updated["override_fields"] = sorted(fields)
+    return updated
+
+
+def load_manual_overrides(path: Path) -> ManualOverrideStore:
+    return ManualOverrideStore(read_override_records(path))
+
+
+def read_override_records(path: Path) -> list[dict[str, Any]]:
+    if not path.exists():
+        return []
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError as exc:
+        raise RuntimeError(f"Failed to parse manual overrides {path}: {exc}") from exc
+    records = data.get("overrides", []) if isinstance(data, dict) else data
+    if not isinstance(records, list):
+        raise RuntimeError(f"Manual overrides must be a list under 'overrides': {path}")
+    return [record for record in records if isinstance(record, dict)]
+
+
+def write_override_records(path: Path, records: list[dict[str, Any]]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {"overrides": sorted(records, key=override_key)}
+    path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def merge_override_records(
+    existing: list[dict[str, Any]],
+    imported: list[dict[str, Any]],
+) -> list[dict[str, Any]]:
+    """新导入的修正按 override_key 覆盖旧记录，其余旧记录保留，多轮校核的结果可以累积。"""
+    merged = {override_key(record): record for record in existing}
+    for record in imported:
+        merged[override_key(record)] = record
+    return list(merged.values())
+
+
+def override_key(record: dict[str, Any]) -> str:
+    return record.get("ledger_entry_id") or f"source:{record.get('source_financial_transaction_id', '')}"
+
+
+def manual_field_value(field: str, value: Any) -> Any:
+    """把人工列单元格值转为账本字段值；空单元格返回 None，表示不覆盖机器字段。"""
+    if value is None:
+        return None
+    text = str(value).strip()
+    if not text:
+        return None
+    if field == "tags":
+        tags = [item.strip() for item in TAG_SPLIT_RE.split(text) if item.strip()]
+        return tags or None
+    return text
@@ -9,11 +9,14 @@ def build_order_enrichment(
     facts_by_id: dict[str, dict[str, Any]],
     *,
     min_score: int = 85,
+    links_by_payment: dict[str, list[dict[str, Any]]] | None = None,
 ) -> dict[str, Any]:
+    """汇总付款流水关联到的订单明细；传入 index_links_by_payment 的结果时只查该付款的关联，不再扫描全部 links。"""
     payment_id = payment_fact.get("financial_transaction_id", "")
+    payment_links = links_by_payment.get(payment_id, []) if links_by_payment is not None else links
     matched_links = [
         link
-        for link in links
+        for link in payment_links
         if link.get("payment_financial_transaction_id") == payment_id
         and link.get("match_strength") == "linked"
         and int(link.get("score", 0) or 0) >= min_score
@@ -44,6 +47,13 @@ def build_order_enrichment(
     }
 
 
+def index_links_by_payment(links: list[dict[str, Any]]) -> dict[str, list[dict[str, Any]]]:
+    by_payment: dict[str, list[dict[str, Any]]] = {}
+    for link in links:
+        by_payment.setdefault(link.get("payment_financial_transaction_id", ""), []).append(link)
+    return by_payment
+
+
 def _order_summary(fact: dict[str, Any]) -> str:
     parts = [
         fact.get("merchant", ""),
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import warnings
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from openpyxl import load_workbook
+
+from localai.modules.ledger_manual_overrides import MANUAL_COLUMN_FIELDS, manual_field_value
+
+
+ENTRY_ID_COLUMN = "账本ID"
+SOURCE_ID_COLUMN = "来源流水ID"
+
+
+def read_review_overrides(workbook_path: Path) -> tuple[list[dict[str, Any]], dict[str, Any]]:
+    """以只读流式方式读取账本校核 Excel 各月份 sheet 的人工列，返回人工修正记录和统计。
+
+    只导入至少填写了一个人工字段、且带账本 ID 或来源流水 ID 的行；空人工字段不覆盖机器字段。
+    没有账本 ID 列的 sheet（如总览）直接跳过。
+    """
+    if not workbook_path.exists():
+        raise RuntimeError(f"Ledger review workbook not found: {workbook_path}")
+    imported_at = datetime.now().isoformat(timespec="seconds")
+    records: list[dict[str, Any]] = []
+    stats = {"sheets": 0, "rows": 0, "override_rows": 0, "rows_without_id": 0}
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)
+        workbook = load_workbook(workbook_path, read_only=True, data_only=True, keep_links=False)
+    try:
+        for worksheet in workbook.worksheets:
+            rows = worksheet.iter_rows(values_only=True)
+            headers = [str(value or "").strip() for value in next(rows, ())]
+            if ENTRY_ID_COLUMN not in headers:
+                continue
+            stats["sheets"] += 1
+            entry_id_index = headers.index(ENTRY_ID_COLUMN)
+            source_id_index = headers.index(SOURCE_ID_COLUMN) if SOURCE_ID_COLUMN in headers else None
+            manual_indexes = [
+                (index, MANUAL_COLUMN_FIELDS[header])
+                for index, header in enumerate(headers)
+                if header in MANUAL_COLUMN_FIELDS
+            ]
+            for row_number, values in enumerate(rows, start=2):
+                stats["rows"] += 1
+                fields = {}
+                for index, field in manual_indexes:
+                    value = manual_field_value(field, values[index] if index < len(values) else None)
+                    if value is not None:
+                        fields[field] = value
+                if not fields:
+                    continue
+                entry_id = _cell_text(values, entry_id_index)
+                source_id = _cell_text(values, source_id_index)
+                if not entry_id and not source_id:
+                    stats["rows_without_id"] += 1
+                    continue
+                note = fields.pop("note", "")
+                records.append(
+                    {
+                        "ledger_entry_id": entry_id,
+                        "source_financial_transaction_id": source_id,
+                        "fields": fields,
+                        "note": note,
+                        "review_sheet": worksheet.title,
+                        "review_row": row_number,
+                        "imported_at": imported_at,
+                    }
+                )
+                stats["override_rows"] += 1
+    finally:
+        workbook.close()
+    return records, stats
+
+
+def _cell_text(values: tuple[Any, ...], index: int | None) -> str:
+    if index is None or index >= len(values) or values[index] is None:
+        return ""
+    return str(values[index]).strip()
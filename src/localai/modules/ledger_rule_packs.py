@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+from localai.modules.ledger_category_rules import (
+    BUILTIN_RULE_PREFIX,
+    DEFAULT_RULE_SET,
+    RULES,
+    KeywordRule,
+    LedgerClassification,
+    RuleSet,
+)
+
+
+RULE_PACK_SUFFIXES = {".yaml", ".yml", ".json"}
+DEFAULT_PACK_PRIORITY = 100
+REQUIRED_CLASSIFICATION_FIELDS = ("transaction_type", "category_lv1", "category_lv2")
+CLASSIFICATION_FIELDS = {item.name for item in fields(LedgerClassification)}
+
+
+@dataclass(frozen=True)
+class RulePack:
+    name: str
+    version: str
+    priority: int
+    path: str
+    rules: tuple[KeywordRule, ...]
+    disabled: tuple[str, ...]
+
+
+def load_rule_pack(path: str | Path) -> RulePack:
+    """读取一个 YAML/JSON 规则包。
+
+    顶层字段：name、version、priority（默认 100）、rules、disable（要停用的规则 id 列表）。
+    每条规则需要 id、keywords、classification；direction 可为 inflow/outflow/空，enabled: false 等同于停用该 id。
+    """
+    pack_path = Path(path)
+    if pack_path.suffix.lower() not in RULE_PACK_SUFFIXES:
+        raise RuntimeError(f"Unsupported ledger rule pack format: {pack_path}")
+    if not pack_path.exists():
+        raise RuntimeError(f"Ledger rule pack not found: {pack_path}")
+    text = pack_path.read_text(encoding="utf-8")
+    try:
+        data = json.loads(text) if pack_path.suffix.lower() == ".json" else yaml.safe_load(text)
+    except (json.JSONDecodeError, yaml.YAMLError) as exc:
+        raise RuntimeError(f"Failed to parse ledger rule pack {pack_path}: {exc}") from exc
+    if not isinstance(data, dict):
+        raise RuntimeError(f"Ledger rule pack must be a mapping: {pack_path}")
+
+    rules: list[KeywordRule] = []
+    disabled = [str(item) for item in data.get("disable") or []]
+    for index, item in enumerate(data.get("rules") or [], start=1):
+        if not isinstance(item, dict) or not str(item.get("id") or "").strip():
+            raise RuntimeError(f"Ledger rule #{index} in {pack_path} must be a mapping with an id.")
+        rule_id = str(item["id"]).strip()
+        if item.get("enabled", True) is False:
+            disabled.append(rule_id)
+            continue
+        rules.append(_parse_rule(item, rule_id, pack_path))
+    return RulePack(
+        name=str(data.get("name") or pack_path.stem),
+        version=str(data.get("version") or ""),
+        priority=_as_int(data.get("priority", DEFAULT_PACK_PRIORITY), "priority", pack_path),
+        path=str(pack_path),
+        rules=tuple(rules),
+        disabled=tuple(disabled),
+    )
+
+
+def build_rule_set(pack_paths: list[str | Path] | tuple[str | Path, ...], base_rules: tuple[KeywordRule, ...] = RULES) -> RuleSet:
+    """在内置规则之上按优先级合并规则包，编译成一个 RuleSet。
+
+    包按 priority 从大到小依次合并，数值越小越后合并、同 id 时越优先（与规则 priority 含义一致）；
+    同优先级按传入顺序，后面的包覆盖前面的。
+    """
+    packs = sorted((load_rule_pack(path) for path in pack_paths), key=lambda pack: -pack.priority)
+    merged: dict[str, KeywordRule] = {rule.rule_id: rule for rule in base_rules}
+    for pack in packs:
+        for rule_id in pack.disabled:
+            merged.pop(rule_id, None)
+        for rule in pack.rules:
+            merged[rule.rule_id] = rule
+    sources = [{"name": BUILTIN_RULE_PREFIX, "rules": len(base_rules)}]
+    sources.extend(
+        {"name": pack.name, "version": pack.version, "priority": pack.priority, "path": pack.path, "rules": len(pack.rules)}
+        for pack in packs
+    )
+    return RuleSet(tuple(merged.values()), sources=tuple(sources))
+
+
+class RuleSetLoader:
+    """规则包热加载：每次取 RuleSet 时比较各文件的 mtime 和大小，有变化才重新读取并编译。"""
+
+    def __init__(self, pack_paths: list[str | Path] | tuple[str | Path, ...]) -> None:
+        self.pack_paths = tuple(Path(path) for path in pack_paths)
+        self.reloads = 0
+        self._stamps: tuple[tuple[int, int] | None, ...] | None = None
+        self._rule_set: RuleSet | None = None
+
+    def current(self) -> RuleSet:
+        stamps = tuple(_file_stamp(path) for path in self.pack_paths)
+        if self._rule_set is None or stamps != self._stamps:
+            self._rule_set = build_rule_set(self.pack_paths)
+            self._stamps = stamps
+            self.reloads += 1
+        return self._rule_set
+
+
+_LOADERS: dict[tuple[str, ...], RuleSetLoader] = {}
+
+
+def load_rule_set(pack_paths: list[str | Path] | tuple[str | Path, ...] | None) -> RuleSet:
+    """取当前规则集；同一组规则包在进程内共用一个 RuleSetLoader，文件未变时不重复编译。"""
+    if not pack_paths:
+        return DEFAULT_RULE_SET
+    key = tuple(str(Path(path).resolve()) for path in pack_paths)
+    loader = _LOADERS.get(key)
+    if loader is None:
+        loader = _LOADERS[key] = RuleSetLoader(key)
+    return loader.current()
+
+
+def _parse_rule(item: dict[str, Any], rule_id: str, pack_path: Path) -> KeywordRule:
+    keywords = item.get("keywords")
+    if isinstance(keywords, str):
+        keywords = [keywords]
+    if not isinstance(keywords, list) or not keywords:
+        raise RuntimeError(f"Ledger rule {rule_id} in {pack_path} needs a non-empty keywords list.")
+    direction = item.get("direction") or None
+    if direction not in {None, "inflow", "outflow"}:
+        raise RuntimeError(f"Ledger rule {rule_id} in {pack_path} has invalid direction: {direction}")
+    classification = item.get("classification")
+    if not isinstance(classification, dict):
+        raise RuntimeError(f"Ledger rule {rule_id} in {pack_path} needs a classification mapping.")
+    unknown = sorted(set(classification) - CLASSIFICATION_FIELDS)
+    if unknown:
+        raise RuntimeError(f"Ledger rule {rule_id} in {pack_path} has unknown classification fields: {unknown}")
+    missing = [name for name in REQUIRED_CLASSIFICATION_FIELDS if not classification.get(name)]
+    if missing:
+        raise RuntimeError(f"Ledger rule {rule_id} in {pack_path} is missing classification fields: {missing}")
+    values = dict(classification)
+    values["tags"] = tuple(str(tag) for tag in values.get("tags") or ())
+    if "confidence" in values:
+        values["confidence"] = float(values["confidence"])
+    if "review_required" in values:
+        values["review_required"] = bool(values["review_required"])
+    return KeywordRule(
+        keywords=tuple(str(keyword) for keyword in keywords),
+        classification=LedgerClassification(**values),
+        direction=direction,
+        priority=_as_int(item.get("priority", DEFAULT_PACK_PRIORITY), f"priority of rule {rule_id}", pack_path),
+        rule_id=rule_id,
+    )
+
+
+def _as_int(value: Any, label: str, pack_path: Path) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError) as exc:
+        raise RuntimeError(f"Invalid {label} in ledger rule pack {pack_path}: {value!r}") from exc
+
+
+def _file_stamp(path: Path) -> tuple[int, int] | None:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
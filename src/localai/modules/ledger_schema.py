@@ -7,6 +7,7 @@ from decimal import Decimal
 from typing import Any
 
 from localai.modules.bank_transaction_schema import decimal_to_string, parse_decimal
+from localai.modules.transaction_time import parse_date_prefix
 
 
 COUNTED_TRANSACTION_TYPES = {"收入", "支出", "退款", "债权债务"}
@@ -26,6 +27,8 @@ def make_ledger_entry(
     budget_status: str = "未知",
     classification_confidence: float = 0.0,
     classification_reason: str = "",
+    classification_rule_id: str = "",
+    classification_rule_fingerprint: str = "",
     matched_order: bool = False,
     linked_order_ids: list[str] | None = None,
     linked_order_financial_transaction_ids: list[str] | None = None,
@@ -34,6 +37,7 @@ def make_ledger_entry(
     warnings: list[str] | None = None,
     review_required: bool | None = None,
     note: str = "",
+    source_fingerprint: str = "",
 ) -> dict[str, Any]:
     date = _ledger_date(source_fact)
     amount = parse_decimal(source_fact.get("amount"))
@@ -89,9 +93,12 @@ def make_ledger_entry(
         "confidence": _combined_confidence(source_fact.get("confidence", 0.5), classification_confidence),
         "classification_confidence": _safe_confidence(classification_confidence),
         "classification_reason": classification_reason,
+        "classification_rule_id": classification_rule_id,
+        "classification_rule_fingerprint": classification_rule_fingerprint,
         "review_required": needs_review,
         "warnings": ledger_warnings,
         "note": note,
+        "source_fingerprint": source_fingerprint,
     }
     entry["ledger_entry_id"] = stable_ledger_entry_id(entry)
     return entry
@@ -114,13 +121,7 @@ def _ledger_date(source_fact: dict[str, Any]) -> str:
 
 
 def _parse_date(value: str) -> datetime | None:
-    text = str(value or "").strip()
-    if not text:
-        return None
-    try:
-        return datetime.strptime(text[:10], "%Y-%m-%d")
-    except ValueError:
-        return None
+    return parse_date_prefix(value)
 
 
 def _year(date: str) -> int | str:
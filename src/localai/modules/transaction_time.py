@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import re
+from datetime import datetime
+from functools import lru_cache
+
+
+TRANSACTION_TIME_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d", "%Y/%m/%d %H:%M:%S", "%Y/%m/%d")
+# 每种格式渲染后的定长长度；只取这么长的前缀去解析，尾部的毫秒、时区等文字被忽略。
+TRANSACTION_TIME_FORMAT_LENGTHS = tuple(
+    (fmt, len(datetime(2000, 1, 1).strftime(fmt))) for fmt in TRANSACTION_TIME_FORMATS
+)
+TIME_CACHE_SIZE = 65536
+DASH_SECONDS_RE = re.compile(r"(\d{4})-(\d{2})-(\d{2}) (\d{2}):(\d{2}):(\d{2})")
+DASH_MINUTES_RE = re.compile(r"(\d{4})-(\d{2})-(\d{2}) (\d{2}):(\d{2})")
+DASH_DATE_RE = re.compile(r"(\d{4})-(\d{2})-(\d{2})")
+SLASH_SECONDS_RE = re.compile(r"(\d{4})/(\d{2})/(\d{2}) (\d{2}):(\d{2}):(\d{2})")
+SLASH_DATE_RE = re.compile(r"(\d{4})/(\d{2})/(\d{2})")
+
+
+def parse_transaction_time(value: object) -> datetime | None:
+    """解析流水/订单时间，支持 TRANSACTION_TIME_FORMATS 和 ISO 格式，无法解析返回 None。
+
+    常见的定长写法用正则识别后直接构造 datetime，其余按格式顺序逐个尝试；同一字符串的结果有 LRU 缓存。
+    """
+    text = str(value or "").strip()
+    if not text:
+        return None
+    return _parse_transaction_time_text(text)
+
+
+def parse_date_prefix(value: object) -> datetime | None:
+    """只解析前 10 个字符的 YYYY-MM-DD，常用于 occurrence_date / 账本日期。"""
+    text = str(value or "").strip()
+    if not text:
+        return None
+    return _parse_date_prefix_text(text[:10])
+
+
+@lru_cache(maxsize=TIME_CACHE_SIZE)
+def _parse_transaction_time_text(text: str) -> datetime | None:
+    parsed = _fast_transaction_time(text)
+    if parsed is not None:
+        return parsed
+    for fmt, length in TRANSACTION_TIME_FORMAT_LENGTHS:
+        try:
+            return datetime.strptime(text[:length], fmt)
+        except ValueError:
+            continue
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=TIME_CACHE_SIZE)
+def _parse_date_prefix_text(text: str) -> datetime | None:
+    match = DASH_DATE_RE.fullmatch(text)
+    if match:
+        try:
+            return datetime(*map(int, match.groups()))
+        except ValueError:
+            return None
+    try:
+        return datetime.strptime(text, "%Y-%m-%d")
+    except ValueError:
+        return None
+
+
+def _fast_transaction_time(text: str) -> datetime | None:
+    # 只接管与按格式顺序尝试结果必然相同的写法：带秒的可有尾巴，其余必须整串匹配。
+    match = DASH_SECONDS_RE.match(text) or SLASH_SECONDS_RE.match(text)
+    if match is None:
+        match = DASH_MINUTES_RE.fullmatch(text) or DASH_DATE_RE.fullmatch(text) or SLASH_DATE_RE.fullmatch(text)
+    if match is None:
+        return None
+    try:
+        return datetime(*map(int, match.groups()))
+    except ValueError:
+        return None
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_PATH = str(PROJECT_ROOT / "src")
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+from localai.modules import financial_attachment_reader as reader
+from localai.modules.financial_attachment_reader import CSV_SAMPLE_BYTES
+
+
+ALIPAY_HEADER = "交易时间,交易分类,交易对方,收/支,金额,商品说明\n"
+
+
+def _alipay_rows(count: int) -> str:
+    return "".join(
+        f"2024-01-01 10:00:{index % 60:02d},餐饮美食,美团外卖商户{index},支出,{index % 90 + 1}.50,外卖订单\n"
+        for index in range(count)
+    )
+
+
+def _bom_csv_cut_inside_character(tmp_path: Path) -> tuple[Path, int]:
+    """生成大于采样长度的 UTF-8-BOM 支付宝导出，并让采样边界正好切在一个汉字的中间。"""
+    rows = 2000
+    body = ALIPAY_HEADER + _alipay_rows(rows)
+    for padding in range(64):
+        data = b"\xef\xbb\xbf" + f"支付宝交易明细{'-' * padding}\n".encode("utf-8") + body.encode("utf-8")
+        assert len(data) > CSV_SAMPLE_BYTES
+        try:
+            data[:CSV_SAMPLE_BYTES].decode("utf-8-sig")
+        except UnicodeDecodeError as exc:
+            if exc.start >= CSV_SAMPLE_BYTES - 6:
+                path = tmp_path / "alipay_bom.csv"
+                path.write_bytes(data)
+                return path, rows
+    raise AssertionError("no padding puts the sample cut inside a multibyte character")
+
+
+def test_bom_csv_larger_than_sample_cut_mid_character(tmp_path: Path) -> None:
+    path, rows = _bom_csv_cut_inside_character(tmp_path)
+
+    assert reader._detect_csv_encoding(path) == ("utf-8-sig", False)
+    transactions, stats = reader._read_statement_file(str(path), {}, reader.StatementReadOptions())
+    assert stats["status"] == "success"
+    assert stats["parser"] == "alipay_csv"
+    assert len(transactions) == rows
+
+
+def test_decodes_fully_rejects_truncated_utf16_without_bom(tmp_path: Path) -> None:
+    # 无 BOM、字节数为奇数的 UTF-16：分块解码后收尾时抛的是 UnicodeError 而不是 UnicodeDecodeError。
+    path = tmp_path / "truncated.csv"
+    path.write_bytes(b"a\x00" * 10 + b"a")
+    with path.open("rb") as file:
+        assert reader._decodes_fully(file, "utf-16") is False
+
+
+def test_header_tokens_must_appear_as_cells_of_the_header_row(tmp_path: Path) -> None:
+    # “金额”只出现在“实付金额”里：旧的子串匹配会选中支付宝解析器，然后因缺列解析出 0 条。
+    path = tmp_path / "other.csv"
+    path.write_text(
+        "导出说明：金额单位为元\n交易时间,交易分类,交易对方,收/支,实付金额\n"
+        "2024-01-01 10:00:00,餐饮美食,商户,支出,1.50\n",
+        encoding="utf-8",
+    )
+    transactions, stats = reader._read_statement_file(str(path), {}, reader.StatementReadOptions())
+    assert stats["status"] == "unsupported"
+    assert transactions == []
+
+
+def test_source_cache_records_each_files_own_path(tmp_path: Path) -> None:
+    import json
+
+    from localai.modules.bank_transaction_source_cache import TransactionSourceCache
+
+    files = []
+    for name in ("a.csv", "b.csv"):
+        path = tmp_path / name
+        path.write_text(ALIPAY_HEADER + _alipay_rows(1), encoding="utf-8")
+        files.append(str(path))
+    manifest = tmp_path / "manifest.json"
+    manifest.write_text(json.dumps([{"status": "success", "output_files": files}]), encoding="utf-8")
+    cache = TransactionSourceCache(tmp_path / "source_cache")
+
+    reader.read_attachment_transactions(manifest, source_cache=cache)
+
+    recorded = sorted(
+        json.loads(entry.read_text(encoding="utf-8"))["source_file"] for entry in cache.cache_dir.glob("*.json")
+    )
+    assert recorded == sorted(files)